@@ -1,4 +1,5 @@
 from __future__ import annotations
+import asyncio
 import mmap
 import struct
 from _ctypes import Structure
@@ -7,9 +8,10 @@ from ctypes import c_long, c_uint64
 from decimal import Decimal
 from enum import IntEnum
 import logging
+import random
 from sys import maxsize as sys_maxsize
-from time import sleep
-from typing import Optional, IO, Union, TYPE_CHECKING, Set, Tuple
+from time import perf_counter
+from typing import Optional, IO, Union, TYPE_CHECKING, Set, Tuple, Dict, List
 
 from ..Log import CLIENT_LOGGER_NAME
 
@@ -44,6 +46,10 @@ class APIImagePipeLine:
         self.options = options
         self.event_tot_frames: int = 0
         self.has_event_ended: str = ""
+        if g.Event:
+            # known up front for past events, a lower bound for live ones (refreshed by get_image)
+            self.event_tot_frames = int(g.Event.get("Frames") or 0)
+            self.has_event_ended = g.Event.get("EndDateTime") or ""
         logger.debug(f"{lp} options: {self.options}")
 
         #  FRAME IDS 
@@ -65,6 +71,15 @@ class APIImagePipeLine:
         self.max_attempts = options.attempts
         self.max_attempts_delay = options.delay
 
+        #  PREFETCH 
+        self.prefetch: int = options.prefetch
+        self._prefetched: Dict[int, asyncio.Task] = {}
+
+        #  RETRY METRICS 
+        self.retries: int = 0
+        self.retry_wait: float = 0.0
+        self.retries_per_fid: Dict[int, int] = {}
+
         # Alarm frame is always the first frame, pre count buffer length+1 for alarm frame
         self.current_frame = self.buffer_pre_count + 1
         # The pre- / post-buffers will give the absolute minimum number of frames to grab, assuming no event issues
@@ -166,20 +181,33 @@ class APIImagePipeLine:
                 return self._process_frame(skip=True)
             #  SET URL TO GRAB IMAGE FROM 
             logger.debug(f"Calculated Frame ID as {self.current_frame}")
-            fid_url = f"{g.api.portal_base_url}/index.php?view=image&eid={g.eid}&fid={self.current_frame}"
+            fid_url = self._fid_url(self.current_frame)
+            prefetched = self._prefetched.pop(self.current_frame, None)
+            self._schedule_prefetch()
 
             if g.past_event:
                 logger.warning(
                     f"{lp} this is a past event, max image grab attempts set to 1"
                 )
                 self.max_attempts = 1
+            if prefetched is not None:
+                # a failed prefetch (the frame may not have existed yet) does not count as an attempt
+                try:
+                    image = await prefetched
+                except Exception as e:
+                    logger.debug(f"{lp} prefetch of frame ID: {self.current_frame} failed -> {e}")
+                    image = None
+                if self._is_jpeg(image):
+                    logger.debug(f"{lp} using the prefetched image for frame ID: {self.current_frame}")
+                    return self._process_frame(image=image)
+            deadline = (perf_counter() + self.options.deadline) if self.options.deadline else None
             for image_grab_attempt in range(self.max_attempts):
                 image_grab_attempt += 1
                 logger.debug(
                     f"{lp} attempt #{image_grab_attempt}/{self.max_attempts} to grab image ID: {self.current_frame}"
                 )
                 image = await g.api.make_async_request(fid_url)
-                if isinstance(image, bytes) and image.startswith(b'\xff\xd8\xff\xe0\x00\x10JFIF'):
+                if self._is_jpeg(image):
 
                     logger.debug(f"ZM API returned a JPEG formatted image!")
                     return self._process_frame(image=image)
@@ -208,10 +236,22 @@ class APIImagePipeLine:
                             f"{lp} event has not ended yet! Total Frames: {self.event_tot_frames}"
                         )
                     if not g.past_event and (image_grab_attempt < self.max_attempts):
+                        delay = self._retry_delay(image_grab_attempt)
+                        if deadline and perf_counter() + delay > deadline:
+                            logger.warning(
+                                f"{lp} giving up on frame ID: {self.current_frame}, the retry deadline of "
+                                f"{self.options.deadline} second(s) would be exceeded"
+                            )
+                            break
+                        self.retries += 1
+                        self.retry_wait += delay
+                        self.retries_per_fid[self.current_frame] = (
+                            self.retries_per_fid.get(self.current_frame, 0) + 1
+                        )
                         logger.debug(
-                            f"{lp} sleeping for {self.options.delay} second(s)"
+                            f"{lp} sleeping for {delay:.2f} second(s)"
                         )
-                        sleep(self.options.delay)
+                        await asyncio.sleep(delay)
 
             return self._process_frame(skip=True)
 
@@ -219,8 +259,73 @@ class APIImagePipeLine:
         _cont = self.frames_processed < self.total_max_frames
         if not _cont:
             logger.warning(f"Image stream exhausted. Tried: {self.frames_processed} - Max: {self.total_max_frames}")
+            logger.debug(f"{LP}API:: event {g.eid} frame retry stats: {self.retry_stats}")
+            self.cancel_prefetch()
         return _cont
 
+    def _retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter for the given (1 based) failed attempt"""
+        delay = min(
+            self.options.delay * self.options.backoff ** (attempt - 1), self.options.max_delay
+        )
+        if self.options.jitter:
+            delay *= random.uniform(1 - self.options.jitter, 1 + self.options.jitter)
+        return max(delay, 0.0)
+
+    @property
+    def retry_stats(self) -> Dict[str, Union[int, float, Dict[int, int]]]:
+        return {
+            "retries": self.retries,
+            "retry_wait": round(self.retry_wait, 3),
+            "per_frame": dict(self.retries_per_fid),
+        }
+
+    @staticmethod
+    def _is_jpeg(image) -> bool:
+        return isinstance(image, bytes) and image.startswith(b'\xff\xd8\xff\xe0\x00\x10JFIF')
+
+    @staticmethod
+    def _fid_url(fid: int) -> str:
+        return f"{g.api.portal_base_url}/index.php?view=image&eid={g.eid}&fid={fid}"
+
+    def _upcoming_fids(self) -> List[int]:
+        """The frame IDs get_image() will request after the current one, assuming no snapshot jumps"""
+        remaining = self.total_max_frames - self.frames_processed - 1
+        fids = []
+        if self.fps < 1:
+            return fids
+        fid = self.current_frame
+        while len(fids) < min(self.prefetch, remaining):
+            fid += self.fps
+            # frames past the total do not exist (yet), only known once the event data was read
+            if self.event_tot_frames and fid > self.event_tot_frames:
+                break
+            if fid not in self._processed_fids:
+                fids.append(fid)
+        return fids
+
+    def _schedule_prefetch(self):
+        """Start fetching the next frames in the background, at most ``prefetch`` are kept in flight"""
+        if not self.prefetch:
+            return
+        lp = f"{LP}API::prefetch:"
+        wanted = self._upcoming_fids()
+        # a snapshot jump (or the end of the event) makes previously prefetched frames useless
+        for fid in [fid for fid in self._prefetched if fid not in wanted]:
+            self._prefetched.pop(fid).cancel()
+        for fid in wanted:
+            if fid not in self._prefetched:
+                self._prefetched[fid] = asyncio.create_task(
+                    g.api.make_async_request(self._fid_url(fid))
+                )
+        if wanted:
+            logger.debug(f"{lp} frame IDs in flight: {list(self._prefetched)}")
+
+    def cancel_prefetch(self):
+        for task in self._prefetched.values():
+            task.cancel()
+        self._prefetched.clear()
+
     def _process_frame(
         self,
         image: bytes = None,
@@ -244,6 +349,7 @@ class APIImagePipeLine:
             )
             self._max_frames = 1
             logger.error(f"{lp} {_msg}")
+            self.cancel_prefetch()
             return False, None
         elif not end:
             self.current_frame = self.current_frame + self.fps
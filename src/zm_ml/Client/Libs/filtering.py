@@ -0,0 +1,114 @@
+"""Immutable, pre-resolved filter plans cached per (monitor, zone, label, model type)."""
+from __future__ import annotations
+
+import logging
+import re
+from typing import Dict, Optional, Pattern, Tuple, Union, Any, Callable
+
+from ..Log import CLIENT_LOGGER_NAME
+
+logger = logging.getLogger(CLIENT_LOGGER_NAME)
+LP = "filter plan::"
+
+PlanKey = Tuple[int, str, str, str]
+Area = Optional[Union[float, int]]
+
+MATCH_ALL: Pattern = re.compile("(.*)")
+
+
+class FilterPlan:
+    """The final filter values for one label in one zone, global -> monitor -> zone -> label overrides already
+    applied. Read only.
+    """
+
+    __slots__ = ("pattern", "min_conf", "total_max_area", "total_min_area", "max_area", "min_area")
+
+    def __init__(
+        self,
+        pattern: Pattern,
+        min_conf: float,
+        total_max_area: Area,
+        total_min_area: Area,
+        max_area: Area,
+        min_area: Area,
+    ):
+        for name, value in zip(
+            self.__slots__,
+            (pattern, min_conf, total_max_area, total_min_area, max_area, min_area),
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(pattern={self.pattern.pattern!r}, min_conf={self.min_conf}, "
+            f"total_max_area={self.total_max_area}, total_min_area={self.total_min_area}, "
+            f"max_area={self.max_area}, min_area={self.min_area})"
+        )
+
+    @classmethod
+    def compile(cls, filters: Dict[str, Any], label: str, type_: str) -> FilterPlan:
+        """Build a plan from combined (global+monitor+zone) filters in dict form"""
+        section = _as_dict(filters.get(type_))
+        if type_ == "object":
+            label_filters = _as_dict((section.get("labels") or {}).get(label))
+            for k, v in label_filters.items():
+                if v is not None and k != "labels":
+                    section[k] = v
+        pattern = section.get("pattern") or MATCH_ALL
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+        return cls(
+            pattern=pattern,
+            min_conf=section.get("min_conf") or 0.0,
+            total_max_area=section.get("total_max_area"),
+            total_min_area=section.get("total_min_area"),
+            max_area=section.get("max_area"),
+            min_area=section.get("min_area"),
+        )
+
+
+def _as_dict(value: Any) -> Dict[str, Any]:
+    """Shallow dict copy of a filter section (dict or pydantic model)"""
+    if value is None:
+        return {}
+    if isinstance(value, dict):
+        return dict(value)
+    # .construct()'ed models skip validation, read the attributes instead of calling .dict()
+    return {k: getattr(value, k, None) for k in value.__fields__}
+
+
+class FilterPlanCache:
+    """Process wide plan cache, every plan is dropped when the config file hash changes"""
+
+    def __init__(self):
+        self.config_hash: Optional[str] = None
+        self._plans: Dict[PlanKey, FilterPlan] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(
+        self,
+        config_hash: Optional[str],
+        key: PlanKey,
+        filters: Callable[[], Dict[str, Any]],
+    ) -> FilterPlan:
+        """Return the cached plan for key, ``filters`` is only called (to build the plan) on a miss"""
+        if config_hash != self.config_hash:
+            if self._plans:
+                logger.debug(f"{LP} config hash changed, dropping {len(self._plans)} cached plans")
+            self._plans.clear()
+            self.config_hash = config_hash
+        plan = self._plans.get(key)
+        if plan is None:
+            self.misses += 1
+            plan = self._plans[key] = FilterPlan.compile(filters(), key[2], key[3])
+            logger.debug(f"{LP} compiled {key} -> {plan}")
+        else:
+            self.hits += 1
+        return plan
+
+
+plan_cache = FilterPlanCache()
@@ -0,0 +1,114 @@
+"""Cheap motion pre-gate, frames that barely differ from the last analysed frame are not sent for inference."""
+from __future__ import annotations
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from ..Log import CLIENT_LOGGER_NAME
+
+logger = logging.getLogger(CLIENT_LOGGER_NAME)
+LP = "motion gate::"
+
+
+class MotionGate:
+    """Mean absolute difference of downscaled, blurred grayscale frames.
+
+    The score is the fraction of pixels (inside the zones if any are given) that changed by more than
+    ``pixel_delta`` compared to the last frame that was let through. Comparing against the last *analysed*
+    frame, not the previous pulled one, means slow changes still add up and open the gate eventually.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.01,
+        pixel_delta: int = 25,
+        width: int = 160,
+        max_skips: int = 0,
+        zones: Optional[Sequence[Sequence[Tuple[int, int]]]] = None,
+        resolution: Optional[Tuple[int, int]] = None,
+    ):
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.width = width
+        self.max_skips = max_skips
+        self.zones = [list(z) for z in zones or [] if z]
+        self.resolution = resolution
+        self._reference: Optional[np.ndarray] = None
+        self._mask: Optional[np.ndarray] = None
+        self._skips_in_row: int = 0
+        self.analysed: int = 0
+        self.skipped: Dict[str, float] = {}
+
+    def _prepare(self, image: Union[bytes, np.ndarray]) -> Optional[np.ndarray]:
+        if isinstance(image, (bytes, bytearray)):
+            # only a thumbnail is needed, let libjpeg decode at 1/4 scale
+            frame = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+        elif isinstance(image, np.ndarray):
+            frame = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        else:
+            frame = None
+        if frame is None:
+            return None
+        h, w = frame.shape[:2]
+        height = max(1, round(h * self.width / w))
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def _zone_mask(self, shape: Tuple[int, int]) -> Optional[np.ndarray]:
+        """Union of the zones rasterized at the gate resolution, None means the whole frame"""
+        if not self.zones or not self.resolution:
+            return None
+        h, w = shape
+        sx, sy = w / self.resolution[0], h / self.resolution[1]
+        mask = np.zeros((h, w), dtype=np.uint8)
+        polygons = [
+            np.array([(x * sx, y * sy) for x, y in points], dtype=np.int32) for points in self.zones
+        ]
+        cv2.fillPoly(mask, polygons, 1)
+        if not mask.any():
+            return None
+        return mask.astype(bool)
+
+    def score(self, frame: np.ndarray) -> float:
+        changed = cv2.absdiff(frame, self._reference) > self.pixel_delta
+        if self._mask is not None:
+            return float(changed[self._mask].mean())
+        return float(changed.mean())
+
+    def check(self, image: Union[bytes, np.ndarray], image_name: Union[int, str]) -> Tuple[bool, float]:
+        """Returns (analyse, score). The first frame and frames that cannot be decoded always pass"""
+        lp = f"{LP}{image_name}::"
+        frame = self._prepare(image)
+        if frame is None:
+            logger.debug(f"{lp} unable to decode frame, letting it through")
+            return True, 1.0
+        if self._reference is None or self._reference.shape != frame.shape:
+            self._mask = self._zone_mask(frame.shape[:2])
+            self._reference = frame
+            self.analysed += 1
+            return True, 1.0
+        score = self.score(frame)
+        if score < self.threshold and not (
+            self.max_skips and self._skips_in_row >= self.max_skips
+        ):
+            self._skips_in_row += 1
+            self.skipped[str(image_name)] = score
+            logger.debug(
+                f"{lp} SKIPPING inference, {score:.2%} of the pixels changed since the last analysed frame "
+                f"(threshold: {self.threshold:.2%})"
+            )
+            return False, score
+        self._reference = frame
+        self._skips_in_row = 0
+        self.analysed += 1
+        return True, score
+
+    def stats(self) -> Dict[str, Union[int, List[str]]]:
+        return {
+            "analysed": self.analysed,
+            "skipped": len(self.skipped),
+            "skipped_frames": list(self.skipped),
+        }
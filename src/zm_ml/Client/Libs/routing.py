@@ -0,0 +1,231 @@
+"""Dispatch a frame to the ZM-ML API routes: one after another, hedged or fanned out in parallel."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from time import perf_counter, monotonic
+from typing import Optional, Dict, List, Any, Callable, Awaitable, Tuple, TYPE_CHECKING
+
+from ..Log import CLIENT_LOGGER_NAME
+
+if TYPE_CHECKING:
+    from ..Models.config import ServerRoute, ServerRoutes
+
+logger = logging.getLogger(CLIENT_LOGGER_NAME)
+LP = "routing::"
+
+Results = Optional[List[Dict[str, Any]]]
+SendFunc = Callable[["ServerRoute"], Awaitable[Results]]
+
+
+async def _timed(route: ServerRoute, send: SendFunc) -> Results:
+    _perf = perf_counter()
+    try:
+        return await send(route)
+    finally:
+        logger.debug(
+            f"{LP}perf:: HTTP Detection request to '{route.name}' completed in "
+            f"{perf_counter() - _perf:.5f} seconds"
+        )
+
+
+async def hedged(
+    routes: List[ServerRoute], send: SendFunc, hedge_delay: float
+) -> Tuple[Optional[ServerRoute], Results]:
+    """Send to the first route, if it has not answered within ``hedge_delay`` seconds (or it failed) send the
+    same frame to the next route too. The first successful answer wins, the other requests are cancelled.
+    """
+    lp = f"{LP}hedged::"
+    tasks: Dict[asyncio.Task, ServerRoute] = {}
+    remaining = list(routes)
+
+    def launch():
+        route = remaining.pop(0)
+        logger.debug(f"{lp} sending frame to route '{route.name}'")
+        tasks[asyncio.create_task(_timed(route, send))] = route
+
+    launch()
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=hedge_delay if remaining else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                logger.debug(f"{lp} no answer within {hedge_delay} second(s), hedging...")
+                launch()
+                pending = {t for t in tasks if not t.done()}
+                continue
+            for task in done:
+                if not task.cancelled() and task.exception() is None and task.result():
+                    logger.debug(f"{lp} route '{tasks[task].name}' answered first")
+                    return tasks[task], task.result()
+                exc = None if task.cancelled() else task.exception()
+                logger.warning(f"{lp} route '{tasks[task].name}' failed{f' -> {exc}' if exc else ''}")
+            # failed answers fire the next route right away instead of waiting for the hedge delay
+            if remaining:
+                launch()
+                pending = {t for t in tasks if not t.done()}
+    finally:
+        for task in tasks:
+            task.cancel()
+    return None, None
+
+
+async def fan_out(
+    routes: List[ServerRoute], send: SendFunc
+) -> Tuple[List[ServerRoute], Results]:
+    """Send to all routes at once and merge the results, if several routes answer for the same model the
+    result from the highest priority (lowest weight) route is kept.
+    """
+    lp = f"{LP}parallel::"
+    answers = await asyncio.gather(
+        *[_timed(route, send) for route in routes], return_exceptions=True
+    )
+    answered: List[ServerRoute] = []
+    merged: Dict[str, Dict[str, Any]] = {}
+    for route, answer in zip(routes, answers):
+        if isinstance(answer, BaseException):
+            logger.warning(f"{lp} route '{route.name}' failed -> {answer}")
+            continue
+        if not answer:
+            continue
+        answered.append(route)
+        for result in answer:
+            merged.setdefault(result.get("model_name"), result)
+    return answered, list(merged.values()) or None
+
+
+class RouteHealth:
+    """EWMA latency / error rate and circuit breaker state of a single route"""
+
+    __slots__ = ("name", "latency", "error_rate", "failures", "opened_at", "probing", "requests")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latency: Optional[float] = None
+        self.error_rate: float = 0.0
+        self.failures: int = 0
+        self.opened_at: Optional[float] = None
+        self.probing: bool = False
+        self.requests: int = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.probing else "open"
+
+    def __repr__(self):
+        latency = f"{self.latency:.3f}s" if self.latency is not None else "n/a"
+        return (
+            f"RouteHealth({self.name}: {self.state} - latency: {latency} - "
+            f"errors: {self.error_rate:.0%} - requests: {self.requests})"
+        )
+
+
+class RouteBalancer:
+    """Tracks the health of each route and orders them by weighted least-latency.
+
+    A route that fails ``failure_threshold`` times in a row is taken out of rotation (circuit open) for
+    ``cooldown`` seconds, after that a single request is let through as a probe. A successful probe closes the
+    circuit again, a failed one re-opens it.
+    """
+
+    def __init__(self, config: ServerRoutes):
+        self.alpha = config.health.alpha
+        self.failure_threshold = config.health.failure_threshold
+        self.cooldown = config.health.cooldown
+        self.health: Dict[str, RouteHealth] = {}
+
+    def _get(self, route: ServerRoute) -> RouteHealth:
+        if route.name not in self.health:
+            self.health[route.name] = RouteHealth(route.name)
+        return self.health[route.name]
+
+    def _available(self, health: RouteHealth) -> bool:
+        if health.opened_at is None:
+            return True
+        if not health.probing and monotonic() - health.opened_at >= self.cooldown:
+            return True
+        return False
+
+    def _prior(self) -> float:
+        """Latency assumed for routes without measurements: the mean of the measured routes"""
+        measured = [h.latency for h in self.health.values() if h.latency is not None]
+        return sum(measured) / len(measured) if measured else 0.0
+
+    def _score(self, route: ServerRoute, prior: float = 0.0) -> Tuple[float, int]:
+        """Expected latency inflated by the error rate, static weight breaks ties"""
+        health = self._get(route)
+        latency = health.latency if health.latency is not None else prior
+        return round(latency / max(1.0 - health.error_rate, 0.05), 2), route.weight
+
+    def order(self, routes: List[ServerRoute]) -> List[ServerRoute]:
+        """Available routes, best first. If every circuit is open, all routes are returned in weight order"""
+        lp = f"{LP}balancer::"
+        available = [r for r in routes if self._available(self._get(r))]
+        if not available:
+            logger.warning(f"{lp} all routes are marked down, trying them all anyway")
+            return sorted(routes, key=lambda r: r.weight)
+        prior = self._prior()
+        return sorted(available, key=lambda r: self._score(r, prior))
+
+    def acquire(self, route: ServerRoute):
+        """Mark the start of a request, a request to an open circuit (after the cooldown) is the probe"""
+        health = self._get(route)
+        health.requests += 1
+        if health.opened_at is not None:
+            health.probing = True
+
+    def release(self, route: ServerRoute, elapsed: float):
+        """The request was cancelled (lost a hedge) before it finished. It took at least ``elapsed``, that
+        lower bound is recorded so a slow route that keeps getting cancelled is not ranked first forever.
+        Error rate and circuit state are left alone."""
+        health = self._get(route)
+        health.probing = False
+        if health.latency is None or elapsed > health.latency:
+            health.latency = elapsed if health.latency is None else health.latency + self.alpha * (
+                elapsed - health.latency
+            )
+
+    def record(self, route: ServerRoute, latency: float, ok: bool):
+        lp = f"{LP}balancer::"
+        health = self._get(route)
+        health.error_rate += self.alpha * ((0.0 if ok else 1.0) - health.error_rate)
+        health.probing = False
+        if ok:
+            if health.latency is None:
+                health.latency = latency
+            else:
+                health.latency += self.alpha * (latency - health.latency)
+            if health.opened_at is not None:
+                logger.info(f"{lp} route '{route.name}' is back up, closing circuit")
+            health.failures = 0
+            health.opened_at = None
+        else:
+            health.failures += 1
+            if health.opened_at is not None or health.failures >= self.failure_threshold:
+                logger.warning(
+                    f"{lp} route '{route.name}' failed {health.failures} time(s) in a row, marking it down "
+                    f"for {self.cooldown} second(s)"
+                )
+                health.opened_at = monotonic()
+        logger.debug(f"{lp} {health}")
+
+    async def send(self, route: ServerRoute, send: SendFunc) -> Results:
+        """Run ``send`` for the route and record the outcome"""
+        self.acquire(route)
+        _perf = perf_counter()
+        try:
+            results = await send(route)
+        except asyncio.CancelledError:
+            self.release(route, perf_counter() - _perf)
+            raise
+        except Exception:
+            self.record(route, perf_counter() - _perf, False)
+            raise
+        self.record(route, perf_counter() - _perf, results is not None)
+        return results
@@ -0,0 +1,193 @@
+"""Static object history (fixed-width binary records) and vectorized past/current box comparisons."""
+from __future__ import annotations
+
+import logging
+import pickle
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union, Iterable
+
+import numpy as np
+
+from ..Log import CLIENT_LOGGER_NAME
+
+logger = logging.getLogger(CLIENT_LOGGER_NAME)
+LP = "static_objects::"
+
+LABEL_WIDTH = 32
+# one record per saved detection
+HISTORY_DTYPE = np.dtype(
+    [
+        ("event", "<i8"),
+        ("label", f"S{LABEL_WIDTH}"),
+        ("confidence", "<f4"),
+        ("bbox", "<i4", (4,)),
+    ]
+)
+
+
+class StaticObjectHistory:
+    """Detections of the last ``depth`` events of a monitor, stored as a single numpy structured array
+    (``.npy``) so loading it is one read and comparing against it needs no per-object python objects.
+    """
+
+    def __init__(self, filename: Optional[Path] = None, depth: int = 1):
+        self.filename = filename
+        self.depth = depth
+        self.records: np.ndarray = np.empty(0, dtype=HISTORY_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def labels(self) -> List[str]:
+        return [lbl.decode() for lbl in self.records["label"]]
+
+    @property
+    def confidence(self) -> np.ndarray:
+        return self.records["confidence"]
+
+    @property
+    def bbox(self) -> np.ndarray:
+        """(N, 4) x1, y1, x2, y2"""
+        return self.records["bbox"]
+
+    def load(self) -> StaticObjectHistory:
+        lp = f"{LP}load::"
+        self.records = np.empty(0, dtype=HISTORY_DTYPE)
+        if self.filename is None:
+            return self
+        if not self.filename.is_file():
+            legacy = self.filename.with_suffix(".pkl")
+            if legacy.is_file():
+                self._load_legacy(legacy)
+            else:
+                logger.debug(f"{lp} no history data file found: '{self.filename}'")
+            return self
+        try:
+            records = np.load(self.filename, allow_pickle=False)
+            if records.dtype != HISTORY_DTYPE:
+                raise ValueError(f"unexpected record format {records.dtype}")
+        except Exception as e:
+            logger.error(f"{lp} unable to read '{self.filename}', removing it -> {e}")
+            try:
+                self.filename.unlink()
+            except OSError as exc:
+                logger.error(f"{lp} could not delete: {exc}")
+        else:
+            self.records = self._trim(records)
+            logger.debug(
+                f"{lp} loaded {len(self.records)} detections from "
+                f"{len(np.unique(self.records['event']))} previous event(s)"
+            )
+        return self
+
+    def _load_legacy(self, legacy: Path):
+        """Read the old 3 pickles format (last event only), it is replaced on the next save"""
+        lp = f"{LP}load::"
+        try:
+            with legacy.open("rb") as f:
+                labels, confs, bboxes = pickle.load(f), pickle.load(f), pickle.load(f)
+        except Exception as e:
+            logger.debug(f"{lp} unable to read legacy history file '{legacy}' -> {e}")
+            return
+        self.records = self._build(0, labels or [], confs or [], bboxes or [])
+        logger.debug(f"{lp} converted {len(self.records)} detections from legacy file '{legacy}'")
+        try:
+            legacy.unlink()
+        except OSError:
+            pass
+
+    @staticmethod
+    def _build(
+        event: int,
+        labels: Sequence[str],
+        confs: Sequence[float],
+        bboxes: Sequence[Sequence[int]],
+    ) -> np.ndarray:
+        records = np.empty(len(labels), dtype=HISTORY_DTYPE)
+        records["event"] = event
+        records["label"] = [str(lbl).encode()[:LABEL_WIDTH] for lbl in labels]
+        records["confidence"] = confs
+        records["bbox"] = np.asarray(bboxes, dtype=np.int32).reshape(-1, 4)
+        return records
+
+    def _trim(self, records: np.ndarray) -> np.ndarray:
+        """Keep the records of the newest ``depth`` events"""
+        events = np.unique(records["event"])
+        if len(events) <= self.depth:
+            return records
+        return records[np.isin(records["event"], events[-self.depth:])]
+
+    def save(
+        self,
+        event: Union[int, str, None],
+        labels: Sequence[str],
+        confs: Sequence[float],
+        bboxes: Sequence[Sequence[int]],
+    ):
+        """Append the detections of an event and write the history back to disk"""
+        lp = f"{LP}save::"
+        try:
+            event = int(event)
+        except (TypeError, ValueError):
+            event = int(self.records["event"].max()) + 1 if len(self.records) else 0
+        records = self._build(event, labels, confs, bboxes)
+        # the same event being written again replaces its previous records
+        kept = self.records[self.records["event"] != event]
+        self.records = self._trim(np.concatenate([kept, records]))
+        if self.filename is None:
+            return
+        try:
+            tmp = self.filename.with_suffix(".tmp")
+            with tmp.open("wb") as f:
+                np.save(f, self.records, allow_pickle=False)
+            tmp.chmod(0o640)
+            tmp.replace(self.filename)
+            logger.debug(
+                f"{lp} saved event {event} RESULTS to file: '{self.filename}' ::: {list(labels)}, "
+                f"{list(confs)}, {list(bboxes)}"
+            )
+        except Exception as e:
+            logger.error(
+                f"{lp} error writing to '{self.filename}' past detections not recorded, err msg -> {e}"
+            )
+
+    def candidates(self, label: str, label_groups: Optional[Dict[str, Iterable[str]]] = None) -> np.ndarray:
+        """Bool mask of the saved records with the same label or in the same label group"""
+        accepted = {label}
+        for group in (label_groups or {}).values():
+            if label in group:
+                accepted.update(group)
+        return np.isin(
+            self.records["label"], [str(lbl).encode()[:LABEL_WIDTH] for lbl in accepted]
+        )
+
+
+def compare_boxes(
+    saved: np.ndarray, current: Sequence[float], difference: Union[float, int]
+):
+    """Compare a current box against N saved boxes at once.
+
+    Returns (intersects, diff_area, max_diff) arrays of shape (N,). Same rules as the old polygon
+    comparison: if the current box contains the saved one, the difference is the extra area of the current
+    box, otherwise it is the part of the saved box not covered by the current one. A float ``difference``
+    is a fraction of the reference box area, an int is pixels.
+    """
+    boxes = np.asarray(saved, dtype=np.float64).reshape(-1, 4)
+    cx1, cy1, cx2, cy2 = (float(v) for v in current)
+    current_area = (cx2 - cx1) * (cy2 - cy1)
+    saved_area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    iw = np.minimum(boxes[:, 2], cx2) - np.maximum(boxes[:, 0], cx1)
+    ih = np.minimum(boxes[:, 3], cy2) - np.maximum(boxes[:, 1], cy1)
+    # touching counts, like shapely's intersects
+    intersects = (iw >= 0) & (ih >= 0)
+    inter_area = np.clip(iw, 0, None) * np.clip(ih, 0, None)
+    contains = (
+        (boxes[:, 0] >= cx1) & (boxes[:, 1] >= cy1) & (boxes[:, 2] <= cx2) & (boxes[:, 3] <= cy2)
+    )
+    diff_area = np.where(contains, current_area - inter_area, saved_area - inter_area)
+    if isinstance(difference, float):
+        max_diff = np.where(contains, current_area, saved_area) * difference
+    else:
+        max_diff = np.full(len(boxes), float(difference))
+    return intersects, diff_area, max_diff
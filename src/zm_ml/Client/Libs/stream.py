@@ -0,0 +1,132 @@
+"""Persistent WebSocket detection channel to a ZM-ML API route (/detect/stream)."""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+from typing import Optional, Dict, List, Any, Union
+
+import aiohttp
+import numpy as np
+
+from ..Log import CLIENT_LOGGER_NAME
+
+logger = logging.getLogger(CLIENT_LOGGER_NAME)
+LP = "stream::"
+
+
+class DetectionStream:
+    """One WebSocket session per route, the model set is declared once when connecting.
+
+    Every frame is sent as a JSON header (request id + frame format) followed by a binary message with the
+    image data. Results come back tagged with the request id so several frames can be in flight at once.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        models_str: str,
+        max_in_flight: int = 4,
+        timeout: float = 90,
+    ):
+        self.session = session
+        self.url = url
+        self.models_str = models_str
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._send_lock = asyncio.Lock()
+        self._connect_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    async def connect(self):
+        """Open the session unless it already is, concurrent callers wait for a single connection"""
+        lp = f"{LP}connect::"
+        async with self._connect_lock:
+            if self.connected:
+                return
+            self._ws = await self.session.ws_connect(
+                self.url,
+                params={"model_hints": self.models_str, "max_in_flight": self.max_in_flight},
+                heartbeat=30,
+            )
+            self._reader = asyncio.create_task(self._read())
+        logger.debug(f"{lp} opened detection stream to {self.url} for models: {self.models_str}")
+
+    async def _read(self):
+        """Resolve the pending request futures as results arrive"""
+        lp = f"{LP}read::"
+        error: Exception = ConnectionError(f"{lp} detection stream to {self.url} closed")
+        try:
+            async for msg in self._ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    data = msg.json()
+                    future = self._pending.pop(data.get("id"), None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in data:
+                        future.set_exception(RuntimeError(data["error"]))
+                    else:
+                        future.set_result(data["results"])
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    error = self._ws.exception() or error
+                    break
+        except Exception as exc:
+            error = exc
+        finally:
+            # fail whatever is still waiting, the next detect() call reconnects
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def detect(
+        self, image: Union[bytes, np.ndarray], cache: bool = True
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Send a frame and wait for its results, encoded images (bytes) and decoded frames (np.ndarray)
+        are supported. ``cache=False`` asks the server to skip its frame cache (crops)."""
+        if not self.connected:
+            await self.connect()
+        async with self._slots:
+            request_id = next(self._ids)
+            if isinstance(image, np.ndarray):
+                frame = np.ascontiguousarray(image)
+                header = {
+                    "id": request_id,
+                    "format": "raw",
+                    "width": frame.shape[1],
+                    "height": frame.shape[0],
+                    "channels": frame.shape[2] if frame.ndim == 3 else 1,
+                    "dtype": frame.dtype.name,
+                }
+                payload = frame.tobytes()
+            else:
+                header = {"id": request_id, "format": "jpeg"}
+                payload = image
+            if not cache:
+                header["cache"] = False
+            future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = future
+            # header + payload must not interleave with another frame
+            async with self._send_lock:
+                await self._ws.send_json(header)
+                await self._ws.send_bytes(payload)
+            try:
+                return await asyncio.wait_for(future, self.timeout)
+            finally:
+                self._pending.pop(request_id, None)
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader is not None:
+            await self._reader
+        self._ws = self._reader = None
@@ -0,0 +1,225 @@
+"""Zones compiled once per monitor, every detection box is evaluated against every zone in one pass."""
+from __future__ import annotations
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, List, Tuple, Sequence, Optional, TYPE_CHECKING
+
+import cv2
+import numpy as np
+from shapely.geometry import Polygon
+
+from ..Log import CLIENT_LOGGER_NAME
+
+try:
+    import shapely
+
+    # shapely 2 exposes vectorized (ufunc) geometry operations
+    _VECTORIZED = int(shapely.__version__.split(".")[0]) >= 2
+except (ImportError, AttributeError, ValueError):
+    _VECTORIZED = False
+
+if not _VECTORIZED:
+    from shapely.prepared import prep
+
+if TYPE_CHECKING:
+    from ..Models.config import MonitorZones
+
+logger = logging.getLogger(CLIENT_LOGGER_NAME)
+LP = "zones::"
+
+ZoneSignature = Tuple[Tuple[str, Tuple[Tuple[int, int], ...]], ...]
+
+
+class ZoneMatrix:
+    """Geometry of N boxes against Z zones"""
+
+    __slots__ = ("intersects", "box_area", "inter_area")
+
+    def __init__(self, intersects: np.ndarray, box_area: np.ndarray, inter_area: np.ndarray):
+        # (N, Z) bool - box touches or overlaps the zone
+        self.intersects = intersects
+        # (N,) float - area of each box
+        self.box_area = box_area
+        # (N, Z) float - area of the box that is inside the zone
+        self.inter_area = inter_area
+
+
+class CompiledZones:
+    """Polygons, areas, envelopes and (shapely 1.x) prepared geometries of the enabled zones of a monitor.
+
+    Axis-aligned rectangular zones (the common case) are evaluated with pure numpy, other polygons use
+    shapely's vectorized functions (shapely >= 2) or prepared geometries, only for the box/zone pairs whose
+    envelopes overlap.
+    """
+
+    def __init__(self, zones: Dict[str, MonitorZones]):
+        self.signature = self.signature_of(zones)
+        self.names: List[str] = []
+        self.polygons: List[Polygon] = []
+        for zone_name, points in self.signature:
+            self.names.append(zone_name)
+            self.polygons.append(Polygon(points))
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.areas = np.array([p.area for p in self.polygons], dtype=np.float64)
+        # (Z, 4) x1, y1, x2, y2
+        self.envelopes = (
+            np.array([p.bounds for p in self.polygons], dtype=np.float64)
+            if self.polygons
+            else np.empty((0, 4), dtype=np.float64)
+        )
+        envelope_areas = (self.envelopes[:, 2] - self.envelopes[:, 0]) * (
+            self.envelopes[:, 3] - self.envelopes[:, 1]
+        )
+        self.is_rect = np.isclose(self.areas, envelope_areas)
+        if _VECTORIZED:
+            self._geoms = np.array(self.polygons, dtype=object)
+            shapely.prepare(self._geoms)
+        else:
+            self._prepared = [prep(p) for p in self.polygons]
+        logger.debug(
+            f"{LP} compiled {len(self.names)} zones ({int(self.is_rect.sum())} rectangular) "
+            f"[shapely vectorized: {_VECTORIZED}]"
+        )
+
+    @staticmethod
+    def signature_of(zones: Dict[str, MonitorZones]) -> ZoneSignature:
+        """Enabled zones that have points, used to know when the compiled zones are stale"""
+        return tuple(
+            (name, tuple(tuple(p) for p in zone.points))
+            for name, zone in zones.items()
+            if zone.enabled is not False and zone.points
+        )
+
+    def polygon(self, zone_name: str) -> Optional[Polygon]:
+        idx = self.index.get(zone_name)
+        return self.polygons[idx] if idx is not None else None
+
+    def evaluate(self, bboxes: Sequence[Sequence[float]]) -> ZoneMatrix:
+        """Intersection test and areas of every box (x1, y1, x2, y2) against every zone"""
+        boxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        n, z = len(boxes), len(self.names)
+        box_area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        # envelope overlap (touching counts, like shapely's intersects)
+        ix1 = np.maximum(boxes[:, None, 0], self.envelopes[None, :, 0])
+        iy1 = np.maximum(boxes[:, None, 1], self.envelopes[None, :, 1])
+        ix2 = np.minimum(boxes[:, None, 2], self.envelopes[None, :, 2])
+        iy2 = np.minimum(boxes[:, None, 3], self.envelopes[None, :, 3])
+        candidates = (ix1 <= ix2) & (iy1 <= iy2)
+        # for rectangular zones the envelope overlap IS the intersection
+        inter_area = np.where(
+            candidates & self.is_rect[None, :],
+            np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None),
+            0.0,
+        )
+        intersects = candidates & self.is_rect[None, :]
+        rows, cols = np.nonzero(candidates & ~self.is_rect[None, :])
+        if len(rows):
+            if _VECTORIZED:
+                box_geoms = shapely.box(
+                    boxes[rows, 0], boxes[rows, 1], boxes[rows, 2], boxes[rows, 3]
+                )
+                zone_geoms = self._geoms[cols]
+                hits = shapely.intersects(zone_geoms, box_geoms)
+                intersects[rows, cols] = hits
+                if hits.any():
+                    inter_area[rows[hits], cols[hits]] = shapely.area(
+                        shapely.intersection(zone_geoms[hits], box_geoms[hits])
+                    )
+            else:
+                for r, c in zip(rows, cols):
+                    x1, y1, x2, y2 = boxes[r]
+                    box_polygon = Polygon([(x1, y1), (x2, y1), (x2, y2), (x1, y2)])
+                    if self._prepared[c].intersects(box_polygon):
+                        intersects[r, c] = True
+                        inter_area[r, c] = self.polygons[c].intersection(box_polygon).area
+        return ZoneMatrix(intersects.reshape(n, z), box_area, inter_area.reshape(n, z))
+
+
+class RasterZones(CompiledZones):
+    """Zones rasterized at a reduced resolution (longest side ``max_size``), overlap areas come from
+    summed-area tables (integral images) with 4 lookups per box/zone pair, no matter how complex the polygon
+    is. Boxes are mapped into the raster, areas are scaled back to monitor pixels.
+
+    The bitmasks are cached on disk (bit packed) keyed by a hash of the zone geometry and raster size, the
+    integral images are rebuilt from them on load.
+    """
+
+    def __init__(
+        self,
+        zones: Dict[str, MonitorZones],
+        resolution: Tuple[int, int],
+        cache_dir: Optional[Path] = None,
+        max_size: int = 640,
+    ):
+        super().__init__(zones)
+        self.resolution = resolution
+        self.max_size = max_size
+        w, h = max(int(resolution[0] or 0), 1), max(int(resolution[1] or 0), 1)
+        scale = min(1.0, max_size / max(w, h))
+        self.raster_size = (max(int(round(w * scale)), 1), max(int(round(h * scale)), 1))
+        rw, rh = self.raster_size
+        # monitor -> raster pixel scale per axis
+        self.scale = np.array([rw / w, rh / h, rw / w, rh / h], dtype=np.float64)
+        sats = []
+        for zone_name, points in self.signature:
+            mask = self._load_mask(zone_name, points, cache_dir)
+            sats.append(cv2.integral(mask, sdepth=cv2.CV_32S))
+        # (Z, RH+1, RW+1) pixel counts of each zone above and left of (y, x)
+        self.sats = np.stack(sats) if sats else np.zeros((0, rh + 1, rw + 1), dtype=np.int32)
+        self._pixel_area = 1.0 / (self.scale[0] * self.scale[1])
+        # monitor pixel areas, consistent with the overlap areas computed from the masks
+        self.areas = self.sats[:, -1, -1].astype(np.float64) * self._pixel_area
+        logger.debug(
+            f"{LP}raster:: {len(sats)} zone(s) rasterized at {rw}*{rh} for {w}*{h} "
+            f"({self.sats.nbytes / 1024:.0f} KiB of summed-area tables)"
+        )
+
+    def _mask_key(self, points: Tuple[Tuple[int, int], ...]) -> str:
+        return hashlib.sha1(repr((self.resolution, self.raster_size, points)).encode()).hexdigest()
+
+    def _load_mask(
+        self, zone_name: str, points: Tuple[Tuple[int, int], ...], cache_dir: Optional[Path]
+    ) -> np.ndarray:
+        lp = f"{LP}raster::"
+        w, h = self.raster_size
+        cache_file = cache_dir / f"{self._mask_key(points)}.npy" if cache_dir else None
+        if cache_file and cache_file.is_file():
+            try:
+                packed = np.load(cache_file)
+                return np.unpackbits(packed, count=w * h).reshape(h, w)
+            except Exception as exc:
+                logger.warning(f"{lp} unable to load cached mask for zone '{zone_name}' -> {exc}")
+        mask = np.zeros((h, w), dtype=np.uint8)
+        scaled = np.round(np.asarray(points, dtype=np.float64) * self.scale[:2]).astype(np.int32)
+        cv2.fillPoly(mask, [scaled], 1)
+        if cache_file:
+            try:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                np.save(cache_file, np.packbits(mask))
+                logger.debug(f"{lp} cached mask for zone '{zone_name}' -> {cache_file}")
+            except OSError as exc:
+                logger.warning(f"{lp} unable to cache mask for zone '{zone_name}' -> {exc}")
+        return mask
+
+    def evaluate(self, bboxes: Sequence[Sequence[float]]) -> ZoneMatrix:
+        boxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        w, h = self.raster_size
+        box_area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        # into raster pixels, clipped to the image, x2/y2 are exclusive in the integral image
+        scaled = np.round(boxes * self.scale)
+        x1 = np.clip(scaled[:, 0], 0, w).astype(np.intp)
+        y1 = np.clip(scaled[:, 1], 0, h).astype(np.intp)
+        x2 = np.clip(scaled[:, 2], 0, w).astype(np.intp)
+        y2 = np.clip(scaled[:, 3], 0, h).astype(np.intp)
+        sats = self.sats
+        # (Z, N) -> (N, Z)
+        counts = (
+            sats[:, y2, x2].astype(np.int64)
+            - sats[:, y1, x2]
+            - sats[:, y2, x1]
+            + sats[:, y1, x1]
+        ).T
+        inter_area = np.minimum(counts * self._pixel_area, box_area[:, None])
+        return ZoneMatrix(counts > 0, box_area, inter_area)
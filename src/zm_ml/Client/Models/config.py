@@ -8,7 +8,8 @@ from pydantic import BaseModel, Field, AnyUrl, validator, IPvAnyAddress, SecretS
 
 from .validators import validate_percentage_or_pixels
 from ...Shared.Models.validators import validate_no_scheme_url
-from ...Shared.Models.config import Testing, SystemSettings, DefaultEnabled, DefaultNotEnabled, LoggingSettings
+from ...Shared.Models.config import Testing, SystemSettings, DefaultEnabled, DefaultNotEnabled, LoggingSettings, \
+    FrameCacheSettings
 from ..Log import CLIENT_LOGGER_NAME
 
 logger = logging.getLogger(CLIENT_LOGGER_NAME)
@@ -39,6 +40,8 @@ class ServerRoute(BaseModel):
     username: str = Field(None)
     password: SecretStr = Field(None)
     timeout: int = Field(90)
+    stream: bool = Field(False, description="Use a persistent WebSocket session (/detect/stream)")
+    max_in_flight: int = Field(4, ge=1, le=64, description="Frames in flight on the stream")
 
     # validators
     _validate_host_portal = validator("host", allow_reuse=True, pre=True)(
@@ -46,8 +49,35 @@ class ServerRoute(BaseModel):
     )
 
 
+class RoutingMode(str, Enum):
+    # one route after another, in weight order
+    sequential = "sequential"
+    # first route, then the next one(s) if no answer within hedge_delay, first answer wins
+    hedged = "hedged"
+    # all routes at once, results are merged
+    parallel = "parallel"
+
+
+class RouteHealthSettings(DefaultNotEnabled):
+    alpha: float = Field(
+        0.3, gt=0, le=1, description="EWMA smoothing factor for route latency and error rate"
+    )
+    failure_threshold: int = Field(
+        3, ge=1, description="Consecutive failures before a route is marked down"
+    )
+    cooldown: float = Field(
+        30.0, ge=0, description="Seconds a route stays down before a probe request is let through"
+    )
+
+
 class ServerRoutes(BaseModel):
     routes: List[ServerRoute] = Field(default_factory=list)
+    health: RouteHealthSettings = Field(default_factory=RouteHealthSettings)
+    mode: RoutingMode = Field(RoutingMode.sequential)
+    hedge_delay: float = Field(
+        0.5, ge=0, description="Seconds to wait for a route before also sending the frame to the next one"
+    )
+    frame_cache: FrameCacheSettings = Field(default_factory=FrameCacheSettings)
 
 
 class AnimationSettings(BaseModel):
@@ -217,6 +247,42 @@ class APIPullMethod(DefaultNotEnabled):
     check_snapshots: bool = Field(True)
     snapshot_frame_skip: int = Field(3)
     max_frames: int = Field(0)
+    prefetch: int = Field(
+        0, ge=0, le=32, description="Fetch the next x frames in the background while the current one is inferred"
+    )
+    backoff: float = Field(
+        2.0, ge=1.0, description="Multiply the delay by this after every failed attempt"
+    )
+    max_delay: float = Field(10.0, gt=0, description="Upper limit of the delay between attempts")
+    jitter: float = Field(
+        0.2, ge=0, le=1, description="Randomize each delay by +/- this fraction"
+    )
+    deadline: Optional[float] = Field(
+        None, gt=0, description="Give up on a frame after this many seconds of retrying"
+    )
+
+
+class MotionGateSettings(DefaultNotEnabled):
+    threshold: float = Field(
+        0.01, ge=0, le=1, description="Fraction of changed pixels needed to send the frame for inference"
+    )
+    pixel_delta: int = Field(25, ge=1, le=255, description="Grayscale difference for a pixel to count as changed")
+    width: int = Field(160, ge=32, le=1280, description="Frames are downscaled to this width before comparing")
+    max_skips: int = Field(0, ge=0, description="Force inference after this many skipped frames in a row (0 = never)")
+    zones: bool = Field(True, description="Only compare the pixels inside the monitor zones")
+
+
+class ROISettings(DefaultNotEnabled):
+    padding: int = Field(32, ge=0, description="Pixels added around the union rectangle of the zones")
+    tile_size: int = Field(
+        0, ge=0, description="Split the region into square tiles of this size (0 = send the region as one crop)"
+    )
+    overlap: float = Field(0.2, ge=0, lt=1, description="Overlap between neighbouring tiles")
+    max_coverage: float = Field(
+        0.8, gt=0, le=1, description="Send the full frame if the region covers more than this fraction of it"
+    )
+    nms: float = Field(0.45, gt=0, le=1, description="NMS threshold used to merge boxes of overlapping tiles")
+    jpeg_quality: int = Field(90, ge=1, le=100, description="JPEG quality of the crops sent to the server")
 
 
 class DetectionSettings(BaseModel):
@@ -256,6 +322,8 @@ class DetectionSettings(BaseModel):
     import_zones: bool = Field(False)
     match_origin_zone: bool = Field(False)
     images: ImageSettings = Field(default_factory=ImageSettings)
+    motion_gate: MotionGateSettings = Field(default_factory=MotionGateSettings)
+    roi: ROISettings = Field(default_factory=ROISettings)
 
 
 class BaseObjectFilters(BaseModel):
@@ -312,6 +380,9 @@ class StaticObjects(DefaultEnabled):
     difference: Optional[Union[float, int]] = Field(0.1)
     labels: List[str] = Field(default_factory=list)
     ignore_labels: List[str] = Field(default_factory=list)
+    history: int = Field(
+        1, ge=1, le=100, description="Number of previous events to compare current detections against"
+    )
 
     _validate_difference = validator("difference", allow_reuse=True)(
         validate_percentage_or_pixels
@@ -349,8 +420,19 @@ class MatchStrategy(str, Enum):
     most_unique = "most_unique"
 
 
+class ZoneEvaluation(str, Enum):
+    # exact polygon geometry (shapely / numpy)
+    geometry = "geometry"
+    # rasterized zone masks + summed-area tables, O(1) per box regardless of polygon complexity
+    raster = "raster"
+
+
 class MatchingSettings(BaseModel):
     strategy: MatchStrategy = Field(MatchStrategy.first)
+    zone_evaluation: ZoneEvaluation = Field(ZoneEvaluation.geometry)
+    raster_size: int = Field(
+        640, ge=64, description="raster zone evaluation: longest side of the zone masks in pixels"
+    )
     static_objects: StaticObjects = Field(default_factory=StaticObjects)
     filters: MatchFilters = Field(default_factory=MatchFilters)
 
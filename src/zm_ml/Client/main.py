@@ -5,23 +5,27 @@ import json
 import logging
 import logging.handlers
 import os
-import pickle
 import re
 import signal
 from pathlib import Path
 from shutil import which
 from time import perf_counter, time
-from typing import Union, Dict, Optional, List, Any, Tuple
+from typing import Union, Dict, Optional, List, Any, Tuple, AsyncIterator
 
 import cv2
 import numpy as np
 import yaml
-from pydantic import BaseModel, Field
 from shapely.geometry import Polygon
 
 from .Libs.Media import APIImagePipeLine, SHMImagePipeLine, ZMUImagePipeLine
 from .Libs.api import ZMApi
 from .Libs.zmdb import ZMDB
+from .Libs.stream import DetectionStream
+from .Libs import routing
+from .Libs.zones import CompiledZones, RasterZones
+from .Libs.filtering import FilterPlan, plan_cache
+from .Libs.static_objects import StaticObjectHistory, compare_boxes
+from .Libs.frame_gate import MotionGate
 from .Models.utils import CFGHash, get_push_auth, check_imports
 from .Models.config import (
     ConfigFileModel,
@@ -34,10 +38,14 @@ from .Models.config import (
     OverRideFaceFilters,
     OverRideAlprFilters,
     MatchStrategy,
+    RoutingMode,
+    ZoneEvaluation,
     NotificationZMURLOptions,
 )
 from ..Shared.Models.config import Testing
 from ..Shared.configs import ClientEnvVars, GlobalConfig
+from ..Shared.frame_cache import FrameCache, frame_hash
+from ..Shared import tiling
 
 __version__: str = "0.0.1"
 __version_type__: str = "dev"
@@ -279,76 +287,6 @@ def create_global_config() -> GlobalConfig:
     return get_global_config()
 
 
-class StaticObjects(BaseModel):
-    labels: Optional[List[str]] = Field(default_factory=list)
-    confidence: Optional[List[float]] = Field(default_factory=list)
-    bbox: Optional[List[List[int]]] = Field(default_factory=list)
-    filename: Optional[Path] = None
-
-    def pickle(
-        self,
-        labels: Optional[List[str]] = None,
-        confs: Optional[List] = None,
-        bboxs: Optional[List] = None,
-        write: bool = False,
-    ) -> Optional[Tuple[List[str], List, List]]:
-        """Use the pickle module to read or write the static objects to a file.
-
-        :param write: save the data to a file
-        :param bboxs: list of bounding boxes (Required for write)
-        :param confs: list of confidence scores (Required for write)
-        :param labels: list of labels (Required for write)
-        """
-        lp: str = "static_objects::pickle::"
-        variable_data_path = g.config.system.variable_data_path
-        filename = self.filename
-        if not write:
-            logger.debug(
-                f"{lp} trying to load previous detection results from file: '{filename}'"
-            )
-            if filename.exists():
-                try:
-                    with filename.open("rb") as f:
-                        self.labels = pickle.load(f)
-                        self.confidence = pickle.load(f)
-                        self.bbox = pickle.load(f)
-                except FileNotFoundError:
-                    logger.debug(
-                        f"{lp}  no history data file found for monitor '{g.mid}'"
-                    )
-                except EOFError:
-                    logger.debug(f"{lp}  empty file found for monitor '{g.mid}'")
-                    logger.debug(f"{lp}  going to remove '{filename}'")
-                    try:
-                        filename.unlink()
-                    except Exception as e:
-                        logger.error(f"{lp}  could not delete: {e}")
-                except Exception as e:
-                    logger.error(f"{lp} error: {e}")
-                logger.debug(f"{lp} returning results: {labels}, {confs}, {bboxs}")
-            else:
-                logger.warning(f"{lp} no history data file found for monitor '{g.mid}'")
-        else:
-            try:
-                filename.touch(exist_ok=True, mode=0o640)
-                with filename.open("wb") as f:
-                    pickle.dump(labels, f)
-                    pickle.dump(confs, f)
-                    pickle.dump(bboxs, f)
-                    logger.debug(
-                        f"{lp} saved_event: {g.eid} RESULTS to file: '{filename}' ::: {labels}, {confs}, {bboxs}",
-                    )
-            except Exception as e:
-                logger.error(
-                    f"{lp}  error writing to '{filename}' past detections not recorded, err msg -> {e}"
-                )
-            else:
-                self.labels = labels
-                self.confidence = confs
-                self.bbox = bboxs
-        return self.labels, self.confidence, self.bbox
-
-
 class Notifications:
     from .Notifications.Pushover import Pushover
     from .Notifications.Gotify import Gotify
@@ -439,6 +377,8 @@ class ZMClient:
     async def clean_up(self):
         logger.debug(f"closing api sessions and db connection")
         # self.image_pipeline.exit()
+        for stream in self.streams.values():
+            await stream.close()
         await self.api.clean_up()
         self.db.clean_up()
 
@@ -465,11 +405,17 @@ class ZMClient:
         check_imports()
         self.zones: Dict = {}
         self.zone_polygons: List[Polygon] = []
+        self._compiled_zones: Optional[CompiledZones] = None
         self.zone_filters: Dict = {}
+        self._monitor_filters: Dict = {}
         self.filtered_labels: Dict = {}
-        self.static_objects = StaticObjects()
+        self.static_objects = StaticObjectHistory()
+        self.frame_cache: Optional[FrameCache] = None
+        self.motion_gate: Optional[MotionGate] = None
         self.notifications: Optional[Notifications] = None
+        self.streams: Dict[str, DetectionStream] = {}
         self.config = get_global_config().config
+        self.balancer = routing.RouteBalancer(self.config.mlapi)
         futures: List[concurrent.futures.Future] = []
         _hash: concurrent.futures.Future
         _hash_input = CFGHash(config_file=g.config_file)
@@ -514,10 +460,240 @@ class ZMClient:
         ) = self.db.grab_all(eid)
 
 
+    def _roi_rects(self, width: int, height: int) -> List[tiling.Rect]:
+        """Crops to send for a frame: the union rectangle of the zones (optionally tiled), empty if the
+        full frame should be sent"""
+        lp = f"{LP}roi::"
+        roi = self.config.detection_settings.roi
+        sx, sy = width / (g.mon_width or width), height / (g.mon_height or height)
+        polygons = [
+            [(x * sx, y * sy) for x, y in zone.points]
+            for zone in self.zones.values()
+            if zone.enabled is not False and zone.points
+        ]
+        rect = tiling.bounding_rect(polygons, width, height, roi.padding)
+        if rect is None:
+            return []
+        coverage = (rect[2] - rect[0]) * (rect[3] - rect[1]) / (width * height)
+        if coverage > roi.max_coverage:
+            logger.debug(f"{lp} zones cover {coverage:.0%} of the frame, sending the full frame")
+            return []
+        rects = tiling.grid_tiles(rect, roi.tile_size, roi.overlap) if roi.tile_size else [rect]
+        logger.debug(f"{lp} zones cover {coverage:.0%} of the frame -> {len(rects)} crop(s): {rects}")
+        return rects
+
+    async def _roi_responses(
+        self, models_str: str, image: Union[bytes, np.ndarray], image_name: Union[int, str]
+    ) -> AsyncIterator[Tuple[str, Optional[List[Dict[str, Any]]]]]:
+        """Like _route_responses() but only the zone region (or its tiles) is sent, the boxes are mapped back
+        to full frame coordinates and the results of all crops are merged per model"""
+        frame = await self.convert_to_cv2(image)
+        rects = self._roi_rects(frame.shape[1], frame.shape[0]) if frame is not None else []
+        if not rects:
+            async for answer in self._route_responses(models_str, image, image_name):
+                yield answer
+            return
+        route_names: List[str] = []
+        per_model: Dict[str, List[Tuple[tiling.Rect, Dict[str, Any]]]] = {}
+        encode_params = [cv2.IMWRITE_JPEG_QUALITY, self.config.detection_settings.roi.jpeg_quality]
+        for rect in rects:
+            x1, y1, x2, y2 = rect
+            # JPEG, a raw crop is bigger than the JPEG of the full frame
+            success, crop = cv2.imencode(".jpg", frame[y1:y2, x1:x2], encode_params)
+            if not success:
+                logger.error(f"{LP}roi:: failed to JPEG encode crop {rect} of '{image_name}', skipping it")
+                continue
+            responses = self._route_responses(models_str, crop.tobytes(), image_name, crop=True)
+            try:
+                # first answer per crop
+                async for route_name, results in responses:
+                    if results:
+                        if route_name not in route_names:
+                            route_names.append(route_name)
+                        for result in results:
+                            per_model.setdefault(result.get("model_name"), []).append((rect, result))
+                        break
+            finally:
+                await responses.aclose()
+        if not per_model:
+            yield ",".join(route_names), None
+            return
+        nms_threshold = self.config.detection_settings.roi.nms
+        yield ",".join(route_names), [
+            tiling.merge_results(tile_results, nms_threshold) for tile_results in per_model.values()
+        ]
+
+    @staticmethod
+    def _frame_cache_file() -> Path:
+        return g.config.system.variable_data_path / f"frame-cache_m{g.mid}.json"
+
     def _init_api(self):
         g.api = self.api = ZMApi(g.config.zoneminder)
         self.notifications = Notifications()
 
+    async def _route_responses(
+        self,
+        models_str: str,
+        image: Union[bytes, np.ndarray],
+        image_name: Union[int, str],
+        crop: bool = False,
+    ) -> AsyncIterator[Tuple[str, Optional[List[Dict[str, Any]]]]]:
+        """Send the image to the enabled routes according to the routing mode and yield
+        (route name, results) for each answer that should be processed. Crops skip the frame caches (here and
+        on the server), a similar looking crop of another region would reuse its boxes.
+
+        sequential: one route after another (in weight order), the caller may stop early.
+        hedged: the first route, plus the next one(s) if no answer arrives within hedge_delay. First answer wins.
+        parallel: all routes at once, results are merged.
+        """
+        lp = "detect::"
+        routes = []
+        for route in self.routes:
+            if route.enabled:
+                routes.append(route)
+            else:
+                logger.warning(f"ZM_ML Server route '{route.name}' is disabled!")
+        if not routes:
+            return
+        health_enabled = self.config.mlapi.health.enabled
+        if health_enabled:
+            routes = self.balancer.order(routes)
+
+        async def post(route: ServerRoute):
+            return await self._post_route(route, models_str, image, image_name, crop)
+
+        async def send(route: ServerRoute):
+            if health_enabled:
+                return await self.balancer.send(route, post)
+            return await post(route)
+
+        # near identical frames (static scene) reuse the results of a previous frame/event
+        fhash = None
+        frame_cache = None if crop else self.frame_cache
+        if frame_cache:
+            fhash = frame_hash(image)
+            cached = frame_cache.get(models_str, fhash)
+            if cached is not None:
+                logger.debug(f"{lp} using cached results for '{image_name}'")
+                yield "frame_cache", copy.deepcopy(cached)
+                return
+
+        def cache(results):
+            if frame_cache and results:
+                frame_cache.put(models_str, fhash, copy.deepcopy(results))
+            return results
+
+        mode = self.config.mlapi.mode
+        if mode == RoutingMode.hedged and len(routes) > 1:
+            route, results = await routing.hedged(routes, send, self.config.mlapi.hedge_delay)
+            if route:
+                yield route.name, cache(results)
+            else:
+                logger.error(f"{lp} no route returned results for '{image_name}'")
+        elif mode == RoutingMode.parallel and len(routes) > 1:
+            answered, results = await routing.fan_out(routes, send)
+            yield ",".join(route.name for route in answered), cache(results)
+        else:
+            for route in routes:
+                _perf = perf_counter()
+                results = await send(route)
+                logger.debug(
+                    f"{lp}perf:: HTTP Detection request to '{route.name}' completed in "
+                    f"{perf_counter() - _perf:.5f} seconds // {image_name=}"
+                )
+                yield route.name, cache(results)
+
+    async def _post_route(
+        self,
+        route: ServerRoute,
+        models_str: str,
+        image: Union[bytes, np.ndarray],
+        image_name: Union[int, str],
+        crop: bool = False,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Send an image to a ZM-ML API route and return the (unfiltered) results, crops ask the server to
+        skip its frame cache.
+
+        If the route has streaming enabled, the image is sent over the route's persistent WebSocket session.
+        Otherwise decoded frames (np.ndarray) are sent as raw pixels to /detect/raw, skipping the JPEG encode on
+        this side and the decode on the server, and encoded images (bytes) are sent as multipart to /detect/group.
+        """
+        import aiohttp
+
+        lp = "detect::"
+        results: Optional[List[Dict[str, Any]]] = None
+        session: aiohttp.ClientSession = g.api.async_session
+        if route.stream:
+            stream = self.streams.get(route.name)
+            if stream is None or stream.models_str != models_str:
+                if stream is not None:
+                    await stream.close()
+                stream = self.streams[route.name] = DetectionStream(
+                    session,
+                    f"{route.host}:{route.port}/detect/stream",
+                    models_str,
+                    max_in_flight=route.max_in_flight,
+                    timeout=route.timeout,
+                )
+            logger.debug(f"Streaming image to ZM-ML API ['{route.name}' @ {stream.url}]")
+            try:
+                results = await stream.detect(image, cache=not crop)
+            except Exception as exc:
+                logger.error(f"{lp}route '{route.name}' stream ERROR -> {exc}")
+            return results
+        if isinstance(image, np.ndarray):
+            url = f"{route.host}:{route.port}/detect/raw"
+            frame = np.ascontiguousarray(image)
+            params = {
+                "model_hints": models_str,
+                "width": frame.shape[1],
+                "height": frame.shape[0],
+                "channels": frame.shape[2] if frame.ndim == 3 else 1,
+                "dtype": frame.dtype.name,
+            }
+            if crop:
+                params["cache"] = "false"
+            logger.debug(f"Sending raw frame to ZM-ML API ['{route.name}' @ {url}]")
+            request = session.post(
+                url,
+                params=params,
+                data=memoryview(frame).cast("B"),
+                headers={"Content-Type": "application/octet-stream"},
+            )
+        else:
+            url = f"{route.host}:{route.port}/detect/group"
+            mpwriter = aiohttp.MultipartWriter("form-data")
+            part = mpwriter.append_json(models_str)
+            part.set_content_disposition("form-data", name="model_hints")
+            part = mpwriter.append(
+                image,
+                {"Content-Type": "image/jpeg"},
+            )
+            part.set_content_disposition(
+                "form-data", name="image", filename=str(image_name)
+            )
+            logger.debug(f"Sending image to ZM-ML API ['{route.name}' @ {url}]")
+            request = session.post(
+                url,
+                params={"cache": "false"} if crop else None,
+                data=mpwriter,
+            )
+        r: aiohttp.ClientResponse
+        async with request as r:
+            status = r.status
+            if status == 200:
+                if r.content_type == "application/json":
+                    results = await r.json()
+                else:
+                    logger.error(
+                        f"{lp} Route '{route.name}' returned a non-json response! \n{r}"
+                    )
+            else:
+                logger.error(
+                    f"{lp}route '{route.name}' returned ERROR status {status} \n{r}"
+                )
+        return results
+
     @staticmethod
     async def convert_to_cv2(image: Union[np.ndarray, bytes]):
         # convert the numpy image to OpenCV format
@@ -649,10 +825,15 @@ class ZMClient:
             g.mid = mid
             await init_logs(g.config)
 
-        self.static_objects.filename = (
-            g.config.system.variable_data_path / f"static-objects_m{g.mid}.pkl"
-        )
-        self.static_objects.pickle()
+        self.static_objects = StaticObjectHistory(
+            g.config.system.variable_data_path / f"static-objects_m{g.mid}.npy",
+            depth=g.config.matching.static_objects.history,
+        ).load()
+        cache_cfg = self.config.mlapi.frame_cache
+        if cache_cfg.enabled:
+            self.frame_cache = FrameCache(
+                cache_cfg.max_distance, cache_cfg.ttl, cache_cfg.max_entries, logger=logger
+            ).load(self._frame_cache_file())
         # init Image Pipeline
         logger.debug(f"{lp} Initializing Image Pipeline...")
         img_pull_method = self.config.detection_settings.images.pull_method
@@ -713,11 +894,10 @@ class ZMClient:
         # build each zones filters as they won't change, check points and resolution for scaling
         zones = self.zones.copy()
         mon_res = (g.mon_width, g.mon_height)
+        # zone filters are combined on demand, see _zone_filters()
+        self._monitor_filters = combined_filters
+        self.zone_filters = {}
         for zone_name, zone_data in zones.items():
-            cp_fltrs = copy.deepcopy(combined_filters)
-            self.zone_filters[zone_name] = self.combine_filters(
-                cp_fltrs, self.zones[zone_name].filters
-            )
             if zone_data.enabled is False:
                 continue
             if not zone_data.points:
@@ -741,10 +921,21 @@ class ZMClient:
                 )
                 self.zones[zone_name].points = zone_points
         del zones
+        gate_cfg = self.config.detection_settings.motion_gate
+        if gate_cfg.enabled:
+            self.motion_gate = MotionGate(
+                threshold=gate_cfg.threshold,
+                pixel_delta=gate_cfg.pixel_delta,
+                width=gate_cfg.width,
+                max_skips=gate_cfg.max_skips,
+                zones=[
+                    z.points for z in self.zones.values() if z.enabled is not False and z.points
+                ] if gate_cfg.zones else None,
+                resolution=mon_res,
+            )
         # logger.debug(f"'DBG'>>> Zone filters: \n\n{self.zone_filters} <<<DBG\n")
         image: Union[bytes, np.ndarray, None]
         matched_l, matched_c, matched_b = [], [], []
-        import aiohttp
 
         while self.image_pipeline.is_image_stream_active():
             image, image_name = await self.image_pipeline.get_image()
@@ -775,166 +966,147 @@ class ZMClient:
                 logger.debug(
                     f"{lp}animations:: Added image to frame buffer: {image_name} -- {type(image)=}"
                 )
+            if self.motion_gate:
+                analyse, score = self.motion_gate.check(image, image_name)
+                if not analyse:
+                    # nothing moved since the last analysed frame
+                    self.filtered_labels[str(image_name)] = [("!motion_gate!", score, None)]
+                    continue
             results: Optional[List[Dict[str, Any]]] = None
-            for route in self.routes:
-                if route.enabled:
-                    url = f"{route.host}:{route.port}/detect/group"
-                    with aiohttp.MultipartWriter("form-data") as mpwriter:
-                        part = mpwriter.append_json(models_str)
-                        part.set_content_disposition("form-data", name="model_hints")
-
-                        part = mpwriter.append(
-                            image,
-                            {"Content-Type": "image/jpeg"},
-                        )
-                        part.set_content_disposition(
-                            "form-data", name="image", filename=image_name
-                        )
-                        logger.debug(f"Sending image to ZM-ML API ['{route.name}' @ {url}]")
-                        _perf = perf_counter()
-                        r: aiohttp.ClientResponse
-                        session: aiohttp.ClientSession = g.api.async_session
-                        async with session.post(
-                            url,
-                            data=mpwriter,
-                        ) as r:
-                            status = r.status
-                            if status == 200:
-                                if r.content_type == "application/json":
-                                    results = await r.json()
-                                else:
-                                    logger.error(
-                                        f"{lp} Route '{route.name}' returned a non-json response! \n{r}"
-                                    )
-                            else:
-                                logger.error(
-                                    f"{lp}route '{route.name}' returned ERROR status {status} \n{r}"
-                                )
-                    if img_pull_method.api.enabled is True:
-                        assert isinstance(
-                            image, bytes
-                        ), "Image is not bytes after getting from pipeline"
-                        image: bytes
-                        image_name = int(str(image_name).split("fid_")[1].split(".")[0])
-
-                    if image_name not in final_detections:
-                        final_detections[str(image_name)] = []
-                    if image_name not in self.filtered_labels:
-                        self.filtered_labels[str(image_name)] = []
-                    if results:
-                        image = await self.convert_to_cv2(image)
-                        assert isinstance(
-                            image, np.ndarray
-                        ), "Image is not np.ndarray after converting from bytes"
-                        image: np.ndarray
-                        logger.debug(
-                            f"There are {len(results)} UNFILTERED Results for image '{image_name}' => {results}"
-                        )
-                        filter_start = perf_counter()
-                        res_loop = 0
-                        for result in results:
-                            res_loop += 1
-
-                            if result["success"] is True:
-                                filtered_result = await self.filter_detections(
-                                    result, image_name
-                                )
-                                # check strategy
-                                strategy: MatchStrategy = g.config.matching.strategy
-                                if filtered_result["success"] is True:
-                                    final_label = filtered_result["label"]
-                                    final_confidence = filtered_result["confidence"]
-                                    final_bbox = filtered_result["bounding_box"]
+            if self.config.detection_settings.roi.enabled:
+                responses = self._roi_responses(models_str, image, image_name)
+            else:
+                responses = self._route_responses(models_str, image, image_name)
+            async for route_name, results in responses:
+                _perf = perf_counter()
+                if img_pull_method.api.enabled is True:
+                    assert isinstance(
+                        image, bytes
+                    ), "Image is not bytes after getting from pipeline"
+                    image: bytes
+                    image_name = int(str(image_name).split("fid_")[1].split(".")[0])
+
+                if image_name not in final_detections:
+                    final_detections[str(image_name)] = []
+                if image_name not in self.filtered_labels:
+                    self.filtered_labels[str(image_name)] = []
+                if results:
+                    image = await self.convert_to_cv2(image)
+                    assert isinstance(
+                        image, np.ndarray
+                    ), "Image is not np.ndarray after converting from bytes"
+                    image: np.ndarray
+                    logger.debug(
+                        f"There are {len(results)} UNFILTERED Results for image '{image_name}' => {results}"
+                    )
+                    filter_start = perf_counter()
+                    res_loop = 0
+                    for result in results:
+                        res_loop += 1
+
+                        if result["success"] is True:
+                            filtered_result = await self.filter_detections(
+                                result, image_name
+                            )
+                            # check strategy
+                            strategy: MatchStrategy = g.config.matching.strategy
+                            if filtered_result["success"] is True:
+                                final_label = filtered_result["label"]
+                                final_confidence = filtered_result["confidence"]
+                                final_bbox = filtered_result["bounding_box"]
 
-                                    if (
-                                        (strategy == MatchStrategy.first)
-                                        or (
-                                            (strategy == MatchStrategy.most)
-                                            and (len(final_label) > len(matched_l))
-                                        )
-                                        or (
-                                            (strategy == MatchStrategy.most)
-                                            and (len(final_label) == len(matched_l))
-                                            and (sum(matched_c) < sum(final_confidence))
-                                        )
-                                        # or (
-                                        # (frame_strategy == "most_models")
-                                        # and (len(item["detection_types"]) > len(matched_detection_types))
-                                        # )
-                                        #         or (
-                                        #         (strategy == "most_models")
-                                        #         and (len(item["detection_types"]) == len(matched_detection_types))
-                                        #         and (sum(matched_c) < sum(item["confidences"]))
-                                        # )
-                                        or (
-                                            (strategy == MatchStrategy.most_unique)
-                                            and (
-                                                len(set(final_label))
-                                                > len(set(matched_l))
-                                            )
-                                        )
-                                        or (
-                                            # tiebreaker using sum of confidences
-                                            (strategy == MatchStrategy.most_unique)
-                                            and (
-                                                len(set(final_label))
-                                                == len(set(matched_l))
-                                            )
-                                            and (sum(matched_c) < sum(final_confidence))
+                                if (
+                                    (strategy == MatchStrategy.first)
+                                    or (
+                                        (strategy == MatchStrategy.most)
+                                        and (len(final_label) > len(matched_l))
+                                    )
+                                    or (
+                                        (strategy == MatchStrategy.most)
+                                        and (len(final_label) == len(matched_l))
+                                        and (sum(matched_c) < sum(final_confidence))
+                                    )
+                                    # or (
+                                    # (frame_strategy == "most_models")
+                                    # and (len(item["detection_types"]) > len(matched_detection_types))
+                                    # )
+                                    #         or (
+                                    #         (strategy == "most_models")
+                                    #         and (len(item["detection_types"]) == len(matched_detection_types))
+                                    #         and (sum(matched_c) < sum(item["confidences"]))
+                                    # )
+                                    or (
+                                        (strategy == MatchStrategy.most_unique)
+                                        and (
+                                            len(set(final_label))
+                                            > len(set(matched_l))
                                         )
-                                    ):
-                                        logger.debug(
-                                            f"\n\nFOUND A BETTER MATCH [{strategy=}] THAN model: {matched_model_names}"
-                                            f" image name: {matched_frame_id}: LABELS: {matched_l} with "
-                                            f" model: {result['model_name']} image name: {image_name} ||| "
-                                            f"LABELS: {final_label}\n\n"
+                                    )
+                                    or (
+                                        # tiebreaker using sum of confidences
+                                        (strategy == MatchStrategy.most_unique)
+                                        and (
+                                            len(set(final_label))
+                                            == len(set(matched_l))
                                         )
-                                        # matched_poly = item['bbox2poly']
-                                        matched_l = final_label
-                                        matched_model_names = result["model_name"]
-                                        matched_c = final_confidence
-                                        matched_frame_id = image_name
-                                        matched_detection_types = result["type"]
-                                        matched_b = final_bbox
-                                        matched_processor = result["processor"]
-                                        matched_e = self.filtered_labels[
-                                            str(image_name)
-                                        ]
-                                        matched_frame_img = image.copy()
-
-                                    final_detections[str(image_name)].append(
-                                        filtered_result
+                                        and (sum(matched_c) < sum(final_confidence))
                                     )
-
-                                logger.debug(
-                                    f"perf:: Filtering for {image_name}:{result['model_name']} took "
-                                    f"{perf_counter() - filter_start:.5f} seconds"
+                                ):
+                                    logger.debug(
+                                        f"\n\nFOUND A BETTER MATCH [{strategy=}] THAN model: {matched_model_names}"
+                                        f" image name: {matched_frame_id}: LABELS: {matched_l} with "
+                                        f" model: {result['model_name']} image name: {image_name} ||| "
+                                        f"LABELS: {final_label}\n\n"
+                                    )
+                                    # matched_poly = item['bbox2poly']
+                                    matched_l = final_label
+                                    matched_model_names = result["model_name"]
+                                    matched_c = final_confidence
+                                    matched_frame_id = image_name
+                                    matched_detection_types = result["type"]
+                                    matched_b = final_bbox
+                                    matched_processor = result["processor"]
+                                    matched_e = self.filtered_labels[
+                                        str(image_name)
+                                    ]
+                                    matched_frame_img = image.copy()
+
+                                final_detections[str(image_name)].append(
+                                    filtered_result
                                 )
 
-                            else:
-                                logger.warning(
-                                    f"Result was not successful, not filtering"
-                                )
+                            logger.debug(
+                                f"perf:: Filtering for {image_name}:{result['model_name']} took "
+                                f"{perf_counter() - filter_start:.5f} seconds"
+                            )
+
+                        else:
+                            logger.warning(
+                                f"Result was not successful, not filtering"
+                            )
 
-                            if strategy == MatchStrategy.first and matched_l:
-                                logger.debug(
-                                    f"Strategy is 'first' and there is a filtered match, breaking RESULT "
-                                    f"LOOP {res_loop}"
-                                )
-                                break
                         if strategy == MatchStrategy.first and matched_l:
                             logger.debug(
-                                f"Strategy is 'first' and there is a filtered match, breaking RESULT LOOP {res_loop}"
+                                f"Strategy is 'first' and there is a filtered match, breaking RESULT "
+                                f"LOOP {res_loop}"
                             )
                             break
-                else:
-                    logger.warning(f"ZM_ML Server route '{route.name}' is disabled!")
+                    if strategy == MatchStrategy.first and matched_l:
+                        logger.debug(
+                            f"Strategy is 'first' and there is a filtered match, breaking RESULT LOOP {res_loop}"
+                        )
+                        break
 
                 logger.debug(
-                    f"{lp}perf:: HTTP Detection request to '{route.name}' completed in "
+                    f"{lp}perf:: Processing results from '{route_name}' completed in "
                     f"{perf_counter() - _perf:.5f} seconds // {image_name=}"
                 )
         logger.debug(f"{lp} OUT OF WHILE LOOP (image/image_name while loop)")
+        if self.motion_gate:
+            logger.debug(f"{lp} motion gate stats: {self.motion_gate.stats()}")
+        if self.frame_cache:
+            logger.debug(f"{lp} frame cache stats: {self.frame_cache.stats()}")
+            self.frame_cache.save(self._frame_cache_file())
         logger.debug(
             f"perf:: Total detections time {perf_counter() - _start:.5f} seconds"
         )
@@ -958,9 +1130,7 @@ class ZMClient:
             self.post_process(matched)
             matched.pop("frame_img")
             logger.debug(f"Writing static_objects to disk")
-            self.static_objects.pickle(
-                labels=matched_l, confs=matched_c, bboxs=matched_b, write=True
-            )
+            self.static_objects.save(g.eid, matched_l, matched_c, matched_b)
             return matched
         return {}
 
@@ -1003,6 +1173,57 @@ class ZMClient:
         logger.debug(f"DBG>>> FILTERED RESULT: {filtered_result} <<<DBG")
         return filtered_result
 
+    def _zone_filters(self, zone_name: str) -> Dict:
+        """Global+monitor+zone filters of a zone (dict), combined the first time they are needed"""
+        if zone_name not in self.zone_filters:
+            comb_filters = self._comb_filters
+            self.zone_filters[zone_name] = self.combine_filters(
+                copy.deepcopy(self._monitor_filters), self.zones[zone_name].filters
+            )
+            # combine_filters() stores its output in _comb_filters, keep the monitor level filters there
+            self._comb_filters = comb_filters
+        return self.zone_filters[zone_name]
+
+    def _filter_plan(self, zone_name: str, label: str, type_: str) -> FilterPlan:
+        """Cached, read only filter values for a label in a zone"""
+        return plan_cache.get(
+            self.config_hash,
+            (g.mid, zone_name, label, type_),
+            lambda: self._zone_filters(zone_name),
+        )
+
+    def _compile_zones(self) -> CompiledZones:
+        """Compiled geometry of the current zones, re-compiled only when the zones, the zone evaluation mode
+        or (raster mode) the monitor resolution change"""
+        signature = CompiledZones.signature_of(self.zones)
+        raster = g.config.matching.zone_evaluation == ZoneEvaluation.raster
+        resolution = (g.mon_width, g.mon_height)
+        compiled = self._compiled_zones
+        if (
+            compiled is None
+            or compiled.signature != signature
+            or isinstance(compiled, RasterZones) != raster
+            or (
+                raster
+                and (
+                    compiled.resolution != resolution
+                    or compiled.max_size != g.config.matching.raster_size
+                )
+            )
+        ):
+            if raster:
+                compiled = RasterZones(
+                    self.zones,
+                    resolution,
+                    cache_dir=g.config.system.variable_data_path / "zone_masks",
+                    max_size=g.config.matching.raster_size,
+                )
+            else:
+                compiled = CompiledZones(self.zones)
+            self._compiled_zones = compiled
+            self.zone_polygons = list(compiled.polygons)
+        return compiled
+
     @staticmethod
     def _bbox2points(bbox: List) -> list[tuple[tuple[Any, Any], tuple[Any, Any]]]:
         """Convert bounding box coords to a Polygon acceptable input for shapely."""
@@ -1025,9 +1246,6 @@ class ZMClient:
         """Filter detections using 2 loops, first loop is filter by object label, second loop is to filter by zone."""
         r_label, r_conf, r_bbox = [], [], []
         zones = self.zones.copy()
-        zone_filters = self.zone_filters
-        object_label_filters = {}
-        final_filters = None
         base_filters = None
         # strategy: MatchStrategy = g.config.matching.strategy
         type_ = result["type"]
@@ -1041,6 +1259,9 @@ class ZMClient:
         i = 0
         zone_name: str
         zone_data: MonitorZones
+        compiled = self._compile_zones()
+        # every box against every zone in one pass
+        matrix = compiled.evaluate(result["bounding_box"])
 
         def filter_out(lbl, cnf, box):
             """Filter out detections"""
@@ -1061,6 +1282,7 @@ class ZMClient:
             result["confidence"],
             result["bounding_box"],
         ):
+            box_idx = i
             i += 1
             _lp = f"_filter:{image_name}:'{model_name}'::{type_}::'{label}' {i}/{_lbl_tot}::"
 
@@ -1082,77 +1304,17 @@ class ZMClient:
                         f" or forget to add points? SKIPPING..."
                     )
                     continue
-                zone_points = zone_data.points
-                zone_polygon = Polygon(zone_points)
-                if zone_polygon not in self.zone_polygons:
-                    self.zone_polygons.append(zone_polygon)
-                bbox_polygon = Polygon(self._bbox2points(bbox))
+                zone_col = compiled.index[zone_name]
+                zone_polygon = compiled.polygons[zone_col]
+                zone_area = compiled.areas[zone_col]
+                box_area = matrix.box_area[box_idx]
+                inter_area = matrix.inter_area[box_idx, zone_col]
 
-                if bbox_polygon.intersects(zone_polygon):
+                if matrix.intersects[box_idx, zone_col]:
                     logger.debug(
                         f"{__lp} inside of Zone '{zone_name}' @ {list(zip(*zone_polygon.exterior.coords.xy))[:-1]}"
                     )
-                    if zone_name in zone_filters and zone_filters[zone_name]:
-                        # logger.debug(f"{lp} zone '{zone_name}' has filters")
-                        final_filters = zone_filters[zone_name]
-                    else:
-                        # logger.debug(
-                        #     f"{lp} zone '{zone_name}' has NO filters, using COMBINED global+monitor filters"
-                        # )
-                        final_filters = self._comb_filters
-                    if isinstance(final_filters, dict) and isinstance(
-                        final_filters.get("object"), dict
-                    ):
-
-                        # logger.debug(
-                        #     f"{type(final_filters)=} -- {type(object_label_filters)=}\n\n{final_filters=}\n\n"
-                        # )
-                        object_label_filters = final_filters["object"]["labels"]
-                        # logger.debug(f"\nFINAL FILTERS as DICT {final_filters=}\n\n")
-                        if object_label_filters and label in object_label_filters:
-                            if object_label_filters[label]:
-                                logger.debug(
-                                    f"{__lp} '{label}' IS IN per label filters for zone '{zone_name}'"
-                                )
-
-                                for k, v in object_label_filters[label].items():
-                                    if (
-                                        v is not None
-                                        and final_filters["object"][k] != v
-                                    ):
-                                        # logger.debug(
-                                        #     f"{lp} Overriding object:'{k}' [{final_filters['object'][k]}] "
-                                        #     f"with ZONE object:labels:{k} filter VALUE={v}"
-                                        # )
-                                        final_filters["object"][k] = v
-                        else:
-                            logger.debug(f"{__lp} NOT IN per label filters")
-
-                        final_filters = self.construct_filter(final_filters)
-                        # logger.debug(
-                        #     f"\n\nFINAL FILTERS 'AFTER' CONSTRUCTING [{type(final_filters)}]\n\n"
-                        # )
-                        self.zone_filters[zone_name] = final_filters
-                        # logger.debug(
-                        #     f"\n\n'AFTER' SAVING TO ZONE FILTERS: {self.zone_filters=} \n\n"
-                        # )
-
-                    type_filter: Union[
-                        OverRideObjectFilters,
-                        OverRideFaceFilters,
-                        OverRideAlprFilters,
-                        None,
-                    ] = None
-                    if type_ == "object":
-                        type_filter = final_filters.object
-                    elif type_ == "face":
-                        type_filter = final_filters.face
-                    elif type_ == "alpr":
-                        type_filter = final_filters.alpr
-
-                    # logger.debug(
-                    #     f"{_lp} SORTED by {type_} -- FINAL filters => \n{type_filter}\n"
-                    # )
+                    type_filter = self._filter_plan(zone_name, label, type_)
                     pattern = type_filter.pattern
                     #
                     # Start filtering
@@ -1209,16 +1371,16 @@ class ZMClient:
                                         )
                                         max_object_area_of_image = h * w
                                     if max_object_area_of_image:
-                                        if bbox_polygon.area > max_object_area_of_image:
+                                        if box_area > max_object_area_of_image:
                                             logger.debug(
-                                                f"{lp} {bbox_polygon.area:.2f} is larger then the max allowed: "
+                                                f"{lp} {box_area:.2f} is larger then the max allowed: "
                                                 f"{max_object_area_of_image:.2f},"
                                                 f"\n\nREMOVING REMOVING REMOVING REMOVING REMOVING REMOVING...\n\n"
                                             )
                                             continue
                                         else:
                                             logger.debug(
-                                                f"{lp} {bbox_polygon.area:.2f} is smaller then the TOTAL (image w*h) "
+                                                f"{lp} {box_area:.2f} is smaller then the TOTAL (image w*h) "
                                                 f"max allowed: {max_object_area_of_image:.2f}, ALLOWING..."
                                             )
                                 else:
@@ -1233,7 +1395,7 @@ class ZMClient:
                                             min_object_area_of_image = h * w
                                         else:
                                             min_object_area_of_image = (
-                                                tmia * zone_polygon.area
+                                                tmia * zone_area
                                             )
                                             logger.debug(
                                                 f"{lp} converted {tmia * 100.00}% of {w}*{h}->{w * h:.2f} to "
@@ -1249,16 +1411,16 @@ class ZMClient:
                                         min_object_area_of_image = 1
                                     if min_object_area_of_image:
                                         if (
-                                            bbox_polygon.area
+                                            box_area
                                             >= min_object_area_of_image
                                         ):
                                             logger.debug(
-                                                f"{lp} {bbox_polygon.area:.2f} is LARGER THEN OR EQUAL TO the "
+                                                f"{lp} {box_area:.2f} is LARGER THEN OR EQUAL TO the "
                                                 f"TOTAL min allowed: {min_object_area_of_image:.2f}, ALLOWING..."
                                             )
                                         else:
                                             logger.debug(
-                                                f"{lp} {bbox_polygon.area:.2f} is smaller then the TOTAL min allowed"
+                                                f"{lp} {box_area:.2f} is smaller then the TOTAL min allowed"
                                                 f": {min_object_area_of_image:.2f}, "
                                                 f"\n\nREMOVING REMOVING REMOVING REMOVING REMOVING REMOVING...\n\n"
                                             )
@@ -1273,39 +1435,39 @@ class ZMClient:
                                     if isinstance(max_area, float):
                                         if max_area >= 1.0:
                                             max_area = 1.0
-                                            max_object_area_of_zone = zone_polygon.area
+                                            max_object_area_of_zone = zone_area
                                         else:
                                             max_object_area_of_zone = (
-                                                max_area * zone_polygon.area
+                                                max_area * zone_area
                                             )
                                             logger.debug(
                                                 f"{lp} converted {max_area * 100.00}% of '{zone_name}'->"
-                                                f"{zone_polygon.area:.2f} to {max_object_area_of_zone} pixels",
+                                                f"{zone_area:.2f} to {max_object_area_of_zone} pixels",
                                             )
-                                        if max_object_area_of_zone > zone_polygon.area:
-                                            max_object_area_of_zone = zone_polygon.area
+                                        if max_object_area_of_zone > zone_area:
+                                            max_object_area_of_zone = zone_area
                                     elif isinstance(max_area, int):
                                         max_object_area_of_zone = max_area
                                     else:
                                         logger.warning(
                                             f"{lp} Unknown type for max_area, defaulting to PIXELS "
-                                            f"of zone ({zone_polygon.area})"
+                                            f"of zone ({zone_area})"
                                         )
-                                        max_object_area_of_zone = zone_polygon.area
+                                        max_object_area_of_zone = zone_area
                                     if max_object_area_of_zone:
                                         if (
-                                            bbox_polygon.intersection(zone_polygon).area
+                                            inter_area
                                             > max_object_area_of_zone
                                         ):
                                             logger.debug(
-                                                f"{lp} BBOX AREA [{bbox_polygon.area:.2f}] is larger than the "
+                                                f"{lp} BBOX AREA [{box_area:.2f}] is larger than the "
                                                 f"max allowed: {max_object_area_of_zone:.2f},"
                                                 f"\n\nREMOVING REMOVING REMOVING REMOVING REMOVING REMOVING...\n\n"
                                             )
                                             continue
                                         else:
                                             logger.debug(
-                                                f"{lp} '{label}' BBOX AREA [{bbox_polygon.area:.2f}] is smaller "
+                                                f"{lp} '{label}' BBOX AREA [{box_area:.2f}] is smaller "
                                                 f"than the "
                                                 f"max allowed: {max_object_area_of_zone:.2f}, ALLOWING..."
                                             )
@@ -1319,38 +1481,38 @@ class ZMClient:
                                     if isinstance(min_area, float):
                                         if min_area >= 1.0:
                                             min_area = 1.0
-                                            min_object_area_of_zone = zone_polygon.area
+                                            min_object_area_of_zone = zone_area
                                         else:
                                             min_object_area_of_zone = (
-                                                min_area * zone_polygon.area
+                                                min_area * zone_area
                                             )
                                             logger.debug(
-                                                f"{lp} converted {min_area * 100.00}% of '{zone_name}'->{zone_polygon.area:.5f}"
+                                                f"{lp} converted {min_area * 100.00}% of '{zone_name}'->{zone_area:.5f}"
                                                 f" to {min_object_area_of_zone} pixels",
                                             )
                                         if (
                                             min_object_area_of_zone
                                             and min_object_area_of_zone
-                                            > zone_polygon.area
+                                            > zone_area
                                         ):
-                                            min_object_area_of_zone = zone_polygon.area
+                                            min_object_area_of_zone = zone_area
                                     elif isinstance(min_area, int):
                                         min_object_area_of_zone = min_area
                                     else:
                                         min_object_area_of_zone = 1
                                     if (
                                         min_object_area_of_zone
-                                        and bbox_polygon.intersection(zone_polygon).area
+                                        and inter_area
                                         > min_object_area_of_zone
                                     ):
                                         logger.debug(
-                                            f"{lp} '{label}' BBOX AREA [{bbox_polygon.area:.5f}] is larger then the "
+                                            f"{lp} '{label}' BBOX AREA [{box_area:.5f}] is larger then the "
                                             f"min allowed: {min_object_area_of_zone:.5f}, ALLOWING..."
                                         )
 
                                     else:
                                         logger.debug(
-                                            f"{lp} '{label}' BBOX AREA [{bbox_polygon.area:.5f}] is smaller then the "
+                                            f"{lp} '{label}' BBOX AREA [{box_area:.5f}] is smaller then the "
                                             f"min allowed: {min_object_area_of_zone:.5f},"
                                             f"\n\nNO MATCH, SKIPPING...\n\n"
                                         )
@@ -1388,7 +1550,7 @@ class ZMClient:
                                         f"{__lp} 'static_objects' enabled, checking for matches"
                                     )
                                     if self.check_for_static_objects(
-                                        label, confidence, bbox_polygon, zone_name
+                                        label, confidence, bbox, zone_name
                                     ):
                                         # success
                                         logger.debug(
@@ -1478,22 +1640,18 @@ class ZMClient:
             logger.debug(f"{lp} pull_method is API, grabbing images from API")
 
     def check_for_static_objects(
-        self, current_label, current_confidence, current_bbox_polygon, zone_name
+        self, current_label, current_confidence, current_bbox, zone_name
     ) -> bool:
         """Check for static objects in the frame
         :param current_label:
         :param current_confidence:
-        :param current_bbox_polygon:
+        :param current_bbox: x1, y1, x2, y2
         """
 
         lp = f"check_for_static_objects::"
         logger.debug(f"{lp} STARTING...")
         aliases: Dict = g.config.label_groups
         mda = g.config.matching.static_objects.difference
-        _labels: Optional[List[str]] = self.static_objects.labels
-        _confs: Optional[List[float]] = self.static_objects.confidence
-        _bboxes: Optional[List[List[int]]] = self.static_objects.bbox
-        match_labels: Optional[List[str]] = g.config.matching.static_objects.labels
         mon_filt = g.config.monitors.get(g.mid)
         zone_filt: Optional[MonitorZones] = None
         if mon_filt and zone_name in mon_filt.zones:
@@ -1504,13 +1662,9 @@ class ZMClient:
             mda = mon_filt.static_objects.difference
         if zone_filt and zone_filt.static_objects.difference:
             mda = zone_filt.static_objects.difference
-        if mon_filt and mon_filt.static_objects.labels:
-            match_labels = mon_filt.static_objects.labels
-        if zone_filt and zone_filt.static_objects.labels:
-            match_labels = zone_filt.static_objects.labels
 
         # todo: inherit ignore_labels from monitor and zone
-        ignore_labels: Optional[List[str]] = (
+        ignore_labels: List[str] = list(
             g.config.matching.static_objects.ignore_labels or []
         )
         if mon_filt and mon_filt.static_objects.labels:
@@ -1526,143 +1680,54 @@ class ZMClient:
             logger.debug(
                 f"{lp} {current_label} is in static_objects:ignore_labels: {ignore_labels}, skipping",
             )
+            return True
+        logger.debug(
+            f"{lp} max difference between current and past object area found! -> {mda}"
+        )
+        if isinstance(mda, float):
+            if mda >= 1.0:
+                mda = 1.0
+        elif not isinstance(mda, int):
+            logger.warning(f"{lp} Unknown type for difference, defaulting to 5%")
+            mda = 0.05
+        history = self.static_objects
+        if not len(history):
+            logger.debug(
+                f"{lp} no saved detections to compare to, allowing '{current_label}'"
+            )
+            return True
+        # compare against every saved detection of the same label (or label group) at once
+        candidates = history.candidates(current_label, aliases)
+        if not candidates.any():
+            logger.debug(
+                f"{lp} no saved objects equal to or in the same label group as '{current_label}', allowing"
+            )
+            return True
+        intersects, diff_area, max_diff = compare_boxes(
+            history.bbox[candidates], current_bbox, mda
+        )
+        same_spot = intersects & (diff_area <= max_diff)
+        if same_spot.any():
+            idx = int(np.flatnonzero(same_spot)[0])
+            logger.debug(
+                f"{lp} removing '{current_label}' as it seems to be approximately in the same spot"
+                f" as it was detected in a previous event (PAST->{history.bbox[candidates][idx].tolist()} "
+                f"CURR->{list(current_bbox)}) based on '{mda}' -> Difference in pixels: {diff_area[idx]:.2f} "
+                f"- Configured maximum difference in pixels: {max_diff[idx]:.2f}"
+            )
+            return False
+        if intersects.any():
+            logger.debug(
+                f"{lp} allowing '{current_label}' -> the smallest difference in area to "
+                f"{int(intersects.sum())} overlapping past detection(s) is "
+                f"'{diff_area[intersects].min():.2f}' pixels, more than allowed to be considered "
+                f"'in the same spot'",
+            )
         else:
             logger.debug(
-                f"{lp} max difference between current and past object area found! -> {mda}"
+                f"{lp} current detection '{current_label}' is not near enough to any of the "
+                f"{int(candidates.sum())} past detection(s) to evaluate for match past detection filter"
             )
-            if isinstance(mda, float):
-                if mda >= 1.0:
-                    mda = 1.0
-            elif isinstance(mda, int):
-                pass
-
-            else:
-                logger.warning(f"{lp} Unknown type for difference, defaulting to 5%")
-                mda = 0.05
-            if _labels:
-                for saved_label, saved_conf, saved_bbox in zip(
-                    _labels, _confs, _bboxes
-                ):
-
-                    # compare current detection element with saved list from file
-                    found_alias_grouping = False
-                    # check if it is in a label group
-                    if saved_label != current_label:
-                        if aliases:
-                            logger.debug(
-                                f"{lp} currently detected object does not match saved object, "
-                                f"checking label_groups for an aliased match"
-                            )
-
-                            for alias, alias_group in aliases.items():
-                                if (
-                                    saved_label in alias_group
-                                    and current_label in alias_group
-                                ):
-                                    logger.debug(
-                                        f"{lp} saved and current object are in the same label group [{alias}]"
-                                    )
-                                    found_alias_grouping = True
-                                    break
-
-                    elif saved_label == current_label:
-                        found_alias_grouping = True
-                    if not found_alias_grouping:
-                        logger.debug(
-                            f"{lp} saved and current object are not equal or in the same label group, skipping"
-                        )
-                        continue
-                    # Found a match by label/group, now compare the area using Polygon
-                    try:
-                        past_label_polygon = Polygon(self._bbox2points(saved_bbox))
-                    except Exception as e:
-                        logger.error(
-                            f"{lp} Error converting saved_bbox to polygon: {e}, skipping"
-                        )
-                        continue
-                    max_diff_pixels = None
-                    diff_area = None
-                    logger.debug(
-                        f"{lp} comparing '{current_label}' PAST->{saved_bbox} to CURR->{list(zip(*current_bbox_polygon.exterior.coords.xy))[:-1]}",
-                    )
-                    if past_label_polygon.intersects(
-                        current_bbox_polygon
-                    ) or current_bbox_polygon.intersects(past_label_polygon):
-                        if past_label_polygon.intersects(current_bbox_polygon):
-                            logger.debug(
-                                f"{lp} the PAST object INTERSECTS the new object",
-                            )
-                        else:
-                            logger.debug(
-                                f"{lp} the current object INTERSECTS the PAST object",
-                            )
-
-                        if current_bbox_polygon.contains(past_label_polygon):
-                            diff_area = current_bbox_polygon.difference(
-                                past_label_polygon
-                            ).area
-                            if isinstance(mda, float):
-                                max_diff_pixels = current_bbox_polygon.area * mda
-                                logger.debug(
-                                    f"{lp} converted {mda * 100:.2f}% difference from '{current_label}' "
-                                    f"is {max_diff_pixels} pixels"
-                                )
-                            elif isinstance(mda, int):
-                                max_diff_pixels = mda
-                        else:
-                            diff_area = past_label_polygon.difference(
-                                current_bbox_polygon
-                            ).area
-                            if isinstance(mda, float):
-                                max_diff_pixels = past_label_polygon.area * mda
-                                logger.debug(
-                                    f"{lp} converted {mda * 100:.2f}% difference from '{saved_label}' "
-                                    f"is {max_diff_pixels} pixels"
-                                )
-                            elif isinstance(mda, int):
-                                max_diff_pixels = mda
-                        if diff_area is not None and diff_area <= max_diff_pixels:
-                            logger.debug(
-                                f"{lp} removing '{current_label}' as it seems to be approximately in the same spot"
-                                f" as it was detected last time based on '{mda}' -> Difference in pixels: {diff_area} "
-                                f"- Configured maximum difference in pixels: {max_diff_pixels}"
-                            )
-                            return False
-                            # if saved_bbox not in mpd_b:
-                            #     logger.debug(
-                            #         f"{lp} appending this saved object to the mpd "
-                            #         f"buffer as it has removed a detection and should be propagated "
-                            #         f"to the next event"
-                            #     )
-                            #     mpd_b.append(saved_bs[saved_idx])
-                            #     mpd_l.append(saved_label)
-                            #     mpd_c.append(saved_cs[saved_idx])
-                            # new_err.append(b)
-                        elif diff_area is not None and diff_area > max_diff_pixels:
-                            logger.debug(
-                                f"{lp} allowing '{current_label}' -> the difference in the area of last detection "
-                                f"to this detection is '{diff_area:.2f}', a minimum of {max_diff_pixels:.2f} "
-                                f"is needed to not be considered 'in the same spot'",
-                            )
-                            return True
-                        elif diff_area is None:
-                            logger.debug(
-                                f"DEBUG>>>'MPD' {diff_area = } - whats the issue?"
-                            )
-                        else:
-                            logger.debug(
-                                f"WHATS GOING ON? {diff_area = } -- {max_diff_pixels = }"
-                            )
-                    # Saved does not intersect the current object/label
-                    else:
-                        logger.debug(
-                            f"{lp} current detection '{current_label}' is not near enough to '"
-                            f"{saved_label}' to evaluate for match past detection filter"
-                        )
-            else:
-                logger.debug(
-                    f"{lp} no saved detections to compare to, allowing '{current_label}'"
-                )
         return True
 
     @staticmethod
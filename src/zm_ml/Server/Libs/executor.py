@@ -0,0 +1,77 @@
+"""Long-lived, bounded executor used to run blocking inference and image decoding off the event loop."""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from logging import getLogger
+from typing import Callable, Any
+
+from ..Log import SERVER_LOGGER_NAME
+
+logger = getLogger(SERVER_LOGGER_NAME)
+LP: str = "Executor:"
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the executor queue is full, the API responds with a 503 and a Retry-After header"""
+
+    def __init__(self, pending: int, retry_after: int):
+        self.pending = pending
+        self.retry_after = retry_after
+        super().__init__(
+            f"Inference queue is full ({pending} jobs pending), retry in {retry_after} second(s)"
+        )
+
+
+class InferenceExecutor:
+    """A sized thread pool with a bounded number of queued + running jobs.
+
+    Threads are used instead of processes as the loaded detectors hold native handles that can not be
+    pickled, OpenCV DNN / dlib / onnx release the GIL while running inference.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 32, retry_after: int = 1):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._pending: int = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="inference"
+        )
+        logger.debug(
+            f"{LP} created inference thread pool [workers: {max_workers}] - [max queue: {max_queue}]"
+        )
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _slots(self, jobs: int) -> int:
+        # a request with more jobs than the queue holds is admitted as one unit that takes the whole queue
+        return min(jobs, self.max_queue)
+
+    def acquire(self, jobs: int = 1):
+        """Reserve queue slots for ``jobs`` jobs, raise ExecutorSaturated if there is no room"""
+        jobs = self._slots(jobs)
+        with self._lock:
+            if self._pending + jobs > self.max_queue:
+                logger.warning(
+                    f"{LP} queue is saturated ({self._pending}/{self.max_queue}), rejecting {jobs} job(s)"
+                )
+                raise ExecutorSaturated(self._pending, self.retry_after)
+            self._pending += jobs
+
+    def release(self, jobs: int = 1):
+        jobs = self._slots(jobs)
+        with self._lock:
+            self._pending = max(self._pending - jobs, 0)
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable in the pool (slots must already be reserved with acquire())"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True):
+        logger.debug(f"{LP} shutting down inference thread pool")
+        self._executor.shutdown(wait=wait)
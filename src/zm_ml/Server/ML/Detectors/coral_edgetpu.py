@@ -1,45 +1,67 @@
 import time
 from logging import getLogger
+from typing import Optional, Tuple
 
-from PIL import Image
 import cv2
 import numpy as np
 
 from ..file_locks import FileLock
 from ...Models.config import TPUModelConfig
-from src.zm_ml.Shared.Models.Enums import ModelType
+from ....Shared.Models.Enums import ModelType, ModelProcessor
 
 from zm_ml.Server import SERVER_LOGGER_NAME
 logger = getLogger(SERVER_LOGGER_NAME)
 LP: str = "Coral:"
 
-# global placeholders for TPU lib imports
-common = None
-detect = None
+# global placeholders for TPU / TFLite lib imports
 make_interpreter = None
+Interpreter = None
+
+
+def _import_tflite():
+    """tflite-runtime if installed, tensorflow's bundled interpreter otherwise"""
+    global Interpreter
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        from tensorflow.lite import Interpreter
 
 
 class TpuDetector(FileLock):
+    """TFLite SSD style detection models, on an Edge TPU (pycoral) or on the CPU (TFLite interpreter, XNNPACK).
+    Both share the pre/post processing: one resize and the frame is written straight into the input tensor."""
+
     def __init__(self, model_config: TPUModelConfig):
-        global LP, common, detect, make_interpreter
-        try:
-            from pycoral.adapters import common as common, detect as detect
-            from pycoral.utils.edgetpu import make_interpreter as make_interpreter
-        except ImportError:
-            logger.warning(
-                f"{LP} pycoral libs not installed, this is ok if you do not plan to use "
-                f"TPU as detection processor. If you intend to use a TPU please install the TPU libs "
-                f"and pycoral!"
-            )
-            raise ImportError("TPU libs not installed")
-        else:
-            logger.debug(f"{LP} the pycoral library has been successfully imported, initializing...")
-        # Model init params
+        global LP, make_interpreter
         self.config = model_config
         self.options = self.config.detection_options
         self.processor = self.config.processor
         self.name = self.config.name
         self.model = None
+        self._input_index: int = 0
+        self._input_dtype = np.uint8
+        self._input_quant: Tuple[float, int] = (0.0, 0)
+        self._outputs: Tuple[int, int, int, int] = (0, 1, 2, 3)
+        if self.processor == ModelProcessor.TPU:
+            try:
+                from pycoral.utils.edgetpu import make_interpreter as make_interpreter
+            except ImportError:
+                logger.warning(
+                    f"{LP} pycoral libs not installed, this is ok if you do not plan to use "
+                    f"TPU as detection processor. If you intend to use a TPU please install the TPU libs "
+                    f"and pycoral!"
+                )
+                raise ImportError("TPU libs not installed")
+            else:
+                logger.debug(f"{LP} the pycoral library has been successfully imported, initializing...")
+        else:
+            try:
+                _import_tflite()
+            except ImportError:
+                logger.warning(
+                    f"{LP} neither tflite-runtime nor tensorflow is installed, cannot run '{self.name}' on the CPU"
+                )
+                raise ImportError("TFLite runtime not installed")
         if self.config.model_type == ModelType.FACE:
             LP = f"{LP}Face:"
 
@@ -49,7 +71,13 @@ class TpuDetector(FileLock):
         )
         t = time.perf_counter()
         try:
-            self.model = make_interpreter(self.config.input.as_posix())
+            if self.processor == ModelProcessor.TPU:
+                self.model = make_interpreter(self.config.input.as_posix())
+            else:
+                self.model = Interpreter(
+                    model_path=self.config.input.as_posix(),
+                    num_threads=self.config.num_threads or None,
+                )
         except Exception as ex:
             ex = repr(ex)
             words = ex.split(" ")
@@ -60,84 +88,82 @@ class TpuDetector(FileLock):
                         f"TPU/cable to move around). Reset the USB port or reboot!"
                     )
                     raise RuntimeError("TPU NO COMM")
+            raise
         else:
             self.model.allocate_tensors()
+            details = self.model.get_input_details()[0]
+            self._input_index = details["index"]
+            self._input_dtype = details["dtype"]
+            self._input_quant = details.get("quantization", (0.0, 0))
+            _, height, width, _ = details["shape"]
+            self.config.height, self.config.width = int(height), int(width)
+            outputs = [o["index"] for o in self.model.get_output_details()]
+            # TF1 SSD exports: boxes, classes, scores, count. TF2 exports: scores, boxes, count, classes
+            if self.model.get_tensor(outputs[3]).size == 1:
+                self._outputs = (outputs[0], outputs[1], outputs[2], outputs[3])
+            else:
+                self._outputs = (outputs[1], outputs[3], outputs[0], outputs[2])
+            self.create_lock()
             logger.debug(f"perf:{LP} loading took: {time.perf_counter() - t:.5f}s")
 
+    def _set_input(self, input_image: np.ndarray):
+        """Resize once and write the RGB frame straight into the interpreter's input tensor"""
+        _h, _w = self.config.height, self.config.width
+        rgb = cv2.cvtColor(
+            cv2.resize(input_image, (_w, _h), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2RGB
+        )
+        tensor = self.model.tensor(self._input_index)()[0]
+        if self._input_dtype == np.uint8:
+            tensor[...] = rgb
+        elif self._input_dtype == np.int8:
+            np.subtract(rgb, 128, out=tensor, casting="unsafe")
+        else:
+            scale, zero_point = self._input_quant
+            if scale:
+                np.add(rgb / (255.0 * scale), zero_point, out=tensor, casting="unsafe")
+            else:
+                # float models expect [-1, 1]
+                np.multiply(rgb, 1 / 127.5, out=tensor, casting="unsafe")
+                tensor -= 1.0
+
     def detect(self, input_image: np.ndarray):
-        b_boxes, labels, confs = [], [], []
         h, w = input_image.shape[:2]
         _h, _w = self.config.height, self.config.width
         if not self.model:
             self.load_model()
-        x_factor: float = 1.00
-        y_factor: float = 1.00
         t = time.perf_counter()
-        model_resize = False
-        if _h != h or _w != w:
-            model_resize = True
-            input_image = cv2.resize(
-                input_image, (_w, _h), interpolation=cv2.INTER_AREA
-            )
-            # get scaling so we can make correct bounding boxes
-            x_factor = w / _w
-            y_factor = h / _h
-
-        input_image = cv2.cvtColor(input_image, cv2.COLOR_BGR2RGB)
-        input_image = Image.fromarray(input_image)
-        logger.debug(
-            f"{LP}detect: input image {w}*{h} model input {_w}*{_h}{' (resized)' if model_resize else ''}"
-        )
-
-        _, scale = common.set_resized_input(
-            self.model,
-            input_image.size,
-            lambda size: input_image.resize(size, Image.ANTIALIAS),
-        )
+        logger.debug(f"{LP}detect: '{self.name}' ({self.processor}) input image {w}*{h} model input {_w}*{_h}")
         try:
             self.acquire_lock()
+            self._set_input(input_image)
             self.model.invoke()
         except Exception as ex:
-            logger.error(f"{LP} TPU error: {ex}")
+            logger.error(f"{LP} {self.processor} error: {ex}")
             raise ex
         else:
-            objs = detect.get_objects(self.model, self.options.confidence, scale)
+            boxes_idx, classes_idx, scores_idx, count_idx = self._outputs
+            count = int(self.model.get_tensor(count_idx).flatten()[0])
+            boxes = self.model.get_tensor(boxes_idx)[0][:count]
+            class_ids = self.model.get_tensor(classes_idx)[0][:count].astype(np.int64)
+            scores = self.model.get_tensor(scores_idx)[0][:count]
             logger.debug(
                 f"perf:{LP} '{self.name}' detection took: {time.perf_counter() - t:.5f}s"
             )
         finally:
             self.release_lock()
 
-        for obj in objs:
-            b_boxes.append(
-                [
-                    int(round(obj.bbox.xmin)),
-                    int(round(obj.bbox.ymin)),
-                    int(round(obj.bbox.xmax)),
-                    int(round(obj.bbox.ymax)),
-                ]
-            )
-            labels.append(self.config.labels[obj.id])
-            confs.append(float(obj.score))
-
-        if model_resize and labels:
-            logger.debug(
-                f"{LP} The image was resized before processing by the 'model width/height', scaling "
-                f"bounding boxes in image by factors of -> x={x_factor:.4} "
-                f"y={y_factor:.4}",
-            )
-            for box in b_boxes:
-                box[0] = round(box[0] * x_factor)
-                box[1] = round(box[1] * y_factor)
-                box[2] = round(box[2] * x_factor)
-                box[3] = round(box[3] * y_factor)
-
+        keep = scores >= self.options.confidence
+        # normalized [ymin, xmin, ymax, xmax] of the model input == of the source image (plain resize)
+        b_boxes = np.round(
+            boxes[keep][:, [1, 0, 3, 2]] * np.array([w, h, w, h], dtype=np.float32)
+        ).astype(int)
+        labels = [self.config.labels[i] for i in class_ids[keep].tolist()]
         return {
             "success": True if labels else False,
             "type": self.config.model_type,
             "processor": self.processor,
             "model_name": self.name,
             "label": labels,
-            "confidence": confs,
-            "bounding_box": b_boxes,
+            "confidence": scores[keep].astype(float).tolist(),
+            "bounding_box": b_boxes.tolist(),
         }
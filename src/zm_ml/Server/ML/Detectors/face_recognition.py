@@ -137,6 +137,11 @@ class FaceRecognitionLibDetector(FileLock):
         return []
 
     def detect(self, input_image: np.ndarray):
+        # detection state is kept on the instance, one request at a time
+        with self._thread_guard():
+            return self._detect(input_image)
+
+    def _detect(self, input_image: np.ndarray):
         detect_start_timer = time.perf_counter()
         h, w = input_image.shape[:2]
         max_size: int = self.options.max_size or w
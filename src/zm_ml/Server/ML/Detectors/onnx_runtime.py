@@ -0,0 +1,141 @@
+import time
+from logging import getLogger
+from typing import Optional, List, Dict, Any
+
+import numpy as np
+
+from ..file_locks import FileLock
+from ...Models.config import ORTModelConfig
+from .yolo_utils import LetterboxBuffer, yolo_rows, decode_yolo
+from ....Shared.Models.Enums import ModelProcessor
+
+from zm_ml.Server import SERVER_LOGGER_NAME
+logger = getLogger(SERVER_LOGGER_NAME)
+LP: str = "ONNXRuntime:"
+
+# global placeholder for the onnxruntime import
+ort = None
+
+
+class ORTDetector(FileLock):
+    """YOLOv5/v7/v8 style ONNX exports run with ONNX Runtime"""
+
+    def __init__(self, model_config: ORTModelConfig):
+        global ort
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            logger.warning(f"{LP} onnxruntime is not installed, cannot load '{model_config.name}'")
+            raise ImportError("onnxruntime not installed")
+        self.config = model_config
+        self.options = self.config.detection_options
+        self.processor: ModelProcessor = self.config.processor
+        self.name = self.config.name
+        self.id = self.config.id
+        self.session: Optional["ort.InferenceSession"] = None
+        self.input_name: str = ""
+        self.output_names: List[str] = []
+        self.dynamic_batch: bool = False
+        self.buffer: Optional[LetterboxBuffer] = None
+        self.load_model()
+
+    def _providers(self) -> List[str]:
+        available = ort.get_available_providers()
+        providers = ["CPUExecutionProvider"]
+        if self.processor == ModelProcessor.GPU:
+            if "CUDAExecutionProvider" in available:
+                providers.insert(0, "CUDAExecutionProvider")
+            else:
+                logger.warning(f"{LP} '{self.name}' CUDA execution provider not available, using CPU")
+                self.processor = self.config.processor = ModelProcessor.CPU
+        return providers
+
+    def load_model(self):
+        logger.debug(f"{LP} loading model into processor memory: {self.name} ({self.id})")
+        load_timer = time.perf_counter()
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.config.intra_op_threads:
+            opts.intra_op_num_threads = self.config.intra_op_threads
+        if self.config.inter_op_threads:
+            opts.inter_op_num_threads = self.config.inter_op_threads
+        try:
+            self.session = ort.InferenceSession(
+                self.config.input.as_posix(), sess_options=opts, providers=self._providers()
+            )
+        except Exception as model_load_exc:
+            logger.error(f"{LP} Error while loading model file '{self.config.input}' => {model_load_exc}")
+            raise model_load_exc
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.output_names = [o.name for o in self.session.get_outputs()]
+        batch, _, height, width = model_input.shape
+        # a fixed input size in the model wins over the configured one
+        if isinstance(height, int) and isinstance(width, int):
+            if (width, height) != (self.config.width, self.config.height):
+                logger.debug(f"{LP} '{self.name}' model has a fixed input size of {width}*{height}")
+            self.config.width, self.config.height = width, height
+        self.dynamic_batch = not isinstance(batch, int)
+        self.buffer = LetterboxBuffer(self.config.width, self.config.height)
+        self.create_lock()
+        logger.debug(
+            f"perf:{LP} '{self.name}' loading completed in {time.perf_counter() - load_timer:.5f}ms "
+            f"[providers: {self.session.get_providers()} - dynamic batch: {self.dynamic_batch}]"
+        )
+
+    def _result(self, class_ids: np.ndarray, confs: np.ndarray, boxes: np.ndarray) -> Dict[str, Any]:
+        labels = [self.config.labels[i] for i in class_ids.tolist()]
+        return {
+            "success": True if labels else False,
+            "type": self.config.model_type,
+            "processor": self.processor,
+            "model_name": self.name,
+            "label": labels,
+            "confidence": confs.tolist(),
+            "bounding_box": boxes.tolist(),
+        }
+
+    def _infer(self, images: List[np.ndarray]) -> List[Dict[str, Any]]:
+        tensor, letterboxes = self.buffer(images)
+        self.acquire_lock()
+        try:
+            detection_timer = time.perf_counter()
+            output = self.session.run(self.output_names[:1], {self.input_name: tensor})[0]
+            logger.debug(
+                f"perf:{LP}{self.processor}: '{self.name}' {len(images)} image(s) detection "
+                f"took: {time.perf_counter() - detection_timer:.5f}ms"
+            )
+        finally:
+            self.release_lock()
+        rows = yolo_rows(output, len(self.config.labels))
+        results = []
+        for idx, image in enumerate(images):
+            h, w = image.shape[:2]
+            results.append(
+                self._result(
+                    *decode_yolo(
+                        rows[idx],
+                        len(self.config.labels),
+                        self.options.confidence,
+                        self.options.nms,
+                        letterboxes[idx],
+                        (w, h),
+                    )
+                )
+            )
+        return results
+
+    def detect(self, input_image: np.ndarray) -> Dict[str, Any]:
+        if input_image is None:
+            raise ValueError(f"{LP} no image passed!")
+        if not self.session:
+            self.load_model()
+        return self._infer([input_image])[0]
+
+    def detect_batch(self, input_images: List[np.ndarray]) -> List[Dict[str, Any]]:
+        """One forward pass for the whole batch if the model has a dynamic batch dimension"""
+        if not self.session:
+            self.load_model()
+        if self.dynamic_batch:
+            return self._infer(input_images)
+        return [self._infer([image])[0] for image in input_images]
@@ -0,0 +1,139 @@
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from logging import getLogger
+from typing import Optional, List, Dict, Any
+
+import numpy as np
+
+from ..file_locks import FileLock
+from ...Models.config import OpenVINOModelConfig
+from .yolo_utils import LetterboxBuffer, yolo_rows, decode_yolo
+
+from zm_ml.Server import SERVER_LOGGER_NAME
+logger = getLogger(SERVER_LOGGER_NAME)
+LP: str = "OpenVINO:"
+
+# global placeholders for the openvino imports
+Core = None
+AsyncInferQueue = None
+
+
+class OpenVINODetector(FileLock):
+    """YOLO IR (.xml/.bin) or ONNX models compiled with OpenVINO. Requests are queued on an AsyncInferQueue so
+    several inferences of the same model are in flight at once."""
+
+    def __init__(self, model_config: OpenVINOModelConfig):
+        global Core, AsyncInferQueue
+        try:
+            from openvino.runtime import Core, AsyncInferQueue
+        except ImportError:
+            logger.warning(f"{LP} openvino is not installed, cannot load '{model_config.name}'")
+            raise ImportError("openvino not installed")
+        self.config = model_config
+        self.options = self.config.detection_options
+        self.processor = self.config.processor
+        self.name = self.config.name
+        self.id = self.config.id
+        self.compiled = None
+        self.queue: Optional["AsyncInferQueue"] = None
+        self.buffer: Optional[LetterboxBuffer] = None
+        self._submit_lock = threading.Lock()
+        self.load_model()
+
+    @property
+    def backend(self) -> str:
+        return f"openvino-{self.config.device.lower()}"
+
+    def load_model(self):
+        logger.debug(f"{LP} loading model into processor memory: {self.name} ({self.id})")
+        load_timer = time.perf_counter()
+        core = Core()
+        try:
+            model = core.read_model(self.config.input.as_posix())
+        except Exception as model_load_exc:
+            logger.error(f"{LP} Error while loading model file '{self.config.input}' => {model_load_exc}")
+            raise model_load_exc
+        model_input = model.input(0)
+        if model_input.get_partial_shape().is_dynamic:
+            # static shapes compile to faster CPU kernels
+            model.reshape({model_input: [1, 3, self.config.height, self.config.width]})
+        _, _, height, width = model.input(0).shape
+        self.config.width, self.config.height = int(width), int(height)
+        properties = {"PERFORMANCE_HINT": self.config.performance_hint}
+        if self.config.num_requests:
+            properties["PERFORMANCE_HINT_NUM_REQUESTS"] = str(self.config.num_requests)
+        self.compiled = core.compile_model(model, self.config.device, properties)
+        jobs = self.config.num_requests or self.compiled.get_property(
+            "OPTIMAL_NUMBER_OF_INFER_REQUESTS"
+        )
+        self.queue = AsyncInferQueue(self.compiled, int(jobs))
+        self.queue.set_callback(self._on_done)
+        self.buffer = LetterboxBuffer(self.config.width, self.config.height)
+        logger.debug(
+            f"perf:{LP} '{self.name}' loading completed in {time.perf_counter() - load_timer:.5f}ms "
+            f"[device: {self.config.device} - hint: {self.config.performance_hint} - infer requests: {jobs}]"
+        )
+
+    @staticmethod
+    def _on_done(request, future: Future):
+        try:
+            future.set_result(request.get_output_tensor(0).data.copy())
+        except Exception as exc:
+            future.set_exception(exc)
+
+    def _submit(self, image: np.ndarray) -> Future:
+        tensor, letterboxes = self.buffer([image])
+        future = Future()
+        future.letterbox = letterboxes[0]
+        with self._submit_lock:
+            # blocks until an infer request is free, the input is copied into the request tensor
+            self.queue.start_async({0: tensor}, userdata=future)
+        return future
+
+    def _result(self, image: np.ndarray, future: Future) -> Dict[str, Any]:
+        h, w = image.shape[:2]
+        try:
+            output = future.result(timeout=self.config.timeout)
+        except FutureTimeout:
+            raise TimeoutError(
+                f"{LP} '{self.name}' infer request did not finish within {self.config.timeout} seconds"
+            )
+        rows = yolo_rows(output, len(self.config.labels))
+        class_ids, confs, boxes = decode_yolo(
+            rows[0],
+            len(self.config.labels),
+            self.options.confidence,
+            self.options.nms,
+            future.letterbox,
+            (w, h),
+        )
+        labels = [self.config.labels[i] for i in class_ids.tolist()]
+        return {
+            "success": True if labels else False,
+            "type": self.config.model_type,
+            "processor": self.backend,
+            "model_name": self.name,
+            "label": labels,
+            "confidence": confs.tolist(),
+            "bounding_box": boxes.tolist(),
+        }
+
+    def detect(self, input_image: np.ndarray) -> Dict[str, Any]:
+        if input_image is None:
+            raise ValueError(f"{LP} no image passed!")
+        return self.detect_batch([input_image])[0]
+
+    def detect_batch(self, input_images: List[np.ndarray]) -> List[Dict[str, Any]]:
+        """Every image gets its own infer request, they run in parallel on the device. No file lock, the
+        AsyncInferQueue bounds the requests in flight across concurrent callers."""
+        if not self.compiled:
+            self.load_model()
+        detection_timer = time.perf_counter()
+        futures = [self._submit(image) for image in input_images]
+        results = [self._result(image, future) for image, future in zip(input_images, futures)]
+        logger.debug(
+            f"perf:{LP}{self.config.device}: '{self.name}' {len(input_images)} image(s) detection "
+            f"took: {time.perf_counter() - detection_timer:.5f}ms"
+        )
+        return results
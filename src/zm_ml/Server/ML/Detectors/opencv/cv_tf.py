@@ -1,6 +1,6 @@
 import time
 from logging import getLogger
-from typing import Optional
+from typing import Optional, List, Dict, Any
 
 import cv2
 import numpy as np
@@ -62,9 +62,11 @@ class CV2TFDetector(CV2Base):
             )
             detection_timer = time.perf_counter()
             blob = cv2.dnn.blobFromImage(input_image, size=(_h, _w), swapRB=True, crop=False)
-            self.net.setInput(blob)
-            # Run object detection
-            outs = self.net.forward()
+            # the net is not thread safe
+            with self._thread_guard():
+                self.net.setInput(blob)
+                # Run object detection
+                outs = self.net.forward()
         except Exception as detect_exc:
             logger.error(f"{LP} Error while detecting objects: {detect_exc}")
             raise detect_exc
@@ -100,3 +102,52 @@ class CV2TFDetector(CV2Base):
             "confidence": confs,
             "bounding_box": b_boxes,
         }
+
+    def detect_batch(self, input_images: List[np.ndarray]) -> List[Dict[str, Any]]:
+        """Stack the images into a single blob and run one forward pass. The SSD output rows are
+        [image_id, class_id, confidence, left, top, right, bottom] so they are split back out by image_id.
+        """
+        if not self.net:
+            self.load_model()
+        if self.config.square:
+            input_images = [self.square_image(image) for image in input_images]
+        _h, _w = self.config.height, self.config.width
+        conf_threshold = self.options.confidence
+        batch_size = len(input_images)
+        results: List[Dict[str, Any]] = []
+        logger.debug(
+            f"{LP} '{self.name}' ({self.processor}) - {batch_size} input images - "
+            f"model input set as: {_w}*{_h}"
+        )
+        try:
+            detection_timer = time.perf_counter()
+            blob = cv2.dnn.blobFromImages(input_images, size=(_w, _h), swapRB=True, crop=False)
+            with self._thread_guard():
+                self.net.setInput(blob)
+                outs = self.net.forward()
+        except Exception as detect_exc:
+            logger.error(f"{LP} Error while detecting objects: {detect_exc}")
+            raise detect_exc
+        logger.debug(
+            f"perf:{LP}{self.processor}: '{self.name}' batch of {batch_size} detection "
+            f"took: {time.perf_counter() - detection_timer:.5f}ms"
+        )
+        detections = outs.reshape(-1, 7)
+        detections = detections[detections[:, 2] >= conf_threshold]
+        for idx, image in enumerate(input_images):
+            rows, cols = image.shape[:2]
+            dets = detections[detections[:, 0].astype(int) == idx]
+            b_boxes = np.round(dets[:, 3:7] * np.array([cols, rows, cols, rows])).astype(int)
+            labels = [self.config.labels[int(class_id)] for class_id in dets[:, 1]]
+            results.append(
+                {
+                    "success": True if labels else False,
+                    "type": self.config.model_type,
+                    "processor": self.processor,
+                    "model_name": self.name,
+                    "label": labels,
+                    "confidence": dets[:, 2].astype(float).tolist(),
+                    "bounding_box": b_boxes.tolist(),
+                }
+            )
+        return results
@@ -1,6 +1,6 @@
 import time
 from logging import getLogger
-from typing import Optional
+from typing import Optional, List, Dict, Any
 
 import cv2
 import numpy as np
@@ -8,6 +8,7 @@ import numpy as np
 from ....Models.config import BaseModelOptions, BaseModelConfig, CV2YOLOModelConfig
 from .....Shared.Models.Enums import ModelProcessor
 from .cv_base import CV2Base
+from ..yolo_utils import yolo_rows, decode_yolo
 
 LP: str = "OpenCV:YOLO:"
 from zm_ml.Server import SERVER_LOGGER_NAME
@@ -31,6 +32,9 @@ class CV2YOLODetector(CV2Base):
             f"{LP} loading model into processor memory: {self.name} ({self.id})"
         )
         load_timer = time.perf_counter()
+        if self.config.cv2_threads:
+            # process wide, worker processes apply their own model's setting
+            cv2.setNumThreads(self.config.cv2_threads)
         try:
             # Allow for .weights/.cfg and .onnx YOLO architectures
             model_file: str = self.config.input.as_posix()
@@ -139,3 +143,70 @@ class CV2YOLODetector(CV2Base):
             "confidence": confs,
             "bounding_box": b_boxes,
         }
+
+    def detect_batch(self, input_images: List[np.ndarray]) -> List[Dict[str, Any]]:
+        """Stack the images into a single blob and run one forward pass, the raw YOLO output layers are
+        decoded and NMS'd per image (class aware, same as dnn.DetectionModel).
+        """
+        if not self.net:
+            self.load_model()
+        _h, _w = self.config.height, self.config.width
+        if self.config.square:
+            input_images = [self.square_image(image) for image in input_images]
+        nms_threshold, conf_threshold = self.options.nms, self.options.confidence
+        batch_size = len(input_images)
+        results: List[Dict[str, Any]] = []
+        logger.debug(
+            f"{LP}detect_batch: '{self.name}' ({self.processor}) - {batch_size} input images - "
+            f"model input {_w}*{_h}{' [squared]' if self.config.square else ''}"
+        )
+        blob = cv2.dnn.blobFromImages(
+            input_images, scalefactor=1 / 255, size=(_w, _h), swapRB=True, crop=False
+        )
+        self.acquire_lock()
+        try:
+            detection_timer = time.perf_counter()
+            self.net.setInput(blob)
+            outs = self.net.forward(self.net.getUnconnectedOutLayersNames())
+            logger.debug(
+                f"perf:{LP}{self.processor}: '{self.name}' batch of {batch_size} detection "
+                f"took: {time.perf_counter() - detection_timer:.5f}ms"
+            )
+        finally:
+            self.release_lock()
+        num_classes = len(self.config.labels)
+        darknet = self.config.input.suffix == ".weights"
+        if darknet:
+            # Darknet region layers output (N*rows, 5+classes)
+            outs = [out.reshape(batch_size, -1, out.shape[-1]) for out in outs]
+        else:
+            # ONNX exports output (N, rows, 5+classes) (v5/v7) or (N, 4+classes, rows) (v8)
+            outs = [
+                yolo_rows(out.reshape(batch_size, *out.shape[-2:]), num_classes) for out in outs
+            ]
+        for idx, image in enumerate(input_images):
+            h, w = image.shape[:2]
+            class_ids, confs, boxes = decode_yolo(
+                np.concatenate([out[idx] for out in outs]),
+                num_classes,
+                conf_threshold,
+                nms_threshold,
+                image_size=(w, h),
+                input_size=(_w, _h),
+                darknet=darknet,
+            )
+            labels = [self.config.labels[i] for i in class_ids.tolist()]
+            confs, b_boxes = confs.tolist(), boxes.tolist()
+            results.append(
+                {
+                    "success": True if labels else False,
+                    "type": self.config.model_type,
+                    "processor": self.processor,
+                    "model_name": self.name,
+                    "label": labels,
+                    "confidence": confs,
+                    "bounding_box": b_boxes,
+                }
+            )
+        return results
+
@@ -0,0 +1,169 @@
+import threading
+import time
+from logging import getLogger
+from typing import Optional, List, Dict, Any
+
+import numpy as np
+
+from ..file_locks import FileLock
+from ...Models.config import PyTorchModelConfig
+from .yolo_utils import LetterboxBuffer, yolo_rows, decode_yolo
+from ....Shared.Models.Enums import ModelProcessor
+
+from zm_ml.Server import SERVER_LOGGER_NAME
+logger = getLogger(SERVER_LOGGER_NAME)
+LP: str = "PyTorch:"
+
+# global placeholder for the torch import
+torch = None
+
+
+class PyTorchDetector(FileLock):
+    """TorchScript (.torchscript/.pt) or torch.export (.pt2) YOLO models"""
+
+    def __init__(self, model_config: PyTorchModelConfig):
+        global torch
+        try:
+            import torch
+        except ImportError:
+            logger.warning(f"{LP} torch is not installed, cannot load '{model_config.name}'")
+            raise ImportError("torch not installed")
+        self.config = model_config
+        self.options = self.config.detection_options
+        self.processor: ModelProcessor = self.config.processor
+        self.name = self.config.name
+        self.id = self.config.id
+        self.model = None
+        self.device = None
+        self.dynamic_batch: bool = True
+        self.buffer: Optional[LetterboxBuffer] = None
+        self._pinned = threading.local()
+        self.load_model()
+
+    def load_model(self):
+        logger.debug(f"{LP} loading model into processor memory: {self.name} ({self.id})")
+        load_timer = time.perf_counter()
+        if self.processor == ModelProcessor.GPU and torch.cuda.is_available():
+            self.device = torch.device("cuda")
+        else:
+            if self.processor == ModelProcessor.GPU:
+                logger.warning(f"{LP} '{self.name}' CUDA is not available, using CPU")
+                self.processor = self.config.processor = ModelProcessor.CPU
+            self.device = torch.device("cpu")
+        if self.config.threads:
+            # intra-op pool is process wide, the last loaded model's setting wins
+            torch.set_num_threads(self.config.threads)
+        exported = self.config.input.suffix == ".pt2"
+        try:
+            if exported:
+                model = torch.export.load(self.config.input.as_posix()).module()
+            else:
+                model = torch.jit.load(self.config.input.as_posix(), map_location=self.device)
+        except Exception as model_load_exc:
+            logger.error(f"{LP} Error while loading model file '{self.config.input}' => {model_load_exc}")
+            raise model_load_exc
+        model = model.to(self.device)
+        if self.config.channels_last:
+            model = model.to(memory_format=torch.channels_last)
+        if self.config.half and self.device.type == "cuda":
+            model = model.half()
+        # exported programs raise on .eval()/.train(), they are already captured for inference
+        self.model = model if exported else model.eval()
+        self.buffer = LetterboxBuffer(self.config.width, self.config.height)
+        self.create_lock()
+        logger.debug(
+            f"perf:{LP} '{self.name}' loading completed in {time.perf_counter() - load_timer:.5f}ms "
+            f"[device: {self.device} - threads: {torch.get_num_threads()}]"
+        )
+
+    def _to_device(self, tensor: np.ndarray):
+        """Zero copy on the CPU, GPU inputs are staged through a reusable pinned buffer"""
+        batch = torch.from_numpy(tensor)
+        if self.device.type == "cuda":
+            pinned = getattr(self._pinned, "buffer", None)
+            if pinned is None or pinned.shape[0] < batch.shape[0]:
+                pinned = self._pinned.buffer = torch.empty(batch.shape, dtype=batch.dtype).pin_memory()
+            pinned = pinned[: batch.shape[0]]
+            pinned.copy_(batch)
+            batch = pinned.to(self.device, non_blocking=True)
+            if self.config.half:
+                batch = batch.half()
+        if self.config.channels_last:
+            batch = batch.contiguous(memory_format=torch.channels_last)
+        return batch
+
+    def _infer(self, images: List[np.ndarray]) -> List[Dict[str, Any]]:
+        tensor, letterboxes = self.buffer(images)
+        self.acquire_lock()
+        try:
+            detection_timer = time.perf_counter()
+            with torch.inference_mode():
+                output = self.model(self._to_device(tensor))
+                if isinstance(output, (list, tuple)):
+                    output = output[0]
+                output = output.float().cpu().numpy()
+            logger.debug(
+                f"perf:{LP}{self.processor}: '{self.name}' {len(images)} image(s) detection "
+                f"took: {time.perf_counter() - detection_timer:.5f}ms"
+            )
+        finally:
+            self.release_lock()
+        rows = yolo_rows(output, len(self.config.labels))
+        results = []
+        for idx, image in enumerate(images):
+            h, w = image.shape[:2]
+            class_ids, confs, boxes = decode_yolo(
+                rows[idx],
+                len(self.config.labels),
+                self.options.confidence,
+                self.options.nms,
+                letterboxes[idx],
+                (w, h),
+            )
+            labels = [self.config.labels[i] for i in class_ids.tolist()]
+            results.append(
+                {
+                    "success": True if labels else False,
+                    "type": self.config.model_type,
+                    "processor": self.processor,
+                    "model_name": self.name,
+                    "label": labels,
+                    "confidence": confs.tolist(),
+                    "bounding_box": boxes.tolist(),
+                }
+            )
+        return results
+
+    def detect(self, input_image: np.ndarray) -> Dict[str, Any]:
+        if input_image is None:
+            raise ValueError(f"{LP} no image passed!")
+        if not self.model:
+            self.load_model()
+        return self._infer([input_image])[0]
+
+    @staticmethod
+    def _batch_mismatch(exc: RuntimeError) -> bool:
+        """True if the model rejected the batch dimension (fixed batch export), not for OOM or other errors"""
+        oom = getattr(torch.cuda, "OutOfMemoryError", None)
+        if oom and isinstance(exc, oom):
+            return False
+        msg = str(exc).casefold()
+        if "out of memory" in msg:
+            return False
+        return any(hint in msg for hint in ("shape", "size mismatch", "size of tensor", "batch", "dimension"))
+
+    def detect_batch(self, input_images: List[np.ndarray]) -> List[Dict[str, Any]]:
+        """One forward pass for the batch, models traced with a fixed batch size fall back to one at a time"""
+        if not self.model:
+            self.load_model()
+        if self.dynamic_batch and len(input_images) > 1:
+            try:
+                return self._infer(input_images)
+            except RuntimeError as exc:
+                if not self._batch_mismatch(exc):
+                    raise
+                logger.warning(
+                    f"{LP} '{self.name}' does not support batched input, running images one at a time -> {exc}"
+                )
+                self.dynamic_batch = False
+        return [self._infer([image])[0] for image in input_images]
@@ -0,0 +1,113 @@
+"""Framework independent YOLO pre/post processing: letterboxing and vectorized output decoding + NMS."""
+import threading
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ....Shared.tiling import class_nms
+
+# (scale, pad_x, pad_y) to map letterboxed coords back to the source image
+Letterbox = Tuple[float, int, int]
+
+
+class LetterboxBuffer:
+    """Per thread reusable input buffers, the letterboxed frame is written straight into the NCHW float tensor"""
+
+    def __init__(self, width: int, height: int, batch: int = 1, fill: int = 114):
+        self.width = width
+        self.height = height
+        self.batch = batch
+        self.fill = fill
+        self._local = threading.local()
+
+    def _buffers(self, batch: int) -> Tuple[np.ndarray, np.ndarray]:
+        local = self._local
+        if getattr(local, "tensor", None) is None or local.tensor.shape[0] < batch:
+            local.canvas = np.full((self.height, self.width, 3), self.fill, dtype=np.uint8)
+            local.tensor = np.empty((max(batch, self.batch), 3, self.height, self.width), dtype=np.float32)
+        return local.canvas, local.tensor
+
+    def __call__(self, images: List[np.ndarray]) -> Tuple[np.ndarray, List[Letterbox]]:
+        """Letterbox (keep aspect ratio, pad) BGR images into a (N, 3, H, W) RGB float32 [0-1] tensor.
+        The returned tensor is a view of this thread's buffer, valid until the next call."""
+        canvas, tensor = self._buffers(len(images))
+        boxes: List[Letterbox] = []
+        for idx, image in enumerate(images):
+            h, w = image.shape[:2]
+            scale = min(self.width / w, self.height / h)
+            nw, nh = int(round(w * scale)), int(round(h * scale))
+            pad_x, pad_y = (self.width - nw) // 2, (self.height - nh) // 2
+            canvas.fill(self.fill)
+            canvas[pad_y:pad_y + nh, pad_x:pad_x + nw] = cv2.resize(
+                image, (nw, nh), interpolation=cv2.INTER_LINEAR
+            )
+            # HWC BGR uint8 -> CHW RGB float32, one pass into the preallocated tensor
+            np.multiply(canvas[..., ::-1].transpose(2, 0, 1), 1 / 255.0, out=tensor[idx], casting="unsafe")
+            boxes.append((scale, pad_x, pad_y))
+        return tensor[: len(images)], boxes
+
+
+def yolo_rows(output: np.ndarray, num_classes: int) -> np.ndarray:
+    """Normalize a raw YOLO output tensor to (N, rows, values).
+    v8 style exports output (N, 4+classes, rows), v5/v7 style (N, rows, 5+classes)."""
+    if output.ndim == 2:
+        output = output[None]
+    if output.shape[1] in (4 + num_classes, 5 + num_classes) and output.shape[2] > output.shape[1]:
+        output = output.transpose(0, 2, 1)
+    return output
+
+
+def decode_yolo(
+    rows: np.ndarray,
+    num_classes: int,
+    conf_threshold: float,
+    nms_threshold: float,
+    letterbox: Optional[Letterbox] = None,
+    image_size: Optional[Tuple[int, int]] = None,
+    input_size: Optional[Tuple[int, int]] = None,
+    darknet: bool = False,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Decode the rows of one image [cx, cy, w, h, (objectness), class scores...] in model input pixels.
+
+    Returns (class_ids, confidences, boxes as int x1, y1, x2, y2) after class aware NMS, mapped back to the
+    source image with the letterbox parameters, or with ``input_size`` (w, h) if the image was stretched to
+    the model input instead, and clipped to ``image_size`` (w, h).
+    Darknet region layers (``darknet``) output coords normalized to the image and class scores already
+    scaled by objectness, ``image_size`` is required.
+    """
+    if rows.shape[1] == 5 + num_classes:
+        scores = rows[:, 5:] if darknet else rows[:, 5:] * rows[:, 4:5]
+    else:
+        scores = rows[:, 4:4 + num_classes]
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(rows)), class_ids]
+    keep = confidences >= conf_threshold
+    empty = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), np.empty((0, 4), dtype=np.int64)
+    if not keep.any():
+        return empty
+    rows, class_ids, confidences = rows[keep], class_ids[keep], confidences[keep]
+    xyxy = np.column_stack(
+        (
+            rows[:, 0] - rows[:, 2] / 2,
+            rows[:, 1] - rows[:, 3] / 2,
+            rows[:, 0] + rows[:, 2] / 2,
+            rows[:, 1] + rows[:, 3] / 2,
+        )
+    ).astype(np.float32)
+    if darknet:
+        w, h = image_size
+        xyxy *= np.array([w, h, w, h], dtype=np.float32)
+    elif input_size is not None:
+        (w, h), (in_w, in_h) = image_size, input_size
+        xyxy *= np.array([w / in_w, h / in_h] * 2, dtype=np.float32)
+    elif letterbox is not None:
+        scale, pad_x, pad_y = letterbox
+        xyxy -= np.array([pad_x, pad_y, pad_x, pad_y], dtype=np.float32)
+        xyxy /= scale
+    if image_size is not None:
+        w, h = image_size
+        np.clip(xyxy, 0, [w, h, w, h], out=xyxy)
+    indices = class_nms(xyxy, confidences, class_ids, nms_threshold, conf_threshold)
+    return class_ids[indices], confidences[indices], np.round(xyxy[indices]).astype(np.int64)
+
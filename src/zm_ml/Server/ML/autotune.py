@@ -0,0 +1,300 @@
+"""Per host inference autotuner: benchmark candidate settings for each model on synthetic frames and
+persist the winners so the next start can reuse them without re-tuning."""
+import hashlib
+import json
+import os
+import socket
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..Log import SERVER_LOGGER_NAME
+from ..Models.config import BaseModelConfig, ServerSettings, create_detector
+from ...Shared.Models.Enums import ModelFrameWork, ModelProcessor
+
+logger = getLogger(SERVER_LOGGER_NAME)
+LP: str = "autotune:"
+
+TUNABLE = (
+    ModelFrameWork.YOLO,
+    ModelFrameWork.ONNXRUNTIME,
+    ModelFrameWork.OPENVINO,
+    ModelFrameWork.PYTORCH,
+    ModelFrameWork.CORAL,
+)
+
+
+def profile_path(variable_data_path: Optional[Path]) -> Path:
+    base = Path(variable_data_path) if variable_data_path else Path(tempfile.gettempdir()) / "zm_ml"
+    return base / "autotune" / f"profile_{socket.gethostname()}.json"
+
+
+def _thread_candidates(settings: ServerSettings.AutotuneSettings) -> List[int]:
+    if settings.threads:
+        return sorted(set(settings.threads))
+    cores = os.cpu_count() or 1
+    return sorted({1, max(cores // 4, 1), max(cores // 2, 1), cores})
+
+
+def candidates(
+    config: BaseModelConfig, settings: ServerSettings.AutotuneSettings
+) -> List[Dict[str, Any]]:
+    """The settings to benchmark for a model, each one a dict of config overrides"""
+    framework, processor = config.framework, config.processor
+    threads = _thread_candidates(settings)
+    if framework == ModelFrameWork.YOLO:
+        if processor == ModelProcessor.GPU:
+            # CUDA backend with the FP32 or FP16 target vs. the CPU backend
+            return [
+                {"cv2_cuda_fp_16": False},
+                {"cv2_cuda_fp_16": True},
+                *[{"processor": ModelProcessor.CPU.value, "cv2_threads": n} for n in threads],
+            ]
+        return [{"cv2_threads": n} for n in threads]
+    if framework == ModelFrameWork.ONNXRUNTIME:
+        return [{"intra_op_threads": n} for n in threads]
+    if framework == ModelFrameWork.OPENVINO:
+        return [{"performance_hint": "LATENCY"}, {"performance_hint": "THROUGHPUT"}]
+    if framework == ModelFrameWork.PYTORCH:
+        return [{"threads": n} for n in threads]
+    if framework == ModelFrameWork.CORAL and processor != ModelProcessor.TPU:
+        return [{"num_threads": n} for n in threads]
+    return []
+
+
+def fingerprint(
+    config: BaseModelConfig, settings: ServerSettings.AutotuneSettings, concurrency: int
+) -> str:
+    """Changes when the model file, its framework/processor, the load or the candidate space changes"""
+    model_file: Optional[Path] = getattr(config, "input", None)
+    stat = model_file.stat() if model_file and model_file.exists() else None
+    key = {
+        "framework": str(config.framework),
+        "processor": str(config.processor),
+        "input": model_file.as_posix() if model_file else None,
+        "size": stat.st_size if stat else None,
+        "mtime": stat.st_mtime_ns if stat else None,
+        "width": getattr(config, "width", None),
+        "height": getattr(config, "height", None),
+        "replicas": config.replicas,
+        "concurrency": concurrency,
+        "candidates": candidates(config, settings),
+        "batch_sizes": sorted(set(settings.batch_sizes)),
+        "frame": (settings.width, settings.height),
+    }
+    return hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _overrides(overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON values -> config values"""
+    overrides = dict(overrides)
+    if "processor" in overrides:
+        overrides["processor"] = ModelProcessor(overrides["processor"])
+    return overrides
+
+
+def _load(config: BaseModelConfig):
+    """The detector(s) as the server would run them: a replica pool if the model has replicas"""
+    if config.replicas > 1:
+        from .replicas import ReplicaPool
+
+        return ReplicaPool(config.name, partial(create_detector, config), config.replicas)
+    return create_detector(config)
+
+
+def _probe(detector, frame: np.ndarray):
+    """One inference that has to succeed before a candidate is timed. OpenCV detectors log and swallow
+    inference errors (an empty result looks fast), so their nets are run directly."""
+    for model in [r.model for r in getattr(detector, "replicas", [])] or [detector]:
+        net = getattr(model, "net", None)
+        if net is None:
+            model.detect(frame)
+            continue
+        config = model.config
+        net.setInput(
+            cv2.dnn.blobFromImage(
+                frame, scalefactor=1 / 255, size=(config.width, config.height), swapRB=True, crop=False
+            )
+        )
+        outs = net.forward(net.getUnconnectedOutLayersNames())
+        if not all(np.isfinite(out).all() for out in outs):
+            raise ValueError("non finite output")
+
+
+def _timings(
+    func: Callable, args: Any, warmup: int, iterations: int, concurrency: int
+) -> Tuple[np.ndarray, float]:
+    """Per call latencies of ``concurrency`` callers running ``iterations`` calls each, and the wall time"""
+    for _ in range(warmup):
+        func(args)
+
+    def caller(_) -> List[float]:
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func(args)
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    wall = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = [s for caller_samples in pool.map(caller, range(concurrency)) for s in caller_samples]
+    else:
+        samples = caller(0)
+    return np.asarray(samples, dtype=np.float64), time.perf_counter() - wall
+
+
+def benchmark(
+    config: BaseModelConfig,
+    overrides: Dict[str, Any],
+    frame: np.ndarray,
+    settings: ServerSettings.AutotuneSettings,
+    concurrency: int,
+) -> Optional[Dict[str, Any]]:
+    """Latency and throughput of one candidate under ``concurrency`` concurrent callers, None if it failed
+    (to load or to run a probe inference).
+    Batch capable models are also measured with each batch size, the best throughput wins."""
+    try:
+        detector = _load(config.copy(update=_overrides(overrides), deep=True))
+        if detector is None:
+            return None
+        _probe(detector, frame)
+        latency, wall = _timings(detector.detect, frame, settings.warmup, settings.iterations, concurrency)
+        result = {
+            "settings": overrides,
+            "p50": float(np.percentile(latency, 50)),
+            "p95": float(np.percentile(latency, 95)),
+            "batched": hasattr(detector, "detect_batch"),
+            "batch": 1,
+            "throughput": float(len(latency) / wall),
+        }
+        if result["batched"]:
+            for size in sorted(set(settings.batch_sizes)):
+                if size < 2:
+                    continue
+                samples, wall = _timings(
+                    detector.detect_batch, [frame] * size, settings.warmup, settings.iterations, concurrency
+                )
+                throughput = float(len(samples) * size / wall)
+                if throughput > result["throughput"]:
+                    result["batch"], result["throughput"] = size, throughput
+        if hasattr(detector, "close"):
+            detector.close()
+    except Exception as exc:
+        logger.warning(f"{LP} '{config.name}' candidate {overrides} failed -> {exc}")
+        return None
+    logger.debug(
+        f"perf:{LP} '{config.name}' {overrides} x{concurrency} p50: {result['p50'] * 1000:.2f}ms "
+        f"p95: {result['p95'] * 1000:.2f}ms - {result['throughput']:.2f} img/s at batch {result['batch']}"
+    )
+    return result
+
+
+def _best(results: List[Dict[str, Any]], metric: str) -> Dict[str, Any]:
+    if metric == "throughput":
+        return max(results, key=lambda r: r["throughput"])
+    return min(results, key=lambda r: r[metric])
+
+
+def tune_model(
+    config: BaseModelConfig, settings: ServerSettings.AutotuneSettings, concurrency: int = 1
+) -> Optional[Dict[str, Any]]:
+    """Benchmark every candidate setting of a model and return the winning profile entry"""
+    frame = np.random.default_rng(0).integers(
+        0, 256, (settings.height, settings.width, 3), dtype=np.uint8
+    )
+    timer = time.perf_counter()
+    results = [
+        r
+        for r in (
+            benchmark(config, overrides, frame, settings, concurrency)
+            for overrides in candidates(config, settings)
+        )
+        if r
+    ]
+    if not results:
+        return None
+    winner = _best(results, settings.metric)
+    logger.info(
+        f"{LP} '{config.name}' tuned {len(results)} candidate(s) with {concurrency} concurrent caller(s) in "
+        f"{time.perf_counter() - timer:.2f}s, winner by {settings.metric}: {winner['settings']} "
+        f"batch {winner['batch']}"
+    )
+    return {**winner, "fingerprint": fingerprint(config, settings, concurrency), "tuned": time.time()}
+
+
+def apply_profile(config: BaseModelConfig, entry: Dict[str, Any]):
+    """Set the winning settings on the model config (in place) before its detector is created"""
+    for key, value in _overrides(entry["settings"]).items():
+        setattr(config, key, value)
+    if entry.get("batched"):
+        config.batching.max_batch = entry["batch"]
+
+
+def autotune(
+    models: List[BaseModelConfig],
+    settings: ServerSettings.AutotuneSettings,
+    variable_data_path: Optional[Path],
+    concurrency: int = 1,
+    workers: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    """Tune (or load the saved profile of) every supported model and apply the winners to their configs.
+    Candidates are measured with ``concurrency`` concurrent callers (the executor size) and the model's
+    replicas. Returns the profile, keyed by model name."""
+    path = profile_path(variable_data_path)
+    profile: Dict[str, Dict[str, Any]] = {}
+    if path.is_file() and not settings.force:
+        try:
+            profile = json.loads(path.read_text()).get("models", {})
+        except (OSError, ValueError) as exc:
+            logger.warning(f"{LP} unable to read the profile '{path}', re-tuning -> {exc}")
+    original_threads = cv2.getNumThreads()
+    changed = False
+    cv2_models: List[Tuple[BaseModelConfig, Dict[str, Any]]] = []
+    for config in models:
+        if config.framework not in TUNABLE or not candidates(config, settings):
+            continue
+        if settings.models and config.name.casefold() not in settings.models:
+            continue
+        entry = profile.get(config.name)
+        if entry and entry.get("fingerprint") == fingerprint(config, settings, concurrency):
+            logger.debug(f"{LP} '{config.name}' using the saved profile: {entry['settings']}")
+        else:
+            entry = tune_model(config, settings, concurrency)
+            if not entry:
+                logger.warning(f"{LP} '{config.name}' no candidate could be benchmarked, keeping its settings")
+                continue
+            profile[config.name] = entry
+            changed = True
+        apply_profile(config, entry)
+        if entry["settings"].get("cv2_threads"):
+            cv2_models.append((config, entry))
+    cv2.setNumThreads(original_threads)
+    if cv2_models and not workers:
+        # OpenCV threads are process wide, without worker processes the slowest model decides for all
+        threads = max(cv2_models, key=lambda m: m[1]["p50"])[1]["settings"]["cv2_threads"]
+        for config, _ in cv2_models:
+            config.cv2_threads = threads
+        logger.info(f"{LP} OpenCV threads set to {threads} for {[c.name for c, _ in cv2_models]}")
+    if changed:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(
+                json.dumps(
+                    {"host": socket.gethostname(), "cpus": os.cpu_count(), "models": profile}, indent=2
+                )
+            )
+            tmp.replace(path)
+            logger.info(f"{LP} saved the profile to '{path}'")
+        except OSError as exc:
+            logger.warning(f"{LP} unable to save the profile to '{path}' -> {exc}")
+    return profile
@@ -0,0 +1,119 @@
+"""Dynamic micro-batching of concurrent detection requests for a single model."""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from logging import getLogger
+from typing import Callable, List, Dict, Any, Tuple
+
+import numpy as np
+
+from ..Log import SERVER_LOGGER_NAME
+
+logger = getLogger(SERVER_LOGGER_NAME)
+LP: str = "Batching:"
+
+
+class BatchScheduler:
+    """Collect requests for up to ``max_batch`` images or ``max_wait`` milliseconds, run them as one
+    batched forward pass and fan the results back out to each waiting request.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[List[np.ndarray]], List[Dict[str, Any]]],
+        max_batch: int = 8,
+        max_wait: float = 10.0,
+        workers: int = 1,
+    ):
+        """
+        :param name: Name of the model, used for logging and the worker thread name.
+        :param run_batch: Callable that accepts a list of images and returns a result dict per image.
+        :param max_batch: Maximum number of images in a batch.
+        :param max_wait: Maximum time in milliseconds to wait for a batch to fill.
+        :param workers: Number of dispatch threads, one per model replica so batches can run concurrently.
+        """
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait / 1000
+        self._queue: "queue.Queue[Tuple[np.ndarray, Future]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"batcher-{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.debug(
+            f"{LP} '{self.name}' started batch scheduler [max batch: {self.max_batch}] - "
+            f"[max wait: {max_wait}ms] - [dispatch threads: {workers}]"
+        )
+
+    def submit(self, image: np.ndarray) -> Future:
+        """Queue an image for the next batch, the returned Future resolves to the result dict"""
+        if self._stop.is_set():
+            raise RuntimeError(f"{LP} '{self.name}' batch scheduler has been stopped")
+        future: Future = Future()
+        self._queue.put((image, future))
+        return future
+
+    def _collect(self) -> List[Tuple[np.ndarray, Future]]:
+        """Block for the first request, then gather more until the batch is full or the wait expires"""
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            # drop any requests that were cancelled while waiting in the queue
+            batch = [
+                (image, future)
+                for image, future in batch
+                if future.set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+            images = [image for image, _ in batch]
+            timer = time.perf_counter()
+            try:
+                results = self.run_batch(images)
+            except Exception as exc:
+                logger.error(f"{LP} '{self.name}' batch of {len(images)} failed -> {exc}")
+                for _, future in batch:
+                    future.set_exception(exc)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+                logger.debug(
+                    f"perf:{LP} '{self.name}' batch of {len(images)} completed in "
+                    f"{time.perf_counter() - timer:.5f} seconds"
+                )
+
+    def stop(self):
+        """Stop the worker threads, any queued requests are failed"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if future.set_running_or_notify_cancel():
+                future.set_exception(
+                    RuntimeError(f"{LP} '{self.name}' batch scheduler has been stopped")
+                )
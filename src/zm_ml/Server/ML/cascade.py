@@ -0,0 +1,99 @@
+"""Early exit model cascades: each stage only runs when the previous stages found relevant labels."""
+import asyncio
+import time
+from logging import getLogger
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from ..Log import SERVER_LOGGER_NAME
+from ..Models.config import APIDetector, CascadeConfig, CascadeStage
+from ...Shared.tiling import Rect, merge_results
+
+logger = getLogger(SERVER_LOGGER_NAME)
+LP: str = "cascade:"
+
+ResolveFunc = Callable[[List[str]], List[APIDetector]]
+DetectFunc = Callable[[List[APIDetector], np.ndarray, bool], Awaitable[List[Dict[str, Any]]]]
+
+
+def _triggers(
+    stage: CascadeStage, detections: List[Dict[str, Any]]
+) -> List[Tuple[str, float, List[int]]]:
+    """(label, confidence, box) of the earlier detections that trigger the stage, best first"""
+    found = []
+    for result in detections:
+        if not result or not result.get("label"):
+            continue
+        for label, conf, box in zip(result["label"], result["confidence"], result["bounding_box"]):
+            if conf < stage.min_conf:
+                continue
+            if stage.labels and str(label).casefold() not in stage.labels:
+                continue
+            found.append((label, float(conf), box))
+    found.sort(key=lambda t: t[1], reverse=True)
+    return found
+
+
+def _crop_rects(
+    stage: CascadeStage, boxes: List[List[int]], width: int, height: int
+) -> List[Rect]:
+    rects = []
+    for x1, y1, x2, y2 in boxes[: stage.max_crops]:
+        pad_x, pad_y = int((x2 - x1) * stage.padding), int((y2 - y1) * stage.padding)
+        rect = (
+            max(int(x1) - pad_x, 0),
+            max(int(y1) - pad_y, 0),
+            min(int(x2) + pad_x, width),
+            min(int(y2) + pad_y, height),
+        )
+        if rect[2] > rect[0] and rect[3] > rect[1]:
+            rects.append(rect)
+    return rects
+
+
+async def run_cascade(
+    name: str,
+    cascade: CascadeConfig,
+    image: np.ndarray,
+    resolve: ResolveFunc,
+    detect: DetectFunc,
+) -> List[Dict[str, Any]]:
+    """Run the stages in order and return the results of every model that ran (standard result dicts)"""
+    lp = f"{LP}{name}:"
+    h, w = image.shape[:2]
+    detections: List[Dict[str, Any]] = []
+    timer = time.perf_counter()
+    for idx, stage in enumerate(cascade.stages):
+        detectors = resolve(stage.models)
+        if not detectors:
+            logger.warning(f"{lp} stage {idx} has no loaded models ({stage.models}), skipping")
+            continue
+        if idx == 0:
+            detections.extend(await detect(detectors, image, True))
+            continue
+        triggers = _triggers(stage, detections)
+        if not triggers:
+            logger.debug(
+                f"{lp} stage {idx} not triggered (wanted: {stage.labels or 'any detection'}), exiting early"
+            )
+            break
+        if not stage.crop:
+            logger.debug(f"{lp} stage {idx} triggered by {[t[0] for t in triggers]}, running on the full frame")
+            detections.extend(await detect(detectors, image, True))
+            continue
+        rects = _crop_rects(stage, [t[2] for t in triggers], w, h)
+        logger.debug(f"{lp} stage {idx} triggered, running {len(detectors)} model(s) on {len(rects)} crop(s)")
+        crop_results = await asyncio.gather(
+            # crops skip the frame cache, similar looking crops of other regions would share boxes
+            *[detect(detectors, image[y1:y2, x1:x2], False) for x1, y1, x2, y2 in rects]
+        )
+        # per model: boxes back to frame coordinates, duplicates from overlapping crops removed
+        per_model: Dict[str, List[Tuple[Rect, Dict[str, Any]]]] = {}
+        for rect, results in zip(rects, crop_results):
+            for result in results:
+                if result:
+                    per_model.setdefault(result.get("model_name"), []).append((rect, result))
+        detections.extend(merge_results(tile_results) for tile_results in per_model.values())
+    logger.debug(f"perf:{lp} cascade completed in {time.perf_counter() - timer:.5f} seconds")
+    return detections
@@ -1,4 +1,5 @@
 """Helper class that adds file locking to a class."""
+import threading
 import time
 from logging import getLogger
 from typing import Optional
@@ -13,9 +14,22 @@ logger = getLogger(SERVER_LOGGER_NAME)
 LP: str = 'Lock:'
 
 
+# guards the lazy creation of the per detector thread locks
+_GUARD_LOCK = threading.Lock()
+
+
 class FileLock:
     lock: Optional[BoundedSemaphore] = None
     is_locked: bool = False
+    _guard: Optional[threading.RLock] = None
+
+    def _thread_guard(self) -> threading.RLock:
+        """Per detector lock, the loaded nets are not thread safe and the executor runs requests in parallel"""
+        if self._guard is None:
+            with _GUARD_LOCK:
+                if self._guard is None:
+                    self._guard = threading.RLock()
+        return self._guard
 
     def create_lock(self):
         if locks_enabled():
@@ -33,7 +47,8 @@ class FileLock:
                 self.lock_dir = locks.lock_dir
                 lock = locks.get(self.processor.casefold())
                 self.lock_name = f"{lock.name}-{getuid()}"
-                self.lock_maximum = lock.max
+                # replicas of a model (and their worker processes) each need a slot to run in parallel
+                self.lock_maximum = max(lock.max, getattr(self.config, "replicas", 1))
                 self.lock_timeout = lock.timeout
                 self.lock = BoundedSemaphore(
                     maximum=self.lock_maximum,
@@ -48,6 +63,16 @@ class FileLock:
                 )
 
     def acquire_lock(self):
+        """Serialize inference on this detector between threads, then take the cross process file lock"""
+        guard = self._thread_guard()
+        guard.acquire()
+        try:
+            return self._acquire_file_lock()
+        except BaseException:
+            guard.release()
+            raise
+
+    def _acquire_file_lock(self):
         if locks_enabled():
             if self.is_locked:
                 logger.debug(f"{LP} '{self.name}' lock for '{self.lock.name}' already acquired")
@@ -71,7 +96,7 @@ class FileLock:
                     )
                     self.create_lock()
                     # logger.debug(f"{LP} {self.name} attempting to acquire {self.processor} lock after creating one ...")
-                    self.acquire_lock()
+                    self._acquire_file_lock()
                     # self.is_locked = True
 
             except AlreadyLocked as already_locked_exc:
@@ -98,6 +123,16 @@ class FileLock:
         return self.lock
 
     def release_lock(self):
+        try:
+            self._release_file_lock()
+        finally:
+            try:
+                self._thread_guard().release()
+            except RuntimeError:
+                # release without a matching acquire (acquire_lock raised)
+                pass
+
+    def _release_file_lock(self):
         if locks_enabled():
             if self.lock:
                 if not self.is_locked:
@@ -0,0 +1,111 @@
+"""A pool of independently loaded copies of one model, each request gets an idle copy to itself."""
+import threading
+import time
+from logging import getLogger
+from typing import List, Dict, Any, Callable
+
+import numpy as np
+
+from ..Log import SERVER_LOGGER_NAME
+
+logger = getLogger(SERVER_LOGGER_NAME)
+LP: str = "Replicas:"
+
+
+class Replica:
+    """One loaded copy of a model and its usage counters"""
+
+    __slots__ = ("index", "model", "busy", "served", "errors", "busy_time")
+
+    def __init__(self, index: int, model: Any):
+        self.index = index
+        self.model = model
+        self.busy: int = 0
+        self.served: int = 0
+        self.errors: int = 0
+        self.busy_time: float = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replica": self.index,
+            "busy": self.busy,
+            "served": self.served,
+            "errors": self.errors,
+            "busy_time": round(self.busy_time, 5),
+        }
+
+
+class ReplicaPool:
+    """Load ``replicas`` copies of a model and dispatch each call to an idle replica (the one that has
+    served the least), callers wait for a replica to become idle as the loaded nets are not thread safe.
+
+    Exposes the same detect()/detect_batch() interface as the detectors it wraps.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any], replicas: int):
+        """
+        :param name: Name of the model, used for logging.
+        :param factory: Callable that returns a newly loaded model.
+        :param replicas: Number of copies to load.
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        timer = time.perf_counter()
+        self.replicas: List[Replica] = [Replica(i, factory()) for i in range(replicas)]
+        logger.debug(
+            f"perf:{LP} '{self.name}' loaded {replicas} replicas in "
+            f"{time.perf_counter() - timer:.5f} seconds"
+        )
+        if all(hasattr(replica.model, "detect_batch") for replica in self.replicas):
+            self.detect_batch = self._detect_batch
+
+    def __len__(self):
+        return len(self.replicas)
+
+    def _checkout(self) -> Replica:
+        with self._idle:
+            while True:
+                idle = [r for r in self.replicas if not r.busy]
+                if idle:
+                    break
+                self._idle.wait()
+            replica = min(idle, key=lambda r: r.served)
+            replica.busy += 1
+        return replica
+
+    def _checkin(self, replica: Replica, elapsed: float, error: bool):
+        with self._idle:
+            replica.busy -= 1
+            replica.served += 1
+            replica.busy_time += elapsed
+            if error:
+                replica.errors += 1
+            self._idle.notify()
+
+    def _dispatch(self, method: str, arg: Any) -> Any:
+        replica = self._checkout()
+        timer = time.perf_counter()
+        error = False
+        try:
+            return getattr(replica.model, method)(arg)
+        except Exception:
+            error = True
+            raise
+        finally:
+            self._checkin(replica, time.perf_counter() - timer, error)
+
+    def detect(self, input_image: np.ndarray) -> Dict[str, Any]:
+        return self._dispatch("detect", input_image)
+
+    def _detect_batch(self, input_images: List[np.ndarray]) -> List[Dict[str, Any]]:
+        return self._dispatch("detect_batch", input_images)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [replica.stats() for replica in self.replicas]
+
+    def close(self):
+        for replica in self.replicas:
+            if hasattr(replica.model, "close"):
+                replica.model.close()
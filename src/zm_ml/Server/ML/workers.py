@@ -0,0 +1,202 @@
+"""Run a detector in its own process, decoded frames are handed over using shared memory instead of pickling."""
+import atexit
+import logging
+import multiprocessing as mp
+import threading
+import time
+from logging import getLogger
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from ..Log import SERVER_LOGGER_NAME, SERVER_LOG_FORMAT
+
+if TYPE_CHECKING:
+    from ..Models.config import BaseModelConfig, Settings
+
+logger = getLogger(SERVER_LOGGER_NAME)
+LP: str = "Worker:"
+
+# (offset, shape, dtype) of each frame written into the shared memory buffer
+FrameLayout = Tuple[int, Tuple[int, ...], str]
+
+
+def _compact(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Pack confidences and bounding boxes into arrays so the response pickles small"""
+    result = dict(result)
+    result["confidence"] = np.asarray(result.get("confidence") or [], dtype=np.float32)
+    result["bounding_box"] = np.asarray(
+        result.get("bounding_box") or [], dtype=np.int32
+    ).reshape(-1, 4)
+    return result
+
+
+def _expand(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Unpack a compact result back into the standard (JSON serializable) result dict"""
+    result["confidence"] = result["confidence"].tolist()
+    result["bounding_box"] = result["bounding_box"].tolist()
+    return result
+
+
+def _worker_main(model_config: "BaseModelConfig", settings: "Settings", conn: Connection):
+    """Entry point of the worker process, loads the detector and serves requests until told to stop"""
+    from ..app import create_global_config
+    from ..Models.config import APIDetector
+
+    wlogger = logging.getLogger(SERVER_LOGGER_NAME)
+    if not wlogger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(SERVER_LOG_FORMAT)
+        wlogger.addHandler(handler)
+        wlogger.setLevel(logging.DEBUG)
+    # The parent process handles batching, tiling, the frame cache and dispatching, this process only runs
+    # the model
+    settings.server.workers.enabled = False
+    settings.server.frame_cache.enabled = False
+    model_config.batching.enabled = False
+    model_config.tiling.enabled = False
+    model_config.replicas = 1
+    g = create_global_config()
+    g.config = settings
+    try:
+        detector = APIDetector(model_config)
+    except Exception as exc:
+        conn.send(("error", repr(exc)))
+        return
+    conn.send(("ready", None))
+
+    shm: Optional[SharedMemory] = None
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if msg[0] == "stop":
+            break
+        _, shm_name, layouts = msg
+        if shm is None or shm.name != shm_name:
+            if shm is not None:
+                shm.close()
+            shm = SharedMemory(name=shm_name)
+        images = [
+            np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for offset, shape, dtype in layouts
+        ]
+        try:
+            if len(images) > 1 and hasattr(detector.model, "detect_batch"):
+                results = detector.model.detect_batch(images)
+            else:
+                results = [detector.model.detect(image) for image in images]
+        except Exception as exc:
+            conn.send(("error", repr(exc)))
+        else:
+            conn.send(("ok", [_compact(result) for result in results]))
+        finally:
+            # views must be released before the buffer can be closed/resized
+            del images
+    if shm is not None:
+        shm.close()
+
+
+class DetectorProcess:
+    """A detector that lives in its own process, exposes the same detect()/detect_batch() interface.
+
+    Frames are copied once into a shared memory buffer owned by this object (grown when needed) and
+    only the buffer name and frame layout are sent over the pipe.
+    """
+
+    def __init__(self, model_config: "BaseModelConfig", settings: "Settings"):
+        self.config = model_config
+        self.settings = settings
+        self.name = model_config.name
+        self.processor = model_config.processor
+        self.timeout = settings.server.workers.timeout
+        self._ctx = mp.get_context(settings.server.workers.start_method)
+        self._lock = threading.Lock()
+        self._shm: Optional[SharedMemory] = None
+        self._conn: Optional[Connection] = None
+        self._process: Optional[mp.Process] = None
+        self._start()
+        atexit.register(self.close)
+
+    def _start(self):
+        load_timer = time.perf_counter()
+        parent_conn, child_conn = self._ctx.Pipe()
+        self._conn = parent_conn
+        self._process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.config, self.settings, child_conn),
+            name=f"zm_mlapi-{self.name}",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        if not self._conn.poll(self.settings.server.workers.load_timeout):
+            self._process.kill()
+            raise RuntimeError(f"{LP} '{self.name}' worker process did not finish loading the model")
+        status, err = self._conn.recv()
+        if status != "ready":
+            self._process.join()
+            raise RuntimeError(f"{LP} '{self.name}' worker process failed to load the model -> {err}")
+        logger.debug(
+            f"perf:{LP} '{self.name}' worker process [pid: {self._process.pid}] ready in "
+            f"{time.perf_counter() - load_timer:.5f} seconds"
+        )
+
+    def _buffer(self, size: int) -> SharedMemory:
+        """Return the shared memory buffer, re-allocating it if it is too small"""
+        if self._shm is None or self._shm.size < size:
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+            self._shm = SharedMemory(create=True, size=size)
+            logger.debug(f"{LP} '{self.name}' allocated {size} bytes of shared memory [{self._shm.name}]")
+        return self._shm
+
+    def _run(self, images: List[np.ndarray]) -> List[Dict[str, Any]]:
+        with self._lock:
+            if not self._process.is_alive():
+                logger.warning(f"{LP} '{self.name}' worker process died, restarting it...")
+                self._start()
+            images = [np.ascontiguousarray(image) for image in images]
+            shm = self._buffer(sum(image.nbytes for image in images))
+            layouts: List[FrameLayout] = []
+            offset = 0
+            for image in images:
+                shm.buf[offset: offset + image.nbytes] = image.reshape(-1).view(np.uint8)
+                layouts.append((offset, image.shape, image.dtype.str))
+                offset += image.nbytes
+            self._conn.send(("detect", shm.name, layouts))
+            if not self._conn.poll(self.timeout):
+                self._process.kill()
+                raise TimeoutError(
+                    f"{LP} '{self.name}' worker process did not respond within {self.timeout} seconds"
+                )
+            status, payload = self._conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"{LP} '{self.name}' worker process error -> {payload}")
+        return [_expand(result) for result in payload]
+
+    def detect(self, input_image: np.ndarray) -> Dict[str, Any]:
+        return self._run([input_image])[0]
+
+    def detect_batch(self, input_images: List[np.ndarray]) -> List[Dict[str, Any]]:
+        return self._run(input_images)
+
+    def close(self):
+        """Stop the worker process and free the shared memory buffer"""
+        with self._lock:
+            if self._process and self._process.is_alive():
+                try:
+                    self._conn.send(("stop",))
+                except (BrokenPipeError, OSError):
+                    pass
+                self._process.join(timeout=5)
+                if self._process.is_alive():
+                    self._process.kill()
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+                self._shm = None
@@ -1,10 +1,12 @@
+import asyncio
 import json
 import logging
 import time
 import uuid
+from functools import partial
 from pathlib import Path
 import tempfile
-from typing import Union, Dict, List, Optional, IO, Any
+from typing import Union, Dict, List, Optional, IO, Any, Literal, Callable, Awaitable
 
 import yaml
 import numpy as np
@@ -12,9 +14,12 @@ from pydantic import BaseModel, Field, validator, IPvAnyAddress, PositiveInt, Se
 from pydantic.fields import ModelField
 
 from ..ML.coco17_cv2 import COCO17
+from ..Libs.executor import InferenceExecutor
 from ...Shared.Models.Enums import ModelType, ModelFrameWork, ModelProcessor, FaceRecognitionLibModelTypes, ALPRAPIType, \
     ALPRService
-from ...Shared.Models.config import Testing, SystemSettings, LoggingSettings
+from ...Shared.Models.config import Testing, SystemSettings, LoggingSettings, FrameCacheSettings
+from ...Shared.frame_cache import FrameCache, dhash
+from ...Shared.tiling import grid_tiles, merge_results
 from ..Log import SERVER_LOGGER_NAME
 
 
@@ -77,6 +82,66 @@ class ServerSettings(BaseModel):
         sign_key: SecretStr = Field("CHANGE ME!!!!", description="JWT Sign Key")
         algorithm: str = Field("HS256", description="JWT Algorithm")
 
+    class ExecutorSettings(BaseModel):
+        max_workers: int = Field(4, ge=1, le=256, description="Number of inference worker threads")
+        max_queue: int = Field(
+            32,
+            ge=1,
+            description="Maximum number of queued and running jobs before requests are rejected with a 503",
+        )
+        retry_after: int = Field(
+            1, ge=1, description="Seconds sent in the Retry-After header when the queue is full"
+        )
+
+    class WorkerSettings(BaseModel):
+        enabled: bool = Field(
+            False, description="Run each model in its own process instead of a thread"
+        )
+        start_method: Literal["spawn", "forkserver", "fork"] = Field(
+            "spawn", description="multiprocessing start method for the worker processes"
+        )
+        load_timeout: float = Field(
+            120.0, gt=0, description="Seconds to wait for a worker process to load its model"
+        )
+        timeout: float = Field(
+            60.0, gt=0, description="Seconds to wait for a worker process to return a detection"
+        )
+
+    class AutotuneSettings(BaseModel):
+        enabled: bool = Field(
+            False, description="Benchmark candidate inference settings per model at startup"
+        )
+        force: bool = Field(
+            False, description="Re-tune even if a matching profile for this host exists"
+        )
+        models: List[str] = Field(
+            default_factory=list, description="Model names to tune, empty = every supported model"
+        )
+        metric: Literal["p50", "p95", "throughput"] = Field(
+            "p95", description="Pick the winner by lowest p50/p95 latency or highest throughput"
+        )
+        threads: List[int] = Field(
+            default_factory=list,
+            description="Thread counts to try, empty = 1, a quarter, half and all of the CPU cores",
+        )
+        batch_sizes: List[int] = Field(
+            default_factory=lambda: [1, 2, 4, 8], description="Batch sizes to try for batch capable models"
+        )
+        iterations: int = Field(20, ge=1, description="Timed runs per candidate")
+        warmup: int = Field(3, ge=0, description="Untimed runs per candidate")
+        width: int = Field(1280, ge=32, description="Synthetic frame width")
+        height: int = Field(720, ge=32, description="Synthetic frame height")
+
+        @validator("models", pre=True, always=True)
+        def _casefold_models(cls, v):
+            return [str(m).strip().casefold() for m in v or []]
+
+        @validator("threads", "batch_sizes", each_item=True)
+        def _positive(cls, v):
+            if v < 1:
+                raise ValueError("must be >= 1")
+            return v
+
     address: IPvAnyAddress = Field('0.0.0.0', description="Server listen address")
     port: PositiveInt = Field(8000, description="Server listen port")
     reload: bool = Field(
@@ -84,6 +149,18 @@ class ServerSettings(BaseModel):
     )
     debug: bool = Field(default=False, description="Uvicorn debug mode - For development only")
     jwt: JWTSettings = Field(default_factory=JWTSettings, description="JWT Settings")
+    executor: ExecutorSettings = Field(
+        default_factory=ExecutorSettings, description="Inference executor settings"
+    )
+    workers: WorkerSettings = Field(
+        default_factory=WorkerSettings, description="Process worker settings"
+    )
+    frame_cache: FrameCacheSettings = Field(
+        default_factory=FrameCacheSettings, description="Per model result cache keyed by frame hash"
+    )
+    autotune: AutotuneSettings = Field(
+        default_factory=AutotuneSettings, description="Per host inference settings autotuner"
+    )
 
 
 class DetectionResult(BaseModel):
@@ -223,7 +300,61 @@ class CV2TFModelOptions(BaseModelOptions):
 
 
 class PyTorchModelOptions(BaseModelOptions):
-    pass
+    nms: Optional[float] = Field(
+        0.4, ge=0.0, le=1.0, description="Non-Maximum Suppression Threshold"
+    )
+
+
+class BatchingSettings(BaseModel):
+    """Dynamic micro-batching options, concurrent requests are stacked into one forward pass"""
+    enabled: bool = Field(False, description="Enable dynamic micro-batching for this model")
+    max_batch: int = Field(
+        8, ge=1, le=64, description="Maximum number of images to stack into a single forward pass"
+    )
+    max_wait: float = Field(
+        10.0,
+        ge=0.0,
+        le=1000.0,
+        description="Maximum time (milliseconds) to wait for a batch to fill before running it",
+    )
+
+
+class CascadeStage(BaseModel):
+    """One stage of a cascade, it runs only if the previous stages found any of ``labels``"""
+    models: List[str] = Field(..., min_items=1, description="Model names, aliases or ids to run in this stage")
+    labels: List[str] = Field(
+        default_factory=list,
+        description="Run only if the previous stages detected one of these labels (empty = any detection)",
+    )
+    min_conf: float = Field(0.0, ge=0, le=1, description="Ignore triggering detections below this confidence")
+    crop: bool = Field(
+        False, description="Only infer crops around the triggering detections instead of the whole frame"
+    )
+    padding: float = Field(0.15, ge=0, le=2, description="Expand each crop by this fraction of the box size")
+    max_crops: int = Field(8, ge=1, description="Maximum number of crops (highest confidence first)")
+
+    @validator("models", "labels", each_item=True)
+    def _casefold(cls, v):
+        return str(v).strip().casefold()
+
+
+class CascadeConfig(BaseModel):
+    """Early exit model cascade, a cheap model runs first and the expensive ones only on its candidates"""
+    description: Optional[str] = Field(None, description="Cascade description")
+    stages: List[CascadeStage] = Field(..., min_items=1, description="Stages, run in order")
+
+
+class TilingSettings(BaseModel):
+    """Tiled (sliced) inference, the frame is split into overlapping tiles that are inferred as one batch"""
+    enabled: bool = Field(False, description="Enable tiled inference for this model")
+    tile_size: int = Field(
+        0, ge=0, description="Tile width and height in pixels (0 = the model input size)"
+    )
+    overlap: float = Field(0.2, ge=0, lt=1, description="Overlap between neighbouring tiles")
+    full_frame: bool = Field(
+        True, description="Also infer the whole frame so objects larger than a tile are still found"
+    )
+    nms: float = Field(0.45, gt=0, le=1, description="NMS threshold to merge boxes across tiles")
 
 
 class BaseModelConfig(BaseModel):
@@ -251,12 +382,28 @@ class BaseModelConfig(BaseModel):
         PlateRecognizerModelOptions,
         ALPRModelOptions,
     ] = Field(BaseModelOptions, description="Default Configuration for the model")
+    batching: BatchingSettings = Field(
+        default_factory=BatchingSettings, description="Dynamic micro-batching settings"
+    )
+    replicas: int = Field(
+        1, ge=1, le=32, description="Number of independent copies of the model to load"
+    )
+    tiling: TilingSettings = Field(
+        default_factory=TilingSettings, description="Tiled inference settings"
+    )
+    aliases: List[str] = Field(
+        default_factory=list, description="Alternate names the model can be requested by"
+    )
 
     @validator("name")
     def check_name(cls, v):
         v = str(v).strip().casefold()
         return v
 
+    @validator("aliases", each_item=True)
+    def check_aliases(cls, v):
+        return str(v).strip().casefold()
+
 
 class TPUModelConfig(BaseModelConfig):
     input: Path = Field(None, description="model file/dir path (Optional)")
@@ -271,6 +418,9 @@ class TPUModelConfig(BaseModelConfig):
     square: Optional[bool] = Field(
         False, description="Zero pad the image to be a square"
     )
+    num_threads: int = Field(
+        0, ge=0, description="TFLite CPU interpreter threads when the processor is cpu (0 = TFLite default)"
+    )
 
     labels: List[str] = Field(
         default=COCO17,
@@ -343,6 +493,9 @@ class CV2YOLOModelConfig(BaseModelConfig):
     cv2_cuda_fp_16: Optional[bool] = Field(
         False, description="model uses Floating Point 16 Backend (EXPERIMENTAL!)"
     )
+    cv2_threads: int = Field(
+        0, ge=0, description="OpenCV threads, process wide (0 = OpenCV default)"
+    )
 
     labels: List[str] = Field(
         default=COCO17,
@@ -397,6 +550,40 @@ class CV2YOLOModelConfig(BaseModelConfig):
         return v
 
 
+class ORTModelConfig(CV2YOLOModelConfig):
+    """YOLO ONNX exports run with ONNX Runtime"""
+    intra_op_threads: int = Field(
+        0, ge=0, description="Threads used inside an operator (0 = onnxruntime default)"
+    )
+    inter_op_threads: int = Field(
+        0, ge=0, description="Threads used to run operators in parallel (0 = onnxruntime default)"
+    )
+
+
+class OpenVINOModelConfig(CV2YOLOModelConfig):
+    """YOLO IR (.xml) or ONNX models compiled with OpenVINO"""
+    device: Optional[str] = Field(
+        None, description="OpenVINO device (CPU, GPU, AUTO, ...), defaults to GPU for processor: gpu, else CPU"
+    )
+    performance_hint: Literal["LATENCY", "THROUGHPUT", "CUMULATIVE_THROUGHPUT"] = Field(
+        "LATENCY", description="Optimize for single request latency or for throughput"
+    )
+    num_requests: int = Field(
+        0, ge=0, description="Infer requests kept in flight (0 = the optimal number for the device and hint)"
+    )
+    timeout: float = Field(60.0, gt=0, description="Seconds to wait for an infer request to finish")
+
+    @validator("device", pre=True, always=True)
+    def _device(cls, v, values):
+        if not v:
+            return "GPU" if values.get("processor") == ModelProcessor.GPU else "CPU"
+        return str(v).strip().upper()
+
+    @validator("performance_hint", pre=True)
+    def _upper(cls, v):
+        return str(v).strip().upper()
+
+
 class FaceRecognitionLibModelConfig(BaseModelConfig):
     """Config cant be changed after loading - Options can be changed"""
 
@@ -546,8 +733,13 @@ class CV2TFModelConfig(BaseModelConfig):
         return v
 
 
-class PyTorchModelConfig(BaseModelConfig):
-    pass
+class PyTorchModelConfig(CV2YOLOModelConfig):
+    """TorchScript or torch.export YOLO models"""
+    threads: int = Field(
+        0, ge=0, description="torch intra-op threads, process wide (0 = torch default)"
+    )
+    channels_last: bool = Field(True, description="Use channels last (NHWC) memory format")
+    half: bool = Field(False, description="Half precision (FP16) inference, GPU only")
 
 def _replace_vars(search_str: str, var_pool: Dict) -> Dict:
     """Replace variables in a string.
@@ -614,6 +806,9 @@ class Settings(BaseModel):
     models: List = Field(
         ..., description="Models configuration", exclude=True
     )
+    cascades: Dict[str, CascadeConfig] = Field(
+        default_factory=dict, description="Named model cascades for /detect/cascade/{name}"
+    )
 
     available_models: List[BaseModelConfig] = Field(
         None, description="Available models"
@@ -625,6 +820,10 @@ class Settings(BaseModel):
     def get_lock_settings(self):
         return self.locks
 
+    @validator("cascades")
+    def _normalize_cascade_names(cls, v):
+        return {str(k).strip().casefold(): cascade for k, cascade in v.items()}
+
     @validator("available_models", always=True)
     def validate_available_models(cls, v, values):
         models = values.get("models")
@@ -683,6 +882,22 @@ class Settings(BaseModel):
                         )
                         # todo: init models and check if success?
                         v.append(config)
+                    elif _framework == ModelFrameWork.CORAL:
+                        config = TPUModelConfig(**model)
+                        config.detection_options = BaseModelOptions(**_options)
+                        v.append(config)
+                    elif _framework == ModelFrameWork.PYTORCH:
+                        config = PyTorchModelConfig(**model)
+                        config.detection_options = PyTorchModelOptions(**_options)
+                        v.append(config)
+                    elif _framework == ModelFrameWork.ONNXRUNTIME:
+                        config = ORTModelConfig(**model)
+                        config.detection_options = CV2YOLOModelOptions(**_options)
+                        v.append(config)
+                    elif _framework == ModelFrameWork.OPENVINO:
+                        config = OpenVINOModelConfig(**model)
+                        config.detection_options = CV2YOLOModelOptions(**_options)
+                        v.append(config)
                     elif _framework == ModelFrameWork.CV_YOLO:
                         config = CV2YOLOModelConfig(**model)
                         config.detection_options = CV2YOLOModelOptions(**_options)
@@ -767,6 +982,56 @@ def parse_client_config_file(cfg_file: Path) -> Optional[Settings]:
     return fuck_you
 
 
+def create_detector(config: BaseModelConfig):
+    """Create the framework detector for a model config in this process"""
+    model = None
+    if config.framework == ModelFrameWork.YOLO:
+        from ..ML.Detectors.opencv.cv_yolo import CV2YOLODetector
+
+        model = CV2YOLODetector(config)
+    elif config.framework == ModelFrameWork.CORAL:
+        from ..ML.Detectors.coral_edgetpu import TpuDetector
+
+        model = TpuDetector(config)
+    elif config.framework == ModelFrameWork.PYTORCH:
+        from ..ML.Detectors.pytorch import PyTorchDetector
+
+        model = PyTorchDetector(config)
+    elif config.framework == ModelFrameWork.ONNXRUNTIME:
+        from ..ML.Detectors.onnx_runtime import ORTDetector
+
+        model = ORTDetector(config)
+    elif config.framework == ModelFrameWork.OPENVINO:
+        from ..ML.Detectors.open_vino import OpenVINODetector
+
+        model = OpenVINODetector(config)
+    elif config.framework == ModelFrameWork.FACE_RECOGNITION:
+        from ..ML.Detectors.face_recognition import (
+            FaceRecognitionLibDetector,
+        )
+
+        model = FaceRecognitionLibDetector(config)
+    elif config.framework == ModelFrameWork.ALPR:
+        from ..ML.Detectors.alpr import (
+            OpenAlprCmdLine,
+            OpenAlprCloud,
+            PlateRecognizer,
+        )
+
+        if config.service == ALPRService.PLATE_RECOGNIZER:
+            model = PlateRecognizer(config)
+        elif config.service == ALPRService.OPENALPR:
+            if config.api_type == ALPRAPIType.LOCAL:
+                model = OpenAlprCmdLine(config)
+            elif config.api_type == ALPRAPIType.CLOUD:
+                model = OpenAlprCloud(config)
+    else:
+        logger.warning(
+            f"CANT CREATE DETECTOR -> Framework NOT IMPLEMENTED!!! {config.framework}"
+        )
+    return model
+
+
 class APIDetector:
     """ML detector API class.
     Specify a processor type and then load the model into processor memory. run an inference on the processor
@@ -807,11 +1072,14 @@ class APIDetector:
         ],
     ):
         from ..ML.Detectors.opencv.cv_yolo import CV2YOLODetector
+        from ..ML.batching import BatchScheduler
 
         self.config = model_config
         self.id = self.config.id
         self.options = model_config.detection_options
         self.model: Optional[CV2YOLODetector] = None
+        self.batcher: Optional[BatchScheduler] = None
+        self.cache: Optional[FrameCache] = None
         self._load_model()
 
     @property
@@ -862,34 +1130,56 @@ class APIDetector:
             raise RuntimeError(
                 f"{self.config.processor} is not available on this system"
             )
-        if self.config.framework == ModelFrameWork.YOLO:
-            from ..ML.Detectors.opencv.cv_yolo import CV2YOLODetector
+        from ..app import get_settings
 
-            self.model = CV2YOLODetector(self.config)
-        elif self.config.framework == ModelFrameWork.FACE_RECOGNITION:
-            from ..ML.Detectors.face_recognition import (
-                FaceRecognitionLibDetector,
-            )
+        settings = get_settings()
+        if settings and settings.server.workers.enabled:
+            from ..ML.workers import DetectorProcess
 
-            self.model = FaceRecognitionLibDetector(self.config)
-        elif self.config.framework == ModelFrameWork.ALPR:
-            from ..ML.Detectors.alpr import (
-                OpenAlprCmdLine,
-                OpenAlprCloud,
-                PlateRecognizer,
-            )
+            factory = partial(DetectorProcess, self.config, settings)
+        else:
+            factory = self._create_model
+        if self.config.replicas > 1:
+            from ..ML.replicas import ReplicaPool
 
-            if self.config.service == ALPRService.PLATE_RECOGNIZER:
-                self.model = PlateRecognizer(self.config)
-            elif self.config.service == ALPRService.OPENALPR:
-                if self.config.api_type == ALPRAPIType.LOCAL:
-                    self.model = OpenAlprCmdLine(self.config)
-                elif self.config.api_type == ALPRAPIType.CLOUD:
-                    self.model = OpenAlprCloud(self.config)
+            self.model = ReplicaPool(self.config.name, factory, self.config.replicas)
         else:
-            logger.warning(
-                f"CANT CREATE DETECTOR -> Framework NOT IMPLEMENTED!!! {self.config.framework}"
+            self.model = factory()
+        self._create_batcher()
+        cache_cfg = settings.server.frame_cache if settings else None
+        if cache_cfg and cache_cfg.enabled:
+            self.cache = FrameCache(
+                cache_cfg.max_distance, cache_cfg.ttl, cache_cfg.max_entries, logger=logger
             )
+        else:
+            self.cache = None
+
+    def _create_model(self):
+        """Create the framework detector in this process"""
+        return create_detector(self.config)
+
+    def _create_batcher(self):
+        """Create (or re-create) the micro-batching scheduler if batching is enabled for this model"""
+        from ..ML.batching import BatchScheduler
+
+        if self.batcher:
+            self.batcher.stop()
+            self.batcher = None
+        batching = self.config.batching
+        if batching.enabled:
+            if self.model and hasattr(self.model, "detect_batch"):
+                self.batcher = BatchScheduler(
+                    self.config.name,
+                    self.model.detect_batch,
+                    max_batch=batching.max_batch,
+                    max_wait=batching.max_wait,
+                    workers=self.config.replicas,
+                )
+            else:
+                logger.warning(
+                    f"Batching is enabled for '{self.config.name}' but the {self.config.framework} "
+                    f"detector does not support batched inference, running requests individually"
+                )
 
     def is_processor_available(self) -> bool:
         """Check if the processor is available"""
@@ -902,7 +1192,21 @@ class APIDetector:
             available = True
         elif processor == ModelProcessor.CPU:
             if framework == ModelFrameWork.CORAL:
-                logger.error(f"{processor} is not supported for {framework}")
+                # .tflite models run on the CPU with the TFLite interpreter
+                try:
+                    import tflite_runtime
+                except ImportError:
+                    try:
+                        import tensorflow
+                    except ImportError:
+                        logger.warning(
+                            "tflite-runtime (or tensorflow) not installed, cannot load any coral models "
+                            "that use the CPU processor"
+                        )
+                    else:
+                        available = True
+                else:
+                    available = True
             else:
                 available = True
 
@@ -940,6 +1244,35 @@ class APIDetector:
                     else:
                         logger.debug(f"Found {cuda_devices} CUDA device(s)")
                         available = True
+            elif framework == ModelFrameWork.ONNXRUNTIME:
+                try:
+                    import onnxruntime as ort
+                except ImportError:
+                    logger.warning(
+                        "onnxruntime not installed, cannot load any models that use onnxruntime GPU processor"
+                    )
+                else:
+                    if "CUDAExecutionProvider" not in ort.get_available_providers():
+                        logger.warning(
+                            "onnxruntime has no CUDA execution provider (install onnxruntime-gpu), cannot "
+                            "load any models that use the GPU processor"
+                        )
+                    else:
+                        available = True
+            elif framework == ModelFrameWork.OPENVINO:
+                try:
+                    from openvino.runtime import Core
+                except ImportError:
+                    logger.warning(
+                        "openvino not installed, cannot load any models that use openvino GPU processor"
+                    )
+                else:
+                    if not any(d.startswith("GPU") for d in Core().available_devices):
+                        logger.warning(
+                            "No OpenVINO GPU devices found, cannot load any models that use the GPU processor"
+                        )
+                    else:
+                        available = True
             elif framework == ModelFrameWork.TENSORFLOW:
                 try:
                     import tensorflow as tf
@@ -983,10 +1316,121 @@ class APIDetector:
                 pass
         return available
 
-    def detect(self, image: np.ndarray) -> Dict[str, Any]:
-        """Detect objects in the image"""
+    def _cache_key(self, image: np.ndarray) -> str:
+        """Cached results are only valid for the same frame size and detection options"""
+        h, w = image.shape[:2]
+        return f"{self.config.name}|{w}x{h}|{hash(self.config.detection_options.json())}"
+
+    def clear_cache(self):
+        """Drop this model's cached results (e.g. after its detection options changed)"""
+        if self.cache:
+            self.cache.clear(f"{self.config.name}|")
+
+    def detect(self, image: np.ndarray, use_cache: bool = True) -> Dict[str, Any]:
+        """Detect objects in the image, requests are routed through the batch scheduler if enabled.
+        Crops should pass ``use_cache=False``, a similar looking crop of another region would reuse its boxes."""
         assert self.model, "model not loaded"
-        return self.model.detect(image)
+        cache = self.cache if use_cache else None
+        fhash = key = None
+        if cache:
+            fhash, key = dhash(image), self._cache_key(image)
+            cached = cache.get(key, fhash)
+            if cached is not None:
+                return dict(cached)
+        if self.config.tiling.enabled:
+            result = self._detect_tiled(image)
+        elif self.batcher:
+            result = self.batcher.submit(image).result()
+        else:
+            result = self.model.detect(image)
+        if cache and result:
+            cache.put(key, fhash, dict(result))
+        return result
+
+    async def detect_async(
+        self, image: np.ndarray, run: Callable[..., Awaitable[Any]], use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """detect() for the event loop: cache lookup, then the batcher or the model.
+        Batched requests await the scheduler instead of holding an executor thread so other requests can
+        join the batch, blocking work goes through ``run`` (InferenceExecutor.run)."""
+        assert self.model, "model not loaded"
+        cache = self.cache if use_cache else None
+        fhash = key = None
+        if cache:
+            fhash, key = await run(dhash, image), self._cache_key(image)
+            cached = cache.get(key, fhash)
+            if cached is not None:
+                return dict(cached)
+        if self.config.tiling.enabled and self.batcher:
+            # the scheduler stacks the tiles (and concurrent requests) into batches
+            _start = time.perf_counter()
+            rects, crops, size = self._tiles(image)
+            results = await asyncio.gather(
+                *[asyncio.wrap_future(self.batcher.submit(crop)) for crop in crops]
+            )
+            result = self._merge_tiles(image, rects, results, size, _start)
+        elif self.config.tiling.enabled:
+            result = await run(self._detect_tiled, image)
+        elif self.batcher:
+            result = await asyncio.wrap_future(self.batcher.submit(image))
+        else:
+            result = await run(self.model.detect, image)
+        if cache and result:
+            cache.put(key, fhash, dict(result))
+        return result
+
+    def _tiles(self, image: np.ndarray):
+        """(rects, crops, tile size) of the overlapping tiles for a frame"""
+        tiling = self.config.tiling
+        h, w = image.shape[:2]
+        size = tiling.tile_size or max(
+            getattr(self.config, "width", 0) or 416, getattr(self.config, "height", 0) or 416
+        )
+        rects = grid_tiles((0, 0, w, h), size, tiling.overlap)
+        if tiling.full_frame and len(rects) > 1:
+            rects.append((0, 0, w, h))
+        return rects, [image[y1:y2, x1:x2] for x1, y1, x2, y2 in rects], size
+
+    def _merge_tiles(
+        self, image: np.ndarray, rects: list, results: list, size: int, _start: float
+    ) -> Dict[str, Any]:
+        h, w = image.shape[:2]
+        merged = merge_results(list(zip(rects, results)), self.config.tiling.nms)
+        logger.debug(
+            f"perf:: '{self.config.name}' tiled detection of {w}*{h} as {len(rects)} tile(s) of {size}px "
+            f"took {time.perf_counter() - _start:.5f} seconds"
+        )
+        return merged
+
+    def _detect_tiled(self, image: np.ndarray) -> Dict[str, Any]:
+        """Split the frame into overlapping tiles, infer all of them in one batch (one forward pass if the
+        model supports it) and merge the boxes with cross-tile NMS"""
+        _start = time.perf_counter()
+        rects, crops, size = self._tiles(image)
+        if self.batcher:
+            # the scheduler stacks the tiles (and concurrent requests) into batches
+            futures = [self.batcher.submit(crop) for crop in crops]
+            results = [f.result() for f in futures]
+        elif hasattr(self.model, "detect_batch"):
+            results = self.model.detect_batch(crops)
+        else:
+            results = [self.model.detect(crop) for crop in crops]
+        return self._merge_tiles(image, rects, results, size, _start)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-replica busy/served counters"""
+        from ..ML.replicas import ReplicaPool
+
+        if isinstance(self.model, ReplicaPool):
+            replicas = self.model.stats()
+        else:
+            replicas = []
+        return {
+            "name": self.config.name,
+            "id": self.id,
+            "replicas": replicas,
+            "frame_cache": self.cache.stats() if self.cache else None,
+        }
 
 
 class GlobalConfig(BaseModel):
@@ -999,19 +1443,54 @@ class GlobalConfig(BaseModel):
     detectors: List[APIDetector] = Field(
         default_factory=list, description="Loaded Detectors"
     )
+    executor: Optional[InferenceExecutor] = Field(
+        None, description="Long-lived executor for blocking inference and image decoding"
+    )
+    model_index: Dict[str, BaseModelConfig] = Field(
+        default_factory=dict, description="name/alias/id -> model lookup table"
+    )
+    detector_index: Dict[uuid.UUID, APIDetector] = Field(
+        default_factory=dict, description="model id -> loaded detector lookup table"
+    )
 
     class Config:
         arbitrary_types_allowed = True
 
+    def build_model_index(self):
+        """(Re-)build the name/alias/id lookup table, call whenever available_models changes"""
+        index: Dict[str, BaseModelConfig] = {}
+        for model in self.available_models:
+            for key in (model.name, str(model.id), *model.aliases):
+                if key in index and index[key] is not model:
+                    logger.warning(
+                        f"Model identifier '{key}' is used by '{index[key].name}' and '{model.name}', "
+                        f"requests for it will go to '{index[key].name}'"
+                    )
+                    continue
+                index[key] = model
+        self.model_index = index
+        # drop detectors of models that are no longer available
+        self.detector_index = {
+            model.id: self.detector_index[model.id]
+            for model in self.available_models
+            if model.id in self.detector_index
+        }
+        self.detectors = list(self.detector_index.values())
+        logger.debug(
+            f"Built model index: {len(self.available_models)} models -> {len(index)} identifiers"
+        )
+
+    def find_model(self, hint: str) -> Optional[BaseModelConfig]:
+        """Get a model by name, alias or ID"""
+        return self.model_index.get(str(hint).strip().casefold())
+
     def get_detector(self, model: BaseModelConfig) -> Optional[APIDetector]:
         """Get a detector by ID"""
-        ret_: Optional[APIDetector] = None
-        for detector in self.detectors:
-            if detector.config.id == model.id:
-                ret_ = detector
+        ret_: Optional[APIDetector] = self.detector_index.get(model.id)
         if not ret_:
             logger.debug(f"Creating new detector for '{model.name}'")
             ret_ = APIDetector(model)
+            self.detector_index[model.id] = ret_
             self.detectors.append(ret_)
         if not ret_:
             logger.error(f"Unable to create detector for {model.name}")
@@ -4,7 +4,7 @@ from .Models.config import Settings, DetectionResult, BaseModelOptions, CV2YOLOM
     ALPRModelOptions, OpenALPRLocalModelOptions, OpenALPRCloudModelOptions, PlateRecognizerModelOptions, \
     DeepFaceModelOptions, CV2TFModelOptions, PyTorchModelOptions, BaseModelConfig, TPUModelConfig, CV2YOLOModelConfig, \
     FaceRecognitionLibModelConfig, ALPRModelConfig, CV2HOGModelConfig, RekognitionModelConfig, DeepFaceModelConfig, \
-    CV2TFModelConfig, PyTorchModelConfig, APIDetector, GlobalConfig, LockSettings
+    CV2TFModelConfig, PyTorchModelConfig, ORTModelConfig, OpenVINOModelConfig, APIDetector, GlobalConfig, LockSettings
 
 from ..Shared.Models.Enums import ModelType, ModelFrameWork, ModelProcessor, FaceRecognitionLibModelTypes, ALPRAPIType, \
     ALPRService
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import sys
 import time
@@ -18,14 +19,21 @@ from fastapi import (
     File,
     Body,
     Path as FastPath,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
 )
-from fastapi.responses import RedirectResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import RedirectResponse, JSONResponse
 
 from .imports import (
     Settings,
 )
 from .Models.config import BaseModelOptions, FaceRecognitionLibModelOptions, \
     OpenALPRLocalModelOptions, BaseModelConfig, APIDetector, GlobalConfig
+from .Libs.executor import InferenceExecutor, ExecutorSaturated
+from .ML.cascade import run_cascade
 from ..Shared.Models.Enums import ModelType, ModelFrameWork, ModelProcessor
 
 __version__ = "0.0.1a"
@@ -70,6 +78,10 @@ def create_global_config() -> GlobalConfig:
     return get_global_config()
 
 
+def get_executor() -> InferenceExecutor:
+    return get_global_config().executor
+
+
 def get_settings() -> Settings:
     return get_global_config().config
 
@@ -90,21 +102,18 @@ def normalize_id(_id: str) -> str:
 
 
 def get_model(model_hint: Union[str, BaseModelConfig]) -> BaseModelConfig:
-    """Get a model based on the hint provided. Hint can be a model name, model id, or a model object"""
-    logger.debug(f"get_model: hint TYPE: {type(model_hint)} -> {model_hint}")
-    available_models = get_available_models()
-    if available_models:
-        if isinstance(model_hint, BaseModelConfig):
-            for model in available_models:
-                if model.id == model_hint.id or model == model_hint:
-                    return model
-        elif isinstance(model_hint, str):
-            for model in available_models:
-                identifiers = {normalize_id(model.name), str(model.id)}
-                logger.debug(f"get_model: identifiers: {identifiers}")
-                if normalize_id(model_hint) in identifiers:
-                    return model
-    raise HTTPException(status_code=404, detail=f"Model {model_hint} not found")
+    """Get a model based on the hint provided. Hint can be a model name, alias, model id, or a model object"""
+    if isinstance(model_hint, BaseModelConfig):
+        model_hint = str(model_hint.id)
+    model = get_global_config().find_model(model_hint)
+    if model is None:
+        raise HTTPException(status_code=404, detail=f"Model {model_hint} not found")
+    return model
+
+
+async def _run_detector(detector: APIDetector, image: np.ndarray, use_cache: bool = True) -> Dict:
+    """Run a detector without blocking the event loop (frame cache -> tiling / batcher -> model)"""
+    return await detector.detect_async(image, get_executor().run, use_cache)
 
 
 async def detect(
@@ -116,55 +125,115 @@ async def detect(
     model: BaseModelConfig = get_model(model_hint)
     logger.info(f"{LP} found model {model.id} -> {model}")
     detector: APIDetector = get_global_config().get_detector(model)
-    image = load_image_into_numpy_array(await image.read())
-    timer = time.perf_counter()
-    detection: Dict = detector.detect(image)
+    data = await image.read()
+    executor = get_executor()
+    # 1 job for decoding the image and 1 for the detection
+    executor.acquire(2)
+    try:
+        image = await executor.run(load_image_into_numpy_array, data)
+        timer = time.perf_counter()
+        detection: Dict = await _run_detector(detector, image)
+    finally:
+        executor.release(2)
     logger.info(
         f"{LP} single detection completed in {time.perf_counter() - timer:.5f}ms -> {detection}"
     )
     return detection
 
 
-async def threaded_detect(model_hints: List[str], image) -> List[Dict]:
-    available_models = get_global_config().available_models
-    model_hints = [normalize_id(model_hint) for model_hint in model_hints]
-    logger.debug(f"threaded_detect: model_hints -> {model_hints}")
+def _resolve_detectors(model_hints: List[str]) -> List[APIDetector]:
+    """Get the detectors for a list of model names, aliases and/or ids"""
+    gc = get_global_config()
     detectors: List[APIDetector] = []
-    for model in available_models:
-        identifiers = {model.name, str(model.id)}
-        if any([normalize_id(model_hint) in identifiers for model_hint in model_hints]):
-            logger.info(f"Found model: {model.name} ({model.id})")
-            detector = get_global_config().get_detector(model)
-            detectors.append(detector)
-    image = load_image_into_numpy_array(await image.read())
-    detections: List[Dict] = []
-    # logger.info(f"Detectors ({len(Detectors)}) -> {Detectors}")
-    timer = time.perf_counter()
-    import concurrent.futures
-
-    futures = []
-
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        for detector in detectors:
-            # logger.info(f"Starting detection for {detector}")
-            futures.append(executor.submit(detector.detect, image))
-    for future in futures:
-        detections.append(future.result())
-    # for detector in Detectors:
-    #     import threading
-    #     thread = threading.Thread(target=detector.detect, args=(image,))
-    #     threads.append(thread)
-    #     thread.start()
-    #     # detections.append(detector.detect(image))
-    # for thread in threads:
-    #     logger.info(f"Waiting for thread {thread}")
-    #     thread.join()
+    seen = set()
+    for model_hint in model_hints:
+        model = gc.find_model(model_hint)
+        # a model may be requested more than once using its name, alias and/or id
+        if model is None or model.id in seen:
+            continue
+        seen.add(model.id)
+        detectors.append(gc.get_detector(model))
+    return detectors
+
+
+async def _detect_frame(
+    detectors: List[APIDetector], image: np.ndarray, use_cache: bool = True
+) -> List[Dict]:
+    """Run all detectors concurrently on an already decoded image, crops should not use the frame cache"""
+    executor = get_executor()
+    jobs = len(detectors)
+    executor.acquire(jobs)
+    try:
+        timer = time.perf_counter()
+        detections: List[Dict] = list(
+            await asyncio.gather(
+                *[_run_detector(detector, image, use_cache) for detector in detectors]
+            )
+        )
+    finally:
+        executor.release(jobs)
     logger.info(
         f"{LP} ThreadPool detections completed in {time.perf_counter() - timer:.5f}ms -> {detections}"
     )
     return detections
 
 
+async def threaded_detect(model_hints: List[str], image, use_cache: bool = True) -> List[Dict]:
+    logger.debug(f"threaded_detect: model_hints -> {model_hints}")
+    detectors = _resolve_detectors(model_hints)
+    data = await image.read()
+    executor = get_executor()
+    executor.acquire(1)
+    try:
+        image = await executor.run(load_image_into_numpy_array, data)
+    finally:
+        executor.release(1)
+    return await _detect_frame(detectors, image, use_cache)
+
+
+RAW_DTYPES = ("uint8", "uint16", "float32")
+
+
+def load_raw_into_numpy_array(
+    data: bytes, width: int, height: int, channels: int, dtype: str
+) -> np.ndarray:
+    """Wrap a raw (already decoded) frame buffer in a numpy array, only gray, BGRA and non uint8
+    frames are copied (converted to uint8 BGR)"""
+    expected = width * height * channels * np.dtype(dtype).itemsize
+    if len(data) != expected:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Raw frame is {len(data)} bytes, expected {expected} bytes for "
+            f"{width}x{height}x{channels} {dtype}",
+        )
+    if channels not in (1, 3, 4):
+        raise HTTPException(
+            status_code=422, detail=f"Unsupported channel count {channels}, use 1 (gray), 3 (BGR) or 4 (BGRA)"
+        )
+    frame = np.frombuffer(data, dtype=dtype)
+    if channels == 1:
+        frame = frame.reshape(height, width)
+    else:
+        frame = frame.reshape(height, width, channels)
+    return to_bgr8(frame)
+
+
+def to_bgr8(frame: np.ndarray) -> np.ndarray:
+    """Convert a gray/BGR/BGRA uint8/uint16/float32 frame to the 3 channel uint8 BGR the detectors expect.
+    uint8 BGR frames are returned as is (no copy)."""
+    if frame.dtype == np.uint16:
+        frame = (frame >> 8).astype(np.uint8)
+    elif frame.dtype == np.float32:
+        # [0-1] normalized or [0-255]
+        scale = 255.0 if frame.size and float(frame.max()) <= 1.0 else 1.0
+        frame = np.clip(frame * scale, 0, 255).astype(np.uint8)
+    if frame.ndim == 2:
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+    if frame.shape[2] == 4:
+        return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+    return frame
+
+
 def load_image_into_numpy_array(data):
     """Load an uploaded image into a numpy array"""
     npimg = np.frombuffer(data, np.uint8)
@@ -173,6 +242,15 @@ def load_image_into_numpy_array(data):
     return frame
 
 
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request, exc: ExecutorSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @app.get("/", response_class=RedirectResponse, include_in_schema=False)
 async def docs():
     return RedirectResponse(url="/docs")
@@ -224,6 +302,11 @@ async def available_models_proc(framework: ModelFrameWork):
     }
 
 
+@app.get("/models/stats", summary="Get per-replica busy/served counters of the loaded models")
+async def models_stats():
+    return {"detectors": [detector.stats() for detector in get_global_config().detectors]}
+
+
 @app.post("/models/modify/{model_hint}", summary="Change a models options")
 async def modify_model(
     model_hint: str,
@@ -238,6 +321,8 @@ async def modify_model(
         f"modify_model: '{model.name}' original: {old_options}  -> new: {model_options}"
     )
     detector.config.detection_options = model.detection_options = model_options
+    # results cached with the old confidence/nms
+    detector.clear_cache()
     return {"original": old_options, "new": model.detection_options}
 
 
@@ -252,13 +337,142 @@ async def group_detect(
         example="yolov4,97acd7d4-270c-4667-9d56-910e1510e8e8,yolov7 tiny",
     ),
     image: UploadFile = File(...),
+    cache: bool = Query(True, description="Use the frame cache, disable it when sending crops"),
 ):
     logger.info(f"group_detect: {model_hints}")
     model_hints = model_hints[0].strip('"').split(",")
-    detections = await threaded_detect(model_hints, image)
+    detections = await threaded_detect(model_hints, image, cache)
     return detections
 
 
+@app.post(
+    "/detect/raw",
+    summary="Detect objects in a raw (BGR) frame sent as application/octet-stream using a set of models",
+)
+async def raw_detect(
+    request: Request,
+    model_hints: str = Query(
+        ..., description="comma separated model names or ids", example="yolov4,yolov7 tiny"
+    ),
+    width: int = Query(..., gt=0, description="Frame width in pixels"),
+    height: int = Query(..., gt=0, description="Frame height in pixels"),
+    channels: int = Query(3, description="Number of color channels: 1 (gray), 3 (BGR) or 4 (BGRA)", ge=1, le=4),
+    dtype: str = Query("uint8", description=f"Pixel data type, one of {RAW_DTYPES}"),
+    cache: bool = Query(True, description="Use the frame cache, disable it when sending crops"),
+):
+    if dtype not in RAW_DTYPES:
+        raise HTTPException(status_code=422, detail=f"Unsupported dtype '{dtype}', use one of {RAW_DTYPES}")
+    data = await request.body()
+    executor = get_executor()
+    # gray/BGRA/uint16/float32 frames are converted, off the event loop like the JPEG decode
+    executor.acquire(1)
+    try:
+        image = await executor.run(load_raw_into_numpy_array, data, width, height, channels, dtype)
+    finally:
+        executor.release(1)
+    logger.info(f"raw_detect: {model_hints} -> {width}x{height}x{channels} {dtype}")
+    detectors = _resolve_detectors(model_hints.strip('"').split(","))
+    return await _detect_frame(detectors, image, cache)
+
+
+@app.websocket("/detect/stream")
+async def stream_detect(
+    websocket: WebSocket,
+    model_hints: str = Query(..., description="comma separated model names or ids"),
+    max_in_flight: int = Query(4, ge=1, le=64, description="Frames processed concurrently"),
+):
+    """Persistent detection session, the model set is declared once when connecting.
+
+    Each frame is a JSON text message ``{"id": ..., "format": "jpeg"|"raw", [width, height, channels, dtype],
+    ["cache": false]}``
+    followed by a binary message with the image data. Results are sent back as ``{"id": ..., "results": [...]}``
+    (or ``{"id": ..., "error": "..."}``) as soon as they are ready, not necessarily in order.
+    """
+    await websocket.accept()
+    detectors = _resolve_detectors(model_hints.strip('"').split(","))
+    logger.info(f"stream_detect: session opened for {[d.config.name for d in detectors]}")
+    send_lock = asyncio.Lock()
+    slots = asyncio.Semaphore(max_in_flight)
+    tasks = set()
+
+    async def reply(message: Dict):
+        async with send_lock:
+            await websocket.send_json(message)
+
+    async def process(header: Dict, data: bytes):
+        request_id = header.get("id")
+        try:
+            executor = get_executor()
+            if header.get("format") == "raw":
+                dtype = header.get("dtype", "uint8")
+                if dtype not in RAW_DTYPES:
+                    raise ValueError(f"Unsupported dtype '{dtype}', use one of {RAW_DTYPES}")
+                decode = (
+                    load_raw_into_numpy_array,
+                    data,
+                    header["width"],
+                    header["height"],
+                    header.get("channels", 3),
+                    dtype,
+                )
+            else:
+                decode = (load_image_into_numpy_array, data)
+            executor.acquire(1)
+            try:
+                image = await executor.run(*decode)
+            finally:
+                executor.release(1)
+            results = await _detect_frame(detectors, image, header.get("cache", True))
+            await reply({"id": request_id, "results": jsonable_encoder(results)})
+        except WebSocketDisconnect:
+            pass
+        except Exception as exc:
+            detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+            logger.error(f"stream_detect: frame {request_id} failed -> {detail}")
+            try:
+                await reply({"id": request_id, "error": detail})
+            except WebSocketDisconnect:
+                pass
+        finally:
+            slots.release()
+
+    try:
+        while True:
+            header = await websocket.receive_json()
+            data = await websocket.receive_bytes()
+            # stop reading new frames while max_in_flight frames are being processed (back pressure)
+            await slots.acquire()
+            task = asyncio.create_task(process(header, data))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except WebSocketDisconnect:
+        logger.info("stream_detect: client closed the session")
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@app.post(
+    "/detect/cascade/{name}",
+    summary="Run a cascade defined in the server config, later stages only run on the candidates of earlier ones",
+)
+async def cascade_detection(
+    name: str = FastPath(..., description="cascade name", example="person_face"),
+    image: UploadFile = File(..., description="Image to run the cascade on"),
+):
+    cascade = get_settings().cascades.get(normalize_id(name))
+    if cascade is None:
+        raise HTTPException(status_code=404, detail=f"Cascade {name} not found")
+    data = await image.read()
+    executor = get_executor()
+    executor.acquire(1)
+    try:
+        frame = await executor.run(load_image_into_numpy_array, data)
+    finally:
+        executor.release(1)
+    return await run_cascade(name, cascade, frame, _resolve_detectors, _detect_frame)
+
+
 @app.post(
     "/detect/single/{model_hint}",
     summary="Run detection using the specified model on a single image",
@@ -307,6 +521,14 @@ class MLAPI:
 
         self.cached_settings = parse_client_config_file(self.cfg_file)
         get_global_config().config = self.cached_settings
+        executor_cfg = self.cached_settings.server.executor
+        if get_global_config().executor:
+            get_global_config().executor.shutdown(wait=False)
+        get_global_config().executor = InferenceExecutor(
+            max_workers=executor_cfg.max_workers,
+            max_queue=executor_cfg.max_queue,
+            retry_after=executor_cfg.retry_after,
+        )
         # logger.debug(f"{g.settings = }")
         logger.info(
 f"should be loading models"
@@ -315,6 +537,26 @@ f"should be loading models"
         available_models = (
             get_global_config().available_models
         ) = self.cached_settings.available_models
+        get_global_config().build_model_index()
+        for name, cascade in self.cached_settings.cascades.items():
+            for idx, stage in enumerate(cascade.stages):
+                for model_hint in stage.models:
+                    if get_global_config().find_model(model_hint) is None:
+                        logger.warning(
+                            f"{LP} cascade '{name}' stage {idx} references unknown model '{model_hint}'"
+                        )
+
+        autotune_cfg = self.cached_settings.server.autotune
+        if available_models and autotune_cfg.enabled:
+            from .ML.autotune import autotune
+
+            autotune(
+                available_models,
+                autotune_cfg,
+                self.cached_settings.system.variable_data_path or Path(self.cached_settings.locks.dir),
+                concurrency=executor_cfg.max_workers,
+                workers=self.cached_settings.server.workers.enabled,
+            )
 
         if available_models:
             futures = []
@@ -30,6 +30,9 @@ class ModelFrameWork(str, Enum):
     DEFAULT = CV_YOLO
     REKOGNITION = "rekognition"
     AWS = REKOGNITION
+    ONNXRUNTIME = "onnxruntime"
+    ORT = ONNXRUNTIME
+    OPENVINO = "openvino"
 
 
 class ModelProcessor(str, Enum):
@@ -27,6 +27,15 @@ class DefaultNotEnabled(DefaultEnabled):
     enabled: bool = Field(False)
 
 
+class FrameCacheSettings(DefaultNotEnabled):
+    """Reuse detection results for frames with a near identical perceptual hash"""
+    max_distance: int = Field(
+        4, ge=0, le=64, description="Maximum Hamming distance (bits of a 64 bit dHash) to count as a hit"
+    )
+    ttl: float = Field(300.0, gt=0, description="Seconds a cached result is valid")
+    max_entries: int = Field(256, ge=1, description="Maximum number of cached frames")
+
+
 class LoggingLevelBase(BaseModel):
     level: Optional[int] = None
 
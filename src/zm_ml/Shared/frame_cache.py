@@ -0,0 +1,163 @@
+"""Detection results cached by a perceptual (difference) hash of the frame, near identical frames reuse them."""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import cv2
+import numpy as np
+
+LP = "frame cache::"
+# 8x8 -> 64 bit hashes
+HASH_SIZE = 8
+
+
+def dhash(image: np.ndarray) -> int:
+    """Difference hash of a decoded (BGR or grayscale) frame, adjacent pixels of a 9x8 grayscale thumbnail
+    are compared"""
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    thumb = cv2.resize(image, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = (thumb[:, 1:] > thumb[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def dhash_encoded(image: bytes) -> Optional[int]:
+    """dhash of an encoded (jpeg/png) frame, decoded at 1/8 scale as only a thumbnail is needed"""
+    frame = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if frame is None:
+        return None
+    return dhash(frame)
+
+
+class FrameCache:
+    """Results keyed by (model set, frame hash). A lookup hits when a cached hash of the same key is within
+    ``max_distance`` bits (Hamming distance) and younger than ``ttl`` seconds. Thread safe.
+    """
+
+    def __init__(
+        self,
+        max_distance: int = 4,
+        ttl: float = 300.0,
+        max_entries: int = 256,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.logger = logger or logging.getLogger(__name__)
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock = threading.Lock()
+        # key -> parallel lists (hashes, timestamps, results), oldest first
+        self._hashes: Dict[str, List[int]] = {}
+        self._stamps: Dict[str, List[float]] = {}
+        self._results: Dict[str, List[Any]] = {}
+
+    def __len__(self):
+        return sum(len(v) for v in self._hashes.values())
+
+    def _expire(self, key: str, now: float):
+        stamps = self._stamps.get(key)
+        if not stamps:
+            return
+        keep = 0
+        while keep < len(stamps) and now - stamps[keep] > self.ttl:
+            keep += 1
+        if keep:
+            del self._hashes[key][:keep], stamps[:keep], self._results[key][:keep]
+
+    def get(self, key: str, frame_hash: Optional[int]) -> Optional[Any]:
+        """Cached results of the closest frame within tolerance, None on a miss"""
+        if frame_hash is None:
+            return None
+        now = time.time()
+        with self._lock:
+            self._expire(key, now)
+            hashes = self._hashes.get(key)
+            if hashes:
+                # popcount of the xor of all cached hashes at once
+                xor = np.array(hashes, dtype=np.uint64) ^ np.uint64(frame_hash)
+                distances = np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+                best = int(np.argmin(distances))
+                if distances[best] <= self.max_distance:
+                    self.hits += 1
+                    self.logger.debug(
+                        f"{LP} HIT for '{key}' (distance: {distances[best]} bits, age: "
+                        f"{now - self._stamps[key][best]:.1f}s) [hits: {self.hits} - misses: {self.misses}]"
+                    )
+                    return self._results[key][best]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, frame_hash: Optional[int], results: Any):
+        if frame_hash is None:
+            return
+        with self._lock:
+            self._hashes.setdefault(key, []).append(frame_hash)
+            self._stamps.setdefault(key, []).append(time.time())
+            self._results.setdefault(key, []).append(results)
+            while len(self) > self.max_entries:
+                # drop the oldest entry overall
+                oldest = min(self._stamps, key=lambda k: self._stamps[k][0] if self._stamps[k] else float("inf"))
+                del self._hashes[oldest][0], self._stamps[oldest][0], self._results[oldest][0]
+
+    def clear(self, prefix: str = ""):
+        """Drop the entries of every key starting with ``prefix`` (all of them by default)"""
+        with self._lock:
+            for key in [k for k in self._hashes if k.startswith(prefix)]:
+                del self._hashes[key], self._stamps[key], self._results[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
+
+    def load(self, path: Path) -> FrameCache:
+        """Read entries saved by a previous process (JSON serializable results only)"""
+        if not path.is_file():
+            return self
+        try:
+            data = json.loads(path.read_text())
+        except Exception as exc:
+            self.logger.warning(f"{LP} unable to read '{path}' -> {exc}")
+            return self
+        now = time.time()
+        with self._lock:
+            for key, entries in data.items():
+                for frame_hash, stamp, results in entries:
+                    if now - stamp <= self.ttl:
+                        self._hashes.setdefault(key, []).append(int(frame_hash))
+                        self._stamps.setdefault(key, []).append(float(stamp))
+                        self._results.setdefault(key, []).append(results)
+        self.logger.debug(f"{LP} loaded {len(self)} cached frame(s) from '{path}'")
+        return self
+
+    def save(self, path: Path):
+        now = time.time()
+        with self._lock:
+            data = {
+                key: [
+                    (h, s, r)
+                    for h, s, r in zip(self._hashes[key], self._stamps[key], self._results[key])
+                    if now - s <= self.ttl
+                ]
+                for key in self._hashes
+            }
+        try:
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data))
+            tmp.replace(path)
+        except Exception as exc:
+            self.logger.warning(f"{LP} unable to write '{path}' -> {exc}")
+
+
+def frame_hash(image: Union[bytes, np.ndarray]) -> Optional[int]:
+    """dhash of an encoded or decoded frame"""
+    if isinstance(image, np.ndarray):
+        return dhash(image)
+    if isinstance(image, (bytes, bytearray)):
+        return dhash_encoded(bytes(image))
+    return None
@@ -0,0 +1,113 @@
+"""Regions of interest and overlapping tiles: cut a frame into crops and merge the per crop results back."""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# x1, y1, x2, y2 - x2/y2 exclusive
+Rect = Tuple[int, int, int, int]
+
+
+def bounding_rect(
+    polygons: Sequence[Sequence[Tuple[int, int]]],
+    width: int,
+    height: int,
+    padding: int = 0,
+) -> Optional[Rect]:
+    """Union bounding rectangle of the polygons, padded and clipped to the frame"""
+    points = [p for polygon in polygons for p in polygon]
+    if not points:
+        return None
+    pts = np.asarray(points, dtype=np.int64)
+    x1, y1 = pts.min(axis=0) - padding
+    x2, y2 = pts.max(axis=0) + padding + 1
+    x1, y1 = max(int(x1), 0), max(int(y1), 0)
+    x2, y2 = min(int(x2), width), min(int(y2), height)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return x1, y1, x2, y2
+
+
+def _starts(start: int, end: int, size: int, step: int) -> List[int]:
+    if end - start <= size:
+        return [start]
+    starts = list(range(start, end - size, step))
+    # last tile is flush with the edge
+    starts.append(end - size)
+    return starts
+
+
+def grid_tiles(rect: Rect, tile_size: int, overlap: float = 0.2) -> List[Rect]:
+    """Square tiles of ``tile_size`` covering ``rect``, neighbours overlap by ``overlap`` of a tile.
+    A rect smaller than a tile (on an axis) gives a single tile on that axis."""
+    x1, y1, x2, y2 = rect
+    step = max(1, int(tile_size * (1.0 - overlap)))
+    return [
+        (x, y, min(x + tile_size, x2), min(y + tile_size, y2))
+        for y in _starts(y1, y2, tile_size, step)
+        for x in _starts(x1, x2, tile_size, step)
+    ]
+
+
+def merge_results(
+    tile_results: Sequence[Tuple[Rect, Dict[str, Any]]],
+    nms_threshold: float = 0.45,
+) -> Dict[str, Any]:
+    """Shift the boxes of each tile result (same model) back to frame coordinates and remove the duplicates of
+    objects seen by overlapping tiles with one class aware NMS pass."""
+    labels: List[str] = []
+    confs: List[float] = []
+    boxes: List[List[int]] = []
+    base: Dict[str, Any] = {}
+    for (x, y, _, _), result in tile_results:
+        if not base:
+            base = result
+        if not result or not result.get("label"):
+            continue
+        labels.extend(result["label"])
+        confs.extend(float(c) for c in result["confidence"])
+        boxes.extend(
+            [b[0] + x, b[1] + y, b[2] + x, b[3] + y] for b in result["bounding_box"]
+        )
+    if len(tile_results) > 1 and len(boxes) > 1:
+        keep = nms(boxes, confs, labels, nms_threshold)
+        labels = [labels[i] for i in keep]
+        confs = [confs[i] for i in keep]
+        boxes = [boxes[i] for i in keep]
+    merged = dict(base)
+    merged.update(
+        success=bool(labels), label=labels, confidence=confs, bounding_box=boxes
+    )
+    return merged
+
+
+def nms(
+    boxes: Sequence[Sequence[float]],
+    confs: Sequence[float],
+    labels: Sequence[str],
+    nms_threshold: float,
+) -> List[int]:
+    """Indices of the boxes (x1, y1, x2, y2) kept by class aware NMS, highest confidence first"""
+    xyxy = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    _, class_ids = np.unique(np.asarray(labels), return_inverse=True)
+    confidences = np.asarray(confs, dtype=np.float32)
+    return class_nms(xyxy, confidences, class_ids, nms_threshold).tolist()
+
+
+def class_nms(
+    xyxy: np.ndarray,
+    confidences: np.ndarray,
+    class_ids: np.ndarray,
+    nms_threshold: float,
+    conf_threshold: float = 0.0,
+) -> np.ndarray:
+    """Class aware NMS of (x1, y1, x2, y2) boxes in a single call, each class is offset into its own region
+    of the plane"""
+    if not len(xyxy):
+        return np.empty(0, dtype=np.int64)
+    xywh = np.column_stack((xyxy[:, :2], xyxy[:, 2:] - xyxy[:, :2]))
+    xywh[:, :2] += (class_ids * (float(xyxy.max()) + 1)).astype(np.float32)[:, None]
+    indices = cv2.dnn.NMSBoxes(xywh.tolist(), confidences.tolist(), conf_threshold, nms_threshold)
+    return np.asarray(indices, dtype=np.int64).flatten()
@@ -0,0 +1,99 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("pydantic")
+
+from zm_ml.Server.Models.config import APIDetector, BaseModelOptions  # noqa: E402
+from zm_ml.Shared.frame_cache import FrameCache, dhash  # noqa: E402
+
+
+async def _run(func, *args):
+    return func(*args)
+
+
+def _detector(tiling: bool = False) -> APIDetector:
+    detector = APIDetector.__new__(APIDetector)
+    detector.config = SimpleNamespace(
+        name="yolo", tiling=SimpleNamespace(enabled=tiling), detection_options=BaseModelOptions()
+    )
+    detector.model = mock.Mock()
+    detector.batcher = mock.Mock()
+    detector.cache = FrameCache(max_distance=4, ttl=300, max_entries=8)
+    return detector
+
+
+def test_cached_frame_skips_the_batcher():
+    image = np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    detector = _detector()
+    cached = {"success": True, "label": ["person"], "confidence": [0.9], "bounding_box": [[1, 2, 3, 4]]}
+    detector.cache.put(detector._cache_key(image), dhash(image), cached)
+
+    result = asyncio.run(detector.detect_async(image, _run))
+
+    assert result == cached
+    detector.batcher.submit.assert_not_called()
+    detector.model.detect.assert_not_called()
+
+
+def test_cache_key_includes_shape_and_options():
+    image = np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    detector = _detector()
+    key = detector._cache_key(image)
+
+    # same content (same dhash), different size: crops must not reuse full frame boxes
+    assert detector._cache_key(np.ascontiguousarray(image[:60, :80])) != key
+    detector.config.detection_options = BaseModelOptions(confidence=0.9)
+    assert detector._cache_key(image) != key
+
+
+def test_clear_cache_drops_only_this_model():
+    image = np.zeros((120, 160, 3), dtype=np.uint8)
+    detector = _detector()
+    detector.cache.put(detector._cache_key(image), dhash(image), {"label": ["person"]})
+    detector.cache.put("other|160x120|0", dhash(image), {"label": ["car"]})
+
+    detector.clear_cache()
+
+    assert detector.cache.get(detector._cache_key(image), dhash(image)) is None
+    assert detector.cache.get("other|160x120|0", dhash(image)) is not None
+
+
+def test_crops_skip_the_cache():
+    image = np.zeros((120, 160, 3), dtype=np.uint8)
+    detector = _detector()
+    detector.batcher = None
+    detector.model.detect.return_value = {"success": True, "label": ["person"]}
+
+    asyncio.run(detector.detect_async(image, _run, use_cache=False))
+
+    assert len(detector.cache) == 0
+
+
+def test_tiles_go_through_the_batcher():
+    from concurrent.futures import Future
+
+    from zm_ml.Server.Models.config import TilingSettings
+
+    def submit(crop):
+        future = Future()
+        future.set_result(
+            {"success": False, "model_name": "yolo", "label": [], "confidence": [], "bounding_box": []}
+        )
+        return future
+
+    image = np.zeros((200, 300, 3), dtype=np.uint8)
+    detector = _detector()
+    detector.cache = None
+    detector.config.tiling = TilingSettings(enabled=True, tile_size=100, overlap=0.0, full_frame=True)
+    detector.batcher.submit.side_effect = submit
+
+    asyncio.run(detector.detect_async(image, _run))
+
+    # 3x2 grid + the full frame, none of them ran on the model directly
+    assert detector.batcher.submit.call_count == 7
+    detector.model.detect.assert_not_called()